@@ -1,13 +1,20 @@
-import matplotlib.pyplot as plt
+import os
+import math
+import argparse
+import numpy as np
 
-nav_plane_pos = []
-nav_plane_vel = []
-guid_plane_pos = []
-guid_plane_vel = []
-timestamp = []
+from src.gnc.replay import read_telemetry
+from src.helpers.log_helper import latest_log, read_lines
 
-with open("rendezvous_docking.log", "r") as file:
-    for line in file:
+
+def read_log(path: str = "rendezvous_docking.log") -> tuple:
+    nav_plane_pos = []
+    nav_plane_vel = []
+    guid_plane_pos = []
+    guid_plane_vel = []
+    timestamp = []
+
+    for line in read_lines(path):
         if line.startswith("INFO - Nav,"):
             values = line.strip().split(",")[1:]
             # in_plane_nav_values = [float(value) for value in values[1:3]]
@@ -21,71 +28,220 @@ with open("rendezvous_docking.log", "r") as file:
             guid_messages = [float(value) for value in values]
             guid_plane_pos.append(guid_messages[0:2])
             guid_plane_vel.append(guid_messages[2:4])
-nav_plane_pos = list(zip(*nav_plane_pos))
-nav_plane_vel = list(zip(*nav_plane_vel))
-guid_plane_pos = list(zip(*guid_plane_pos))
-guid_plane_vel = list(zip(*guid_plane_vel))
-
-fig, (ax1, ax2, ax3) = plt.subplots(3, 1)
-
-ax1.plot(nav_plane_pos[1], nav_plane_pos[0], label="Nav")
-ax1.plot(guid_plane_pos[1], guid_plane_pos[0], label="Guid")
-
-# Add points every 5 minutes
-previous_timestamp = 0
-for i in range(len(timestamp)):
-    if (
-        timestamp[i] > previous_timestamp + 300
-    ):  # Add a point every 5 minutes (300 seconds)
+    nav_plane_pos = list(zip(*nav_plane_pos))
+    nav_plane_vel = list(zip(*nav_plane_vel))
+    guid_plane_pos = list(zip(*guid_plane_pos))
+    guid_plane_vel = list(zip(*guid_plane_vel))
+    return nav_plane_pos, nav_plane_vel, guid_plane_pos, guid_plane_vel, timestamp
+
+
+def decimate(max_points: int, *series) -> np.ndarray:
+    """Indices of the samples kept to plot the series with about max_points.
+
+    The samples are split in buckets and the minimum and maximum of every
+    series are kept in each bucket, with the first and last samples, so
+    peaks survive the downsampling.
+    """
+    n = len(series[0])
+    if n <= max_points:
+        return np.arange(n)
+    buckets = max(1, max_points // (2 * len(series)))
+    size = math.ceil(n / buckets)
+    offsets = np.arange(buckets)[:, None] * size
+    kept = [np.array([0, n - 1])]
+    for values in series:
+        values = np.asarray(values, dtype=float)
+        # the last bucket is padded with its last value
+        padded = np.pad(values, (0, buckets * size - n), mode="edge")
+        padded = padded.reshape(buckets, size)
+        kept.append((offsets + padded.argmin(axis=1)[:, None]).ravel())
+        kept.append((offsets + padded.argmax(axis=1)[:, None]).ravel())
+    return np.unique(np.minimum(np.concatenate(kept), n - 1))
+
+
+def time_marks(timestamp, max_marks: int = 20) -> np.ndarray:
+    """Indices of the samples annotated with their time, every 5 minutes or more.
+
+    The interval grows in 5 minute steps so that long phases stay readable.
+    """
+    timestamp = np.asarray(timestamp, dtype=float)
+    if len(timestamp) == 0:
+        return np.array([], dtype=int)
+    duration = timestamp[-1] - timestamp[0]
+    interval = 300 * max(1, math.ceil(duration / (300 * max_marks)))
+    marks = []
+    previous_timestamp = timestamp[0] - interval
+    while True:
+        i = np.searchsorted(timestamp, previous_timestamp + interval, side="right")
+        if i >= len(timestamp):
+            return np.array(marks, dtype=int)
+        marks.append(i)
         previous_timestamp = timestamp[i]
-        ax1.scatter(nav_plane_pos[1][i], nav_plane_pos[0][i], color="red")
-        timestamp_annot = divmod(timestamp[i], 60)
-        ax1.annotate(
-            f"{timestamp_annot[0]:.0f}:{timestamp_annot[1]:.1f}",
-            (nav_plane_pos[1][i], nav_plane_pos[0][i]),
+
+
+def annotate_marks(ax, x, y, timestamp) -> None:
+    ax.scatter(x, y, color="red")
+    for x_i, y_i, t_i in zip(x, y, timestamp):
+        minutes, seconds = divmod(t_i, 60)
+        ax.annotate(
+            f"{minutes:.0f}:{seconds:.1f}",
+            (x_i, y_i),
             textcoords="offset points",
             xytext=(0, 10),
             ha="center",
         )
-        ax1.scatter(guid_plane_pos[1][i], guid_plane_pos[0][i], color="red")
-        ax1.annotate(
-            f"{timestamp_annot[0]:.0f}:{timestamp_annot[1]:.1f}",
-            (guid_plane_pos[1][i], guid_plane_pos[0][i]),
-            textcoords="offset points",
-            xytext=(0, 10),
-            ha="center",
+
+
+def plot_series(
+    axes,
+    timestamp,
+    nav_plane_pos,
+    nav_plane_vel,
+    guid_timestamp,
+    guid_plane_pos,
+    guid_plane_vel,
+    max_points: int = 5000,
+    max_marks: int = 20,
+) -> None:
+    """Draws the V-bar/R-bar plane and the velocities, downsampled."""
+    ax1, ax2, ax3 = axes
+    timestamp, guid_timestamp = np.asarray(timestamp), np.asarray(guid_timestamp)
+    nav_plane_pos, nav_plane_vel = np.asarray(nav_plane_pos), np.asarray(nav_plane_vel)
+    guid_plane_pos = np.asarray(guid_plane_pos)
+    guid_plane_vel = np.asarray(guid_plane_vel)
+
+    nav = decimate(max_points, *nav_plane_pos, *nav_plane_vel)
+    ax1.plot(nav_plane_pos[1][nav], nav_plane_pos[0][nav], label="Nav")
+    ax2.plot(timestamp[nav], nav_plane_vel[0][nav], label="Nav, R-bar")
+    ax3.plot(timestamp[nav], nav_plane_vel[1][nav], label="Nav, V-bar")
+    if len(guid_timestamp):
+        guid = decimate(max_points, *guid_plane_pos, *guid_plane_vel)
+        ax1.plot(guid_plane_pos[1][guid], guid_plane_pos[0][guid], label="Guid")
+        ax2.plot(guid_timestamp[guid], guid_plane_vel[0][guid], label="Guid, R-bar")
+        ax3.plot(guid_timestamp[guid], guid_plane_vel[1][guid], label="Guid, V-bar")
+
+    marks = time_marks(timestamp, max_marks)
+    annotate_marks(
+        ax1, nav_plane_pos[1][marks], nav_plane_pos[0][marks], timestamp[marks]
+    )
+    if len(guid_timestamp):
+        marks = np.minimum(
+            np.searchsorted(guid_timestamp, timestamp[marks]), len(guid_timestamp) - 1
+        )
+        annotate_marks(
+            ax1,
+            guid_plane_pos[1][marks],
+            guid_plane_pos[0][marks],
+            guid_timestamp[marks],
+        )
+    for ax in axes:
+        ax.legend()
+
+
+def plot_log(
+    nav_plane_pos,
+    nav_plane_vel,
+    guid_plane_pos,
+    guid_plane_vel,
+    timestamp,
+    max_points: int = 5000,
+) -> None:
+    # pyplot is slow to import, only load it when plotting
+    import matplotlib.pyplot as plt
+
+    fig, axes = plt.subplots(3, 1)
+    # guidance samples follow the navigation sample of their cycle
+    plot_series(
+        axes,
+        timestamp,
+        nav_plane_pos,
+        nav_plane_vel,
+        timestamp[len(timestamp) - len(guid_plane_pos[0]) :] if guid_plane_pos else [],
+        guid_plane_pos,
+        guid_plane_vel,
+        max_points=max_points,
+    )
+    plt.show()
+
+
+def phase_series(phase) -> tuple:
+    """Plotted series of a recorded phase, as plot_series takes them."""
+    timestamp = np.array([cycle.time for cycle in phase.cycles])
+    nav = np.array([cycle.nav for cycle in phase.cycles]).reshape(-1, 6)
+    guided = [cycle for cycle in phase.cycles if cycle.guid is not None]
+    guid = np.array([cycle.guid for cycle in guided])
+    # close range references are logged as (tau, x, y, z, x_dot, y_dot, z_dot),
+    # homing references as (x, y, x_dot, y_dot)
+    guid = guid[:, [1, 2, 4, 5]] if guid.shape[-1] == 7 else guid.reshape(-1, 4)
+    return (
+        timestamp,
+        nav[:, 0:2].T,
+        nav[:, 3:5].T,
+        np.array([cycle.time for cycle in guided]),
+        guid[:, 0:2].T,
+        guid[:, 2:4].T,
+    )
+
+
+def render_phases(
+    path: str = "rendezvous_docking.log",
+    output_dir: str = "log_analysis",
+    max_points: int = 5000,
+    max_marks: int = 20,
+) -> list:
+    """Renders one figure per phase of the log to png files, without a display."""
+    # the figure is drawn with the Agg canvas, pyplot and its backends are not needed
+    from matplotlib.figure import Figure
+
+    os.makedirs(output_dir, exist_ok=True)
+    files = []
+    for i, phase in enumerate(read_telemetry(path).phases):
+        fig = Figure(figsize=(10, 12))
+        axes = fig.subplots(3, 1)
+        plot_series(axes, *phase_series(phase), max_points, max_marks)
+        axes[0].set_title(phase.name)
+        file_name = os.path.join(
+            output_dir, f"{i:02d}_{phase.name.lower().replace(' ', '_')}.png"
         )
+        fig.savefig(file_name)
+        files.append(file_name)
+    return files
+
 
-ax2.plot(timestamp, nav_plane_vel[0], label="Nav, R-bar")
-ax2.plot(timestamp[1:], guid_plane_vel[0], label="Guid, R-bar")
-ax3.plot(timestamp, nav_plane_vel[1], label="Nav, V-bar")
-ax3.plot(timestamp[1:], guid_plane_vel[1], label="Guid, V-bar")
-
-# # Add points every 5 minutes
-# previous_timestamp = 0
-# for i in range(len(timestamp)):
-#     if (
-#         timestamp[i] > previous_timestamp + 300
-#     ):  # Add a point every 5 minutes (300 seconds)
-#         previous_timestamp = timestamp[i]
-#         ax2.scatter(nav_plane_vel[1][i], nav_plane_vel[0][i], color="red")
-#         timestamp_annot = divmod(timestamp[i], 60)
-#         ax2.annotate(
-#             f"{timestamp_annot[0]:.0f}:{timestamp_annot[1]:.1f}",
-#             (nav_plane_vel[1][i], nav_plane_vel[0][i]),
-#             textcoords="offset points",
-#             xytext=(0, 10),
-#             ha="center",
-#         )
-#         ax2.scatter(guid_plane_vel[1][i], guid_plane_vel[0][i], color="red")
-#         ax2.annotate(
-#             f"{timestamp_annot[0]:.0f}:{timestamp_annot[1]:.1f}",
-#             (guid_plane_vel[1][i], guid_plane_vel[0][i]),
-#             textcoords="offset points",
-#             xytext=(0, 10),
-#             ha="center",
-#         )
-
-
-plt.legend()
-plt.show()
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Plot the navigation and guidance samples of a mission log"
+    )
+    parser.add_argument(
+        "log",
+        type=str,
+        nargs="?",
+        help="mission log, default: the log of the latest run",
+        default=None,
+    )
+    parser.add_argument(
+        "--log_dir",
+        type=str,
+        help="directory of the run logs searched for the latest run, default: logs",
+        default="logs",
+    )
+    parser.add_argument(
+        "--output_dir",
+        type=str,
+        help="render one png per phase in this directory instead of showing the whole log",
+        default=None,
+    )
+    parser.add_argument(
+        "--max_points",
+        type=int,
+        help="samples plotted per series, default: 5000",
+        default=5000,
+    )
+    args = parser.parse_args()
+    if args.log is None:
+        args.log = latest_log(args.log_dir)
+    if args.output_dir is None:
+        plot_log(*read_log(args.log), max_points=args.max_points)
+    else:
+        for file_name in render_phases(args.log, args.output_dir, args.max_points):
+            print(file_name)
@@ -1,77 +1,223 @@
+import math
 import logging
 import argparse
+import sys
 import time
 
-from src.game_connector import KRPCConnector
+from src.game_connector import KRPCConnector, ConnectionManager
 from src.initialization.game_helper_init import GameHelperInit
-from src.initialization.gnc_init import GNCInit
-from src.initialization.mission_init import MissionInit
+from src.initialization.runner_init import RunnerInit
+from src.mission.mission_plan import MissionFileHelper, MissionFileError
+from src.mission.checkpoint import CheckpointStore, CheckpointMismatchError
+from src.mission.multi_chaser import ChaserMission, MultiChaserScheduler
+from src.physics.mission_snapshot import MissionSnapshot
+from src.helpers.tracer import tracer
+from src.helpers.telemetry_server import TelemetryServer
+from src.helpers.log_helper import LogHelper
+from src.gnc.guidance.cw_safety import UnsafeTrajectoryError
+from src.mission.leg_state_machine import LegAbortError
 
-# class MissionFileHelper:
-#     pass
+DEFAULT_MISSION_FILE = "missions/rendezvous_docking.json"
 
 
 def main():
     parser = argparse.ArgumentParser(
         description="Perform autonomous rendezvous between satellites in KSP using kRPC"
     )
+    parser.add_argument(
+        "--mission",
+        type=str,
+        help=f"mission description file (json, toml or yaml), default: {DEFAULT_MISSION_FILE}",
+        default=None,
+    )
+    parser.add_argument(
+        "--start_from",
+        type=str,
+        help="name of the mission step to resume from",
+        default=None,
+    )
     parser.add_argument(
         "--r_bar_safety_distance",
         type=float,
-        help="height difference after phasing in meters",
-        default=2000,
+        help="height difference after phasing in meters (overrides mission file)",
+        default=None,
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=str,
+        help="file where mission progress is saved after each step",
+        default="rendezvous_docking.checkpoint.json",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue the mission saved in the checkpoint file",
+    )
+    parser.add_argument(
+        "--chasers",
+        type=str,
+        nargs="+",
+        help="names or ids of several chasers to fly concurrently towards --target",
+        default=None,
+    )
+    parser.add_argument(
+        "--target",
+        type=str,
+        help="name or id of the target vessel for --chasers",
+        default=None,
+    )
+    parser.add_argument(
+        "--pool_size",
+        type=int,
+        help="number of kRPC connections shared by the --chasers missions",
+        default=2,
+    )
+    parser.add_argument(
+        "--dry_run",
+        action="store_true",
+        help="print the planned timeline and delta-v budget without flying",
+    )
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="log GNC stage timings and RPCs per control cycle at the end of each step",
+    )
+    parser.add_argument(
+        "--log_dir",
+        type=str,
+        help="directory of the mission logs, one sub-directory per mission and run",
+        default="logs",
+    )
+    parser.add_argument(
+        "--telemetry_port",
+        type=int,
+        help="stream decimated GNC samples to local subscribers on this TCP port, see telemetry_plot.py",
+        default=None,
     )
     args = parser.parse_args()
+    if args.chasers and (args.target is None or args.resume):
+        parser.error("--chasers requires --target and cannot be resumed")
+
+    checkpoint_store = CheckpointStore(args.checkpoint)
+    checkpoint = None
+    if args.resume:
+        try:
+            checkpoint = checkpoint_store.load()
+        except CheckpointMismatchError as e:
+            sys.exit(str(e))
+        if checkpoint is None:
+            sys.exit(f"No checkpoint to resume from in {args.checkpoint}")
+        if args.mission is None:
+            args.mission = checkpoint.mission_file
+    if args.mission is None:
+        args.mission = DEFAULT_MISSION_FILE
+
+    # Validate the whole mission before connecting to the game
+    try:
+        plan = MissionFileHelper.load(args.mission)
+        if args.start_from is not None:
+            plan.step(args.start_from)
+    except MissionFileError as e:
+        sys.exit(f"Invalid mission: {e}")
+    if args.r_bar_safety_distance is not None:
+        plan.parameters["r_bar_safety_distance"] = args.r_bar_safety_distance
+
+    LogHelper.setup(plan.name, log_dir=args.log_dir)
+    if args.chasers:
+        run_multi_chaser(args, plan)
+        return
 
     # Create a new rendezvous and docking mission
-    connector = KRPCConnector("Rendezvous & Docking")
+    connector = KRPCConnector(plan.name)
+    if args.trace:
+        tracer.enable(connector.conn)
+    telemetry_server = None
+    if args.telemetry_port is not None:
+        telemetry_server = TelemetryServer(port=args.telemetry_port)
+        logging.getLogger().addHandler(telemetry_server)
     logging.info("===== Input parameters =====")
+    logging.info(f"Mission file: {args.mission}")
     logging.info(
-        f"R bar safety distance at the end of orbital phasing: {args.r_bar_safety_distance} m"
+        f"R bar safety distance at the end of orbital phasing: {plan.parameters['r_bar_safety_distance']} m"
     )
 
     game_helper = GameHelperInit.game_helper_init(connector=connector)
-    desired_apoapsis = game_helper.target.orbit.periapsis - args.r_bar_safety_distance
-    logging.info(f"Chaser orbit desired apoapsis: {desired_apoapsis} m")
-
-    # GN&C objects initialization
-    gnc_helper = GNCInit.init_gnc_classes(
-        game_helper=game_helper,
+    runner = RunnerInit.runner_init(
         connector=connector,
-    )
-
-    mission_phases = MissionInit.mission_init(
         game_helper=game_helper,
-        gnc_helper=gnc_helper,
-        desired_apoapsis=desired_apoapsis,
-        phase_offset_end_phasing=3.0,
+        plan=plan,
+        checkpoint_store=checkpoint_store,
+        checkpoint=checkpoint,
     )
 
+    if args.dry_run:
+        try:
+            print_dry_run(runner, MissionSnapshot.capture(game_helper), args.start_from)
+        except UnsafeTrajectoryError as e:
+            sys.exit(f"Unsafe mission: {e}")
+        return
+
     logging.info("===== Mission execution =====")
+    try:
+        if args.resume:
+            runner.resume()
+        else:
+            runner.run(start_from=args.start_from)
+    except CheckpointMismatchError as e:
+        logging.critical(f"Cannot resume mission: {e}")
+        sys.exit(f"Cannot resume mission: {e}")
+    except UnsafeTrajectoryError as e:
+        sys.exit(f"Unsafe mission: {e}")
+    except LegAbortError as e:
+        sys.exit(f"Mission aborted: {e}")
+    connector.connection_manager.log_stats()
+    if telemetry_server is not None:
+        logging.info(
+            f"Telemetry server: {telemetry_server.stats()['dropped']} samples dropped"
+        )
+        telemetry_server.close()
 
-    # Mission file
-    mission_phases.orbit_raise.execute_phase()
-    mission_phases.orbit_phasing.execute_phase()
-    # manually separate vessel stage
-    game_helper.chaser.control.activate_next_stage()
-    for antenna in game_helper.chaser.parts.antennas:
-        if antenna.deployable:
-            antenna.deployed = True
-    for solar_panel in game_helper.chaser.parts.solar_panels:
-        if solar_panel.deployable:
-            solar_panel.deployed = True
-    time.sleep(10)
-    mission_phases.homing.execute_phase()
-
-    mission_phases.close_range_maneuver.execute_phase(
-        final_state=(0, 500, 0), duration=90
-    )
-    mission_phases.close_range_maneuver.execute_phase(
-        final_state=(0, 100, 0), duration=60
-    )
-    mission_phases.close_range_maneuver.execute_phase(
-        final_state=(0, 0, 30), duration=45
-    )
+
+def print_dry_run(runner, snapshot, start_from) -> None:
+    t_start = time.perf_counter()
+    nodes, end = runner.dry_run(snapshot, start_from=start_from)
+    elapsed = time.perf_counter() - t_start
+
+    format_time = runner.game_helper.orb_dyn.format_time
+    print(f"Mission {runner.plan.name}, planned in {elapsed * 1000:.1f} ms")
+    print(f"{'step':<16}{'T+':>22}{'dv [m/s]':>10}{'burn [s]':>10}  description")
+    for node in nodes:
+        burn_time = "unknown" if math.isnan(node.burn_time) else f"{node.burn_time:.1f}"
+        print(
+            f"{node.step:<16}{format_time(node.ut - snapshot.ut):>22}"
+            f"{node.delta_v:>10.2f}{burn_time:>10}  {node.description}"
+        )
+    print(f"Total delta-v: {sum(abs(node.delta_v) for node in nodes):.2f} m/s")
+    print(f"Mission duration: {format_time(end.ut - snapshot.ut)}")
+
+
+def run_multi_chaser(args, plan) -> None:
+    pool = ConnectionManager(size=args.pool_size, name=plan.name)
+    if args.trace:
+        tracer.enable(*pool.connections)
+    checkpoint_stem = args.checkpoint.removesuffix(".json")
+    missions = [
+        ChaserMission(
+            chaser_id=chaser,
+            target_id=args.target,
+            plan=plan,
+            checkpoint_path=f"{checkpoint_stem}.{chaser}.json",
+        )
+        for chaser in args.chasers
+    ]
+    try:
+        results = MultiChaserScheduler(pool=pool, missions=missions).run()
+        pool.log_stats()
+    finally:
+        pool.close()
+    for result in results:
+        status = "succeeded" if result.succeeded else f"failed: {result.error}"
+        print(f"{result.chaser_id}: {status} in {result.duration:.0f} s")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,95 @@
+import argparse
+import json
+import sys
+
+from src.helpers.log_helper import latest_log
+from src.gnc.replay import read_telemetry, ReplayStreamHelper, GNCReplay
+from src.initialization.gnc_init import GNCInit
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Re-run the closed loop GNC on a recorded mission log and diff the commands"
+    )
+    parser.add_argument(
+        "log",
+        type=str,
+        nargs="?",
+        help="mission log, default: the log of the latest run",
+        default=None,
+    )
+    parser.add_argument(
+        "--log_dir",
+        type=str,
+        help="directory of the run logs searched for the latest run, default: logs",
+        default="logs",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=str,
+        help="checkpoint file of the flight, to replay with the LQR gains it flew with",
+        default=None,
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        help="largest command difference accepted per axis, default: 0.02",
+        default=0.02,
+    )
+    parser.add_argument(
+        "--recorded_guidance",
+        action="store_true",
+        help="use the logged references instead of recomputing them, to check the controllers only",
+    )
+    parser.add_argument(
+        "--show",
+        type=int,
+        help="number of mismatching cycles to print, default: 10",
+        default=10,
+    )
+    args = parser.parse_args()
+    if args.log is None:
+        args.log = latest_log(args.log_dir)
+
+    telemetry = read_telemetry(args.log)
+    cached_gains = None
+    if args.checkpoint is not None:
+        with open(args.checkpoint, "r") as file:
+            cached_gains = json.load(file).get("gains") or None
+    if telemetry.orbital_rate is None and cached_gains is None:
+        sys.exit(f"No target orbital rate in {args.log}, give the flight --checkpoint")
+
+    stream_helper = ReplayStreamHelper()
+    gnc_helper = GNCInit.init_replay_gnc(
+        orbital_rate=telemetry.orbital_rate,
+        stream_helper=stream_helper,
+        cached_gains=cached_gains,
+    )
+    report = GNCReplay(
+        gnc_helper=gnc_helper,
+        stream_helper=stream_helper,
+        tolerance=args.tolerance,
+        recompute_guidance=not args.recorded_guidance,
+    ).replay(telemetry)
+
+    print(
+        f"Replayed {report.cycles} cycles of {len(telemetry.phases)} phases in {report.elapsed:.2f} s"
+    )
+    print(
+        f"Commands compared: {report.compared}, max error {report.max_error:.3f}, rms error {report.rms_error:.3f}"
+    )
+    if not args.recorded_guidance:
+        print(f"Guidance max error: {report.guidance_max_error:.3f} m, m/s")
+    print(f"Cycles above {args.tolerance} tolerance: {len(report.mismatches)}")
+    for mismatch in report.mismatches[: args.show]:
+        recorded = ", ".join(f"{value:.2f}" for value in mismatch.recorded)
+        replayed = ", ".join(f"{value:.2f}" for value in mismatch.replayed)
+        print(
+            f"  {mismatch.phase} at {mismatch.time:.2f} s: recorded ({recorded}), replayed ({replayed})"
+        )
+    if report.mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
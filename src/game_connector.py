@@ -1,20 +1,21 @@
 import logging
-import krpc
+import threading
 import sys
 
+from src.helpers.stream_helper import StreamRegistry
+from src.helpers.space_center_helper import WarpLock
+from src.helpers.log_helper import LogHelper
+
 
 class KRPCConnector:
     def __init__(self, mission_name="mission name"):
-        logging.basicConfig(
-            filename="rendezvous_docking.log",
-            filemode="w",
-            level=logging.DEBUG,
-            format="%(levelname)s - %(message)s",
-        )
+        log_path = LogHelper.setup(mission_name)
         self.mission_name = mission_name
-        logging.info(f"Log file created. Mission name: {mission_name}")
+        logging.info(f"Log file {log_path} created. Mission name: {mission_name}")
 
-        self.conn = krpc.connect(name=self.mission_name)
+        self.connection_manager = ConnectionManager(size=1, name=self.mission_name)
+        self.conn = self.connection_manager.acquire()
+        self.streams = self.connection_manager.registry(self.conn)
         self.space_center = self.conn.space_center
         self.target = self.get_target_vessel()
         self.chaser = self.conn.space_center.active_vessel
@@ -27,3 +28,105 @@ class KRPCConnector:
         else:
             logging.info("Valid target acquired.")
         return target
+
+
+class ConnectionManager:
+    """Fixed pool of kRPC connections and their stream registries.
+
+    Each mission leases the least used connection, so missions spread evenly
+    over the pool. A kRPC client serializes its own RPCs, and remote objects
+    and streams are bound to the connection that created them, so a mission
+    keeps its connection for its whole lifetime.
+    """
+
+    def __init__(self, size: int = 2, name: str = "mission name"):
+        import krpc
+
+        self.connections = [krpc.connect(name=f"{name} #{i}") for i in range(size)]
+        self.registries = [StreamRegistry(conn) for conn in self.connections]
+        self.leases = [0] * size
+        self.lock = threading.Lock()
+        # time warp is global to the game, missions under control hold it off
+        self.warp_lock = WarpLock()
+
+    def acquire(self):
+        with self.lock:
+            i = self.leases.index(min(self.leases))
+            self.leases[i] += 1
+            return self.connections[i]
+
+    def release(self, conn) -> None:
+        with self.lock:
+            self.leases[self.connections.index(conn)] -= 1
+
+    def registry(self, conn) -> StreamRegistry:
+        return self.registries[self.connections.index(conn)]
+
+    def stats(self) -> dict:
+        with self.lock:
+            leases = list(self.leases)
+        return {
+            "connections": [
+                {"leases": lease, "streams": registry.stats()}
+                for lease, registry in zip(leases, self.registries)
+            ],
+            "streams": sum(len(registry.streams) for registry in self.registries),
+        }
+
+    def log_stats(self) -> None:
+        stats = self.stats()
+        logging.info(
+            f"Connection manager: {len(stats['connections'])} connections, {stats['streams']} streams"
+        )
+        for i, connection in enumerate(stats["connections"]):
+            logging.info(
+                f"Connection {i}: {connection['leases']} leases, streams: {connection['streams']}"
+            )
+
+    def close(self) -> None:
+        for conn in self.connections:
+            conn.close()
+
+
+class VesselPairConnector(KRPCConnector):
+    """Connector for an explicit chaser/target pair on a pooled connection.
+
+    Vessels are identified by name or by kRPC object id, instead of the
+    active vessel and its selected target.
+    """
+
+    def __init__(
+        self,
+        pool: ConnectionManager,
+        chaser_id,
+        target_id,
+        mission_name="mission name",
+    ):
+        LogHelper.setup(mission_name)
+        self.mission_name = mission_name
+        self.pool = pool
+        self.connection_manager = pool
+        LogHelper.chaser_log(chaser_id)
+        self.conn = pool.acquire()
+        try:
+            self.streams = pool.registry(self.conn)
+            self.space_center = self.conn.space_center
+            self.chaser = self.get_vessel(chaser_id)
+            self.target = self.get_vessel(target_id)
+        except Exception:
+            self.release()
+            raise
+        logging.info(
+            f"{mission_name}: chaser {self.chaser.name}, target {self.target.name}"
+        )
+
+    def get_vessel(self, vessel_id):
+        for vessel in self.space_center.vessels:
+            if str(vessel_id) in (vessel.name, str(vessel._object_id)):
+                return vessel
+        logging.critical(f"No vessel found with id {vessel_id}.")
+        raise ValueError(f"No vessel found with id {vessel_id}")
+
+    def release(self) -> None:
+        self.pool.release(self.conn)
+        LogHelper.end_chaser_log()
@@ -0,0 +1,83 @@
+import math
+
+import numpy as np
+
+from src.gnc.guidance.cw_targeting import CWTargeting, UnsafeTrajectoryError
+
+
+class CWSafetyChecker:
+    """Keep-out sphere and approach cone checks of relative trajectories.
+
+    Every sampled state of a trajectory is also propagated thrusters-off
+    (passive abort) over `abort_horizon` seconds with the CW state-transition
+    matrix, all samples in one batch. A state is unsafe when its passive
+    abort enters the keep-out sphere, unless it is already inside the
+    approach cone, where the approach relies on active control. Reference
+    points inside the keep-out sphere must stay inside the cone.
+    """
+
+    def __init__(
+        self,
+        orbital_rate: float,
+        keep_out_radius: float,  # m, 0 disables the checks
+        cone_half_angle: float,  # deg
+        cone_axis: tuple = (0.0, 1.0, 0.0),  # V-bar
+        abort_horizon: float = None,  # s, one target orbit by default
+        abort_samples: int = 64,
+    ) -> None:
+        self.keep_out_radius = keep_out_radius
+        self.cos_cone = math.cos(math.radians(cone_half_angle))
+        self.cone_axis = np.asarray(cone_axis, dtype=float) / np.linalg.norm(cone_axis)
+        horizon = abort_horizon or 2 * math.pi / orbital_rate
+        self.abort_times = np.linspace(0.0, horizon, abort_samples)
+        # blocks are reused by every check, only positions are needed
+        self.rr, self.rv, _, _ = CWTargeting(orbital_rate).stm(self.abort_times)
+
+    @property
+    def enabled(self) -> bool:
+        return self.keep_out_radius > 0
+
+    def inside_cone(self, r: np.ndarray) -> np.ndarray:
+        distance = np.linalg.norm(r, axis=-1)
+        return r @ self.cone_axis >= self.cos_cone * distance
+
+    def abort_positions(self, r: np.ndarray, v: np.ndarray) -> np.ndarray:
+        """Passive abort positions, shape (k, abort_samples, 3), of k states."""
+        return np.einsum("mij,kj->kmi", self.rr, r) + np.einsum(
+            "mij,kj->kmi", self.rv, v
+        )
+
+    def unsafe(self, r, v) -> np.ndarray:
+        """Mask of the states (k, 3) whose passive abort enters the keep-out sphere."""
+        r = np.atleast_2d(np.asarray(r, dtype=float))
+        v = np.atleast_2d(np.asarray(v, dtype=float))
+        abort_distance = np.linalg.norm(self.abort_positions(r, v), axis=-1)
+        enters = (abort_distance < self.keep_out_radius).any(axis=1)
+        return enters & ~self.inside_cone(r)
+
+    def is_safe(self, r, v) -> bool:
+        """Online check of the current state."""
+        return not self.enabled or not self.unsafe(r, v)[0]
+
+    def violations(self, r: np.ndarray, v: np.ndarray) -> list:
+        """Human readable violations of a sampled trajectory, empty when safe."""
+        if not self.enabled:
+            return []
+        violations = []
+        unsafe = self.unsafe(r, v)
+        if unsafe.any():
+            i = int(np.argmax(unsafe))
+            violations.append(
+                f"passive abort from {np.round(r[i], 1).tolist()} m enters the "
+                f"{self.keep_out_radius:.0f} m keep-out sphere "
+                f"({int(unsafe.sum())}/{len(unsafe)} samples)"
+            )
+        inside = np.linalg.norm(r, axis=-1) < self.keep_out_radius
+        outside_cone = inside & ~self.inside_cone(r)
+        if outside_cone.any():
+            i = int(np.argmax(outside_cone))
+            violations.append(
+                f"reference point {np.round(r[i], 1).tolist()} m is inside the "
+                "keep-out sphere but outside the approach cone"
+            )
+        return violations
@@ -0,0 +1,87 @@
+import numpy as np
+
+
+class UnsafeTrajectoryError(RuntimeError):
+    pass
+
+
+class CWTargeting:
+    """Two-impulse transfers between relative positions, from the CW solution.
+
+    States are in the target orbital frame (anti-radial, prograde, normal).
+    The departure velocity reaching `r_f` after `t` seconds is solved from the
+    state-transition matrix, and the arrival impulse nulls the relative
+    velocity at `r_f`. Every function accepts an array of transfer times, so
+    many candidate transfers are solved in one batch.
+    """
+
+    def __init__(self, orbital_rate: float) -> None:
+        self.n = orbital_rate
+
+    def stm(self, t) -> tuple:
+        """Blocks (rr, rv, vr, vv) of the state-transition matrix, shape (k, 3, 3)."""
+        n = self.n
+        t = np.atleast_1d(np.asarray(t, dtype=float))
+        s, c = np.sin(n * t), np.cos(n * t)
+        zero, one = np.zeros_like(t), np.ones_like(t)
+        rr = np.array(
+            [
+                [4 - 3 * c, zero, zero],
+                [6 * (n * t - s), one, zero],
+                [zero, zero, c],
+            ]
+        )
+        rv = np.array(
+            [
+                [s / n, -2 * (1 - c) / n, zero],
+                [2 * (1 - c) / n, 4 * s / n - 3 * t, zero],
+                [zero, zero, s / n],
+            ]
+        )
+        vr = np.array(
+            [
+                [3 * n * s, zero, zero],
+                [6 * n * (1 - c), zero, zero],
+                [zero, zero, -n * s],
+            ]
+        )
+        vv = np.array(
+            [
+                [c, -2 * s, zero],
+                [2 * s, 4 * c - 3, zero],
+                [zero, zero, c],
+            ]
+        )
+        # (3, 3, k) -> (k, 3, 3)
+        return tuple(np.moveaxis(block, -1, 0) for block in (rr, rv, vr, vv))
+
+    def two_impulse(self, r_0, v_0, r_f, t) -> tuple:
+        """Departure and arrival delta-v (m/s), shape (k, 3), for transfer times t.
+
+        Transfer times where the transfer matrix is singular (full orbits
+        in plane, half orbits out of plane) give NaN.
+        """
+        rr, rv, vr, vv = self.stm(t)
+        r_0, v_0, r_f = (np.asarray(value, dtype=float) for value in (r_0, v_0, r_f))
+        singular = np.linalg.cond(rv) > 1e12
+        rv[singular] = np.eye(3)
+        v_departure = np.linalg.solve(rv, (r_f - rr @ r_0)[..., None])[..., 0]
+        v_arrival = vr @ r_0 + (vv @ v_departure[..., None])[..., 0]
+        dv_1 = v_departure - v_0
+        dv_2 = -v_arrival
+        dv_1[singular] = np.nan
+        dv_2[singular] = np.nan
+        return dv_1, dv_2
+
+    def cheapest(self, r_0, v_0, r_f, transfer_times) -> tuple:
+        """Transfer time and impulses with the smallest total delta-v."""
+        transfer_times = np.atleast_1d(np.asarray(transfer_times, dtype=float))
+        dv_1, dv_2 = self.two_impulse(r_0, v_0, r_f, transfer_times)
+        cost = np.linalg.norm(dv_1, axis=1) + np.linalg.norm(dv_2, axis=1)
+        if np.isnan(cost).all():
+            raise UnsafeTrajectoryError(
+                f"No CW transfer to {tuple(r_f)} m for transfer times of "
+                f"{transfer_times.min():.1f} to {transfer_times.max():.1f} s"
+            )
+        i = np.nanargmin(cost)
+        return float(transfer_times[i]), dv_1[i], dv_2[i]
@@ -3,6 +3,7 @@ from abc import ABC, abstractmethod
 from typing import List
 
 from src.gnc.guidance.guidance_profiles import Profile
+from src.helpers.tracer import tracer
 
 
 class Guidance(ABC):
@@ -39,7 +40,7 @@ class SmoothGuidance(Guidance):
             )
             return in_plane, out_of_plane
 
-        return func
+        return tracer.traced("guidance")(func)
 
 
 class CWGuidance(Guidance):
@@ -51,6 +52,7 @@ class CWGuidance(Guidance):
         self,
         initial_pos: tuple,
         initial_vel: tuple,
+        epoch: float = 0.0,  # unused, CW is time invariant
     ):
         (x_0, y_0, z_0) = initial_pos
         (x_dot_0, y_dot_0, z_dot_0) = initial_vel
@@ -79,4 +81,4 @@ class CWGuidance(Guidance):
             z_dot = -self.n * z_0 * sin(self.n * tau) + z_dot_0 * cos(self.n * tau)
             return array([[x], [y], [x_dot], [y_dot]]), array([[z], [z_dot]])
 
-        return func
+        return tracer.traced("guidance")(func)
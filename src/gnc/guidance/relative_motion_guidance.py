@@ -0,0 +1,69 @@
+import numpy as np
+
+from src.gnc.guidance.guidance import Guidance
+from src.gnc.relative_dynamics import RelativeMotionModel
+from src.helpers.tracer import tracer
+
+
+class RelativeMotionGuidance(Guidance):
+    """Free drift references propagated with a RelativeMotionModel.
+
+    Drop-in replacement of CWGuidance. A reference is integrated once, in
+    chunks as later times are asked for, and sampled with cubic Hermite
+    interpolation between integration steps, so evaluating it in the loop
+    costs about as much as the closed form CW solution.
+    """
+
+    def __init__(
+        self,
+        model: RelativeMotionModel,
+        true_anomaly_at,  # ut -> target true anomaly (rad)
+        step: float = 10.0,  # s
+        chunk_steps: int = 60,
+    ) -> None:
+        self.model = model
+        self.true_anomaly_at = true_anomaly_at
+        self.step = step
+        self.chunk_steps = chunk_steps
+
+    def ref_signal(self, initial_pos: tuple, initial_vel: tuple, epoch: float = 0.0):
+        step = self.step
+        samples = [np.array([[*initial_pos, *initial_vel]], dtype=float)]
+
+        def extend(tau: float) -> np.ndarray:
+            while (len(samples[0]) - 1) * step <= tau:
+                t_end = (len(samples[0]) - 1) * step
+                chunk = self.model.propagate(
+                    samples[0][-1],
+                    self.true_anomaly_at(epoch + t_end),
+                    self.chunk_steps * step,
+                    step,
+                )[:, 0]
+                samples[0] = np.concatenate((samples[0], chunk[1:]))
+            return samples[0]
+
+        def func(tau) -> (np.ndarray, np.ndarray):
+            tau = max(float(tau), 0.0)
+            trajectory = extend(tau)
+            i = int(tau // step)
+            s = tau / step - i
+            p_0, v_0 = trajectory[i, :3], trajectory[i, 3:] * step
+            p_1, v_1 = trajectory[i + 1, :3], trajectory[i + 1, 3:] * step
+            pos = (
+                (2 * s**3 - 3 * s**2 + 1) * p_0
+                + (s**3 - 2 * s**2 + s) * v_0
+                + (-2 * s**3 + 3 * s**2) * p_1
+                + (s**3 - s**2) * v_1
+            )
+            vel = (
+                (6 * s**2 - 6 * s) * p_0
+                + (3 * s**2 - 4 * s + 1) * v_0
+                + (-6 * s**2 + 6 * s) * p_1
+                + (3 * s**2 - 2 * s) * v_1
+            ) / step
+            return (
+                np.array([[pos[0]], [pos[1]], [vel[0]], [vel[1]]]),
+                np.array([[pos[2]], [vel[2]]]),
+            )
+
+        return tracer.traced("guidance")(func)
@@ -1,6 +1,7 @@
+import logging
 import numpy as np
-from control.matlab import lqr
 from src.gnc.cw_linear_dynamics import Dynamics
+from src.helpers.tracer import tracer
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
 
@@ -21,15 +22,35 @@ class Control(ABC):
 
 
 class LQRControl:
-    def __init__(self, costs: LQRCost, dynamics: Dynamics) -> None:
-        self.optimal_gain, _, _ = lqr(
-            dynamics.free_dynamics,
-            dynamics.controlled_dynamics,
-            costs.Q * np.eye(dynamics.free_dynamics.shape[0]),
-            costs.R * np.eye(dynamics.controlled_dynamics.shape[1]),
+    def __init__(
+        self, costs: LQRCost, dynamics: Dynamics, optimal_gain: np.ndarray = None
+    ) -> None:
+        self.costs = costs
+        self.dynamics = dynamics
+        # gain cached from a previous solve with the same costs and dynamics
+        self._optimal_gain = (
+            np.asarray(optimal_gain) if optimal_gain is not None else None
         )
-        # print(f"Q matrix: {costs.Q * np.eye(dynamics.free_dynamics.shape[0])}")
-        # print(f"R matrix: {costs.R * np.eye(dynamics.controlled_dynamics.shape[1])}")
 
+    @property
+    def optimal_gain(self) -> np.ndarray:
+        # solved on first use, so that planning-only runs never need it
+        if self._optimal_gain is None:
+            # python-control pulls in scipy and matplotlib, only import it to solve
+            from control.matlab import lqr
+
+            costs, dynamics = self.costs, self.dynamics
+            self._optimal_gain, _, _ = lqr(
+                dynamics.free_dynamics,
+                dynamics.controlled_dynamics,
+                costs.Q * np.eye(dynamics.free_dynamics.shape[0]),
+                costs.R * np.eye(dynamics.controlled_dynamics.shape[1]),
+            )
+            logging.info(f"LQR gain: {self._optimal_gain}")
+            # print(f"Q matrix: {costs.Q * np.eye(dynamics.free_dynamics.shape[0])}")
+            # print(f"R matrix: {costs.R * np.eye(dynamics.controlled_dynamics.shape[1])}")
+        return self._optimal_gain
+
+    @tracer.traced("control")
     def control(self, state: np.ndarray, ref: np.ndarray) -> np.ndarray:
         return -self.optimal_gain @ (state - ref)
@@ -1,6 +1,7 @@
 from numpy import ndarray, array
 from abc import ABC, abstractmethod
 from src.helpers.stream_helper import StreamHelper
+from src.helpers.tracer import tracer
 
 
 class Navigation(ABC):
@@ -16,6 +17,7 @@ class FullKnowledgeNavigation(Navigation):
     def __init__(self, stream_helper: StreamHelper) -> None:
         self.stream_helper = stream_helper
 
+    @tracer.traced("navigation")
     def output(self) -> ndarray:
         in_plane_full_state = array(
             [
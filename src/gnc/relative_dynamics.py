@@ -0,0 +1,155 @@
+import math
+import numpy as np
+
+from src.gnc.cw_linear_dynamics import Dynamics
+from src.gnc.lqr_continuous_ctrl import LQRControl, LQRCost
+from src.physics.integrators import rk4
+
+# relative motion models selectable for the homing guidance and control
+RELATIVE_DYNAMICS = ("cw", "tschauner_hempel", "nonlinear")
+
+
+class RelativeMotionModel:
+    """Relative motion around an eccentric target orbit, beyond CW.
+
+    States are (x, y, z, x_dot, y_dot, z_dot) in the target orbital frame
+    used everywhere else (x towards the body, y along track, z normal).
+    With `linearized` the Tschauner-Hempel equations are used, otherwise the
+    full nonlinear two-body relative equations. The target true anomaly is
+    integrated along with the states, as a last column.
+    """
+
+    def __init__(
+        self,
+        gravitational_parameter: float,
+        semi_major_axis: float,
+        eccentricity: float,
+        linearized: bool = False,
+    ) -> None:
+        self.mu = gravitational_parameter
+        self.e = eccentricity
+        self.p = semi_major_axis * (1 - eccentricity**2)
+        self.h = math.sqrt(self.mu * self.p)
+        self.linearized = linearized
+
+    def target_motion(self, theta) -> tuple:
+        """Target radius, true anomaly rate and acceleration at true anomaly theta."""
+        r_t = self.p / (1 + self.e * np.cos(theta))
+        theta_dot = self.h / r_t**2
+        r_t_dot = math.sqrt(self.mu / self.p) * self.e * np.sin(theta)
+        return r_t, theta_dot, -2 * r_t_dot * theta_dot / r_t
+
+    def derivatives(self, t: float, states: np.ndarray) -> np.ndarray:
+        # equations are written with x radial outwards
+        x, y, z = -states[:, 0], states[:, 1], states[:, 2]
+        x_dot, y_dot, z_dot = -states[:, 3], states[:, 4], states[:, 5]
+        r_t, theta_dot, theta_ddot = self.target_motion(states[:, 6])
+        if self.linearized:
+            k_x, k_yz = 2 * self.mu / r_t**3, -self.mu / r_t**3
+            gravity_x, gravity_y, gravity_z = k_x * x, k_yz * y, k_yz * z
+        else:
+            r_c3 = ((r_t + x) ** 2 + y**2 + z**2) ** 1.5
+            gravity_x = self.mu / r_t**2 - self.mu * (r_t + x) / r_c3
+            gravity_y, gravity_z = -self.mu * y / r_c3, -self.mu * z / r_c3
+        x_ddot = 2 * theta_dot * y_dot + theta_ddot * y + theta_dot**2 * x + gravity_x
+        y_ddot = -2 * theta_dot * x_dot - theta_ddot * x + theta_dot**2 * y + gravity_y
+        return np.stack(
+            (
+                -x_dot,
+                y_dot,
+                z_dot,
+                -x_ddot,
+                y_ddot,
+                gravity_z,
+                theta_dot,
+            ),
+            axis=1,
+        )
+
+    def propagate(
+        self, states, theta_0, duration: float, dt: float = 10.0
+    ) -> np.ndarray:
+        """States (k, 6) after `duration` s from target true anomalies theta_0.
+
+        Returns the trajectories at every step, shape (steps + 1, k, 6).
+        """
+        states = np.atleast_2d(np.asarray(states, dtype=float))
+        theta_0 = np.broadcast_to(np.asarray(theta_0, dtype=float), len(states))
+        steps = max(1, math.ceil(duration / dt))
+        augmented = np.column_stack((states, theta_0))
+        trajectory, _ = rk4(self.derivatives, 0.0, augmented, duration / steps, steps)
+        return trajectory[..., :6]
+
+    def free_dynamics(self, theta: float) -> np.ndarray:
+        """Tschauner-Hempel state matrix (6, 6), frozen at true anomaly theta."""
+        r_t, theta_dot, theta_ddot = self.target_motion(theta)
+        k = self.mu / r_t**3
+        a = np.zeros((6, 6))
+        a[:3, 3:] = np.eye(3)
+        # rows and columns of x are negated, x points towards the body
+        a[3, 0] = theta_dot**2 + 2 * k
+        a[3, 1] = -theta_ddot
+        a[3, 4] = -2 * theta_dot
+        a[4, 0] = theta_ddot
+        a[4, 1] = theta_dot**2 - k
+        a[4, 3] = 2 * theta_dot
+        a[5, 2] = -k
+        return a
+
+
+class EccentricInPlaneDynamics(Dynamics):
+    def __init__(self, model: RelativeMotionModel, true_anomaly: float) -> None:
+        self.a = model.free_dynamics(true_anomaly)
+
+    @property
+    def free_dynamics(self) -> np.ndarray:
+        return self.a[np.ix_((0, 1, 3, 4), (0, 1, 3, 4))]
+
+    @property
+    def controlled_dynamics(self) -> np.ndarray:
+        return np.array([[0, 0], [0, 0], [1, 0], [0, 1]])
+
+
+class EccentricOutOfPlaneDynamics(Dynamics):
+    def __init__(self, model: RelativeMotionModel, true_anomaly: float) -> None:
+        self.a = model.free_dynamics(true_anomaly)
+
+    @property
+    def free_dynamics(self) -> np.ndarray:
+        return self.a[np.ix_((2, 5), (2, 5))]
+
+    @property
+    def controlled_dynamics(self) -> np.ndarray:
+        return np.array([[0], [1]])
+
+
+class GainSchedule:
+    """Homing LQR controllers scheduled by the target true anomaly.
+
+    The Tschauner-Hempel state matrix changes along an eccentric orbit, so
+    controllers are designed at `points` evenly spaced true anomalies and
+    the one nearest to the current anomaly flies. Gains are solved on first
+    use, only the anomalies a homing goes through cost a solve.
+    """
+
+    def __init__(
+        self,
+        model: RelativeMotionModel,
+        true_anomaly_at,  # ut -> target true anomaly (rad)
+        costs: LQRCost,
+        points: int = 36,
+    ) -> None:
+        self.true_anomaly_at = true_anomaly_at
+        self.spacing = 2 * math.pi / points
+        self.controllers = [
+            (
+                LQRControl(costs, EccentricInPlaneDynamics(model, i * self.spacing)),
+                LQRControl(costs, EccentricOutOfPlaneDynamics(model, i * self.spacing)),
+            )
+            for i in range(points)
+        ]
+
+    def controllers_at(self, ut: float) -> tuple:
+        """In plane and out of plane controllers at game time ut."""
+        theta = self.true_anomaly_at(ut) % (2 * math.pi)
+        return self.controllers[round(theta / self.spacing) % len(self.controllers)]
@@ -0,0 +1,278 @@
+import bisect
+import math
+import time
+import numpy as np
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from src.helpers.log_helper import read_lines
+from src.initialization.gnc_init import GNCHelper
+
+
+@dataclass
+class RecordedCycle:
+    time: float  # s, game time, or time since the burn during homing
+    nav: tuple  # (x, y, z, x_dot, y_dot, z_dot) in the target orbital frame
+    guid: Optional[tuple] = None  # reference as logged
+    control: Optional[tuple] = None  # orbital frame command, then body frame
+
+
+@dataclass
+class RecordedLeg:
+    t_0: float  # s
+    p_i: tuple  # m
+    final_state: tuple  # m
+    duration: float  # s, 0 while braking, the reference follows the chaser
+
+
+@dataclass
+class RecordedPhase:
+    name: str
+    cycles: List[RecordedCycle] = field(default_factory=list)
+    # closed loop proximity maneuvers, replanned after holds and retreats
+    legs: List[RecordedLeg] = field(default_factory=list)
+    homing: dict = field(default_factory=dict)  # y_i and delta_h of the transfer
+
+
+@dataclass
+class Telemetry:
+    orbital_rate: Optional[float]  # rad/s, of the target
+    phases: List[RecordedPhase]
+
+
+def values(line: str) -> tuple:
+    return tuple(map(float, line.split(",")[1:]))
+
+
+def read_telemetry(path: str = "rendezvous_docking.log") -> Telemetry:
+    """Navigation, guidance and control samples of each phase of a mission log.
+
+    The rotated parts of the log are read first, so a run is read whole.
+    """
+    orbital_rate = None
+    phases = []
+    phase = None
+    for line in read_lines(path):
+        if not line.startswith("INFO - "):
+            # close range legs brake before holding
+            if line.startswith("WARNING - Leg state") and phase and phase.cycles:
+                if line.split(":")[0].endswith("-> brake"):
+                    nav = phase.cycles[-1]
+                    phase.legs.append(RecordedLeg(nav.time, nav.nav[:3], (), 0.0))
+            continue
+        message = line[7:].strip()
+        if message.startswith("Nav,"):
+            if phase is not None:
+                nav = values(message)
+                phase.cycles.append(RecordedCycle(time=nav[0], nav=nav[1:]))
+        elif message.startswith("Guid,"):
+            if phase is not None and phase.cycles:
+                phase.cycles[-1].guid = values(message)
+        elif message.startswith("Control,"):
+            if phase is not None and phase.cycles:
+                phase.cycles[-1].control = values(message)
+        elif message.startswith("====="):
+            name = message.strip("= ")
+            # phases end with "... finished" or "End of ..."
+            if name.endswith("finished") or name.startswith("End of"):
+                phase = None
+            else:
+                phase = RecordedPhase(name=name)
+                phases.append(phase)
+        elif message.startswith("Leg,") and phase is not None:
+            leg = values(message)
+            phase.legs.append(RecordedLeg(leg[0], leg[1:4], leg[4:7], leg[7]))
+        elif message.startswith("Target orbital rate:"):
+            orbital_rate = float(message.split(":")[1].split()[0])
+        elif phase is None:
+            continue
+        elif message.startswith("Initial position for maneuver in prograde"):
+            phase.homing["y_i"] = float(message.split("=")[1].split()[0])
+        elif message.startswith("Altitude difference ="):
+            phase.homing["delta_h"] = float(message.split("=")[1].split()[0])
+    return Telemetry(
+        orbital_rate=orbital_rate,
+        phases=[phase for phase in phases if phase.cycles],
+    )
+
+
+class ReplayStreamHelper:
+    """Recorded navigation samples served like the StreamHelper streams.
+
+    Navigation built on it outputs the sample of the current cycle, so
+    FullKnowledgeNavigation runs unchanged on recorded data.
+    """
+
+    def __init__(self) -> None:
+        self.cycle = None
+
+    def ut(self) -> float:
+        return self.cycle.time
+
+    def rel_pos(self) -> tuple:
+        return self.cycle.nav[:3]
+
+    def rel_vel(self) -> tuple:
+        return self.cycle.nav[3:]
+
+
+@dataclass
+class Mismatch:
+    phase: str
+    time: float  # s
+    recorded: tuple  # orbital frame command
+    replayed: tuple
+
+
+@dataclass
+class ReplayReport:
+    cycles: int = 0
+    compared: int = 0  # cycles with a recorded command
+    max_error: float = 0.0  # largest command component difference
+    sum_squared_error: float = 0.0
+    guidance_max_error: float = 0.0  # recomputed against recorded references
+    mismatches: List[Mismatch] = field(default_factory=list)
+    elapsed: float = 0.0  # s
+
+    @property
+    def rms_error(self) -> float:
+        return math.sqrt(self.sum_squared_error / max(3 * self.compared, 1))
+
+
+class GNCReplay:
+    """Offline re-run of the closed loop GNC on recorded telemetry.
+
+    Navigation samples are fed through the stream helper the GNC objects
+    were built with, and the guidance and controllers run as fast as they
+    can. References are recomputed from the logged close range legs and
+    homing transfer, or taken from the log otherwise or when only the
+    controllers are checked (targeting legs and docking port approaches log
+    no closed loop commands). Commands are compared with the recorded ones
+    in the target orbital frame, the body frame depends on the attitude,
+    which is not recorded.
+    """
+
+    def __init__(
+        self,
+        gnc_helper: GNCHelper,
+        stream_helper: ReplayStreamHelper,
+        tolerance: float = 0.02,  # logged commands are rounded to 0.01
+        recompute_guidance: bool = True,
+    ) -> None:
+        self.gnc_helper = gnc_helper
+        self.stream_helper = stream_helper
+        self.tolerance = tolerance
+        self.recompute_guidance = recompute_guidance
+
+    def close_range_references(self, legs: List[RecordedLeg]):
+        guidance = self.gnc_helper.smooth_guidance
+        ref_signal = guidance.ref_signal()
+        starts = [leg.t_0 for leg in legs]
+        flown = [None]
+
+        def references(cycle: RecordedCycle) -> tuple:
+            # the latest leg started by this cycle
+            leg = legs[max(bisect.bisect_right(starts, cycle.time) - 1, 0)]
+            if not leg.duration:
+                return self.recorded_references(cycle)
+            if leg is not flown[0]:
+                for i, profile in enumerate(guidance.profiles):
+                    profile.config_profile(
+                        p_i=leg.p_i[i], p_f=leg.final_state[i], duration=leg.duration
+                    )
+                flown[0] = leg
+            return ref_signal(tau=min((cycle.time - leg.t_0) / leg.duration, 1))
+
+        return references
+
+    def homing_references(self, y_i: float, delta_h: float):
+        w = self.gnc_helper.orbital_rate
+        half_period = math.pi / w
+        ref_signal = self.gnc_helper.homing_guidance.ref_signal(
+            initial_pos=(abs(delta_h), y_i, 0),
+            initial_vel=(0, 7 * w / 4 * abs(delta_h), 0),
+        )
+        # held at its last value once the circularization is due
+        held = [None]
+
+        def references(cycle: RecordedCycle) -> tuple:
+            if held[0] is None or cycle.time <= half_period:
+                held[0] = ref_signal(min(cycle.time, half_period))
+            return held[0]
+
+        return references
+
+    @staticmethod
+    def recorded_references(cycle: RecordedCycle) -> Optional[tuple]:
+        guid = cycle.guid
+        if guid is None:
+            return None
+        if len(guid) == 4:
+            # homing logs the in-plane reference only, it starts in the plane
+            return np.array(guid).reshape(4, 1), np.zeros((2, 1))
+        _, x, y, z, x_dot, y_dot, z_dot = guid
+        return (
+            np.array([[x], [y], [x_dot], [y_dot]]),
+            np.array([[z], [z_dot]]),
+        )
+
+    def phase_references(self, phase: RecordedPhase):
+        if not self.recompute_guidance:
+            return self.recorded_references
+        if phase.legs:
+            return self.close_range_references(phase.legs)
+        if {
+            "y_i",
+            "delta_h",
+        } <= phase.homing.keys() and self.gnc_helper.relative_dynamics == "cw":
+            return self.homing_references(**phase.homing)
+        return self.recorded_references
+
+    def replay_phase(self, phase: RecordedPhase, report: ReplayReport) -> None:
+        references = self.phase_references(phase)
+        navigation = self.gnc_helper.navigation
+        in_plane_controller = self.gnc_helper.in_plane_controller
+        out_of_plane_controller = self.gnc_helper.out_of_plane_controller
+        for cycle in phase.cycles:
+            report.cycles += 1
+            self.stream_helper.cycle = cycle
+            x, z = navigation.output()
+            refs = references(cycle)
+            if refs is None:
+                continue
+            in_plane_ref, out_of_plane_ref = refs
+            recorded_refs = self.recorded_references(cycle)
+            if recorded_refs is not None and references != self.recorded_references:
+                report.guidance_max_error = max(
+                    report.guidance_max_error,
+                    float(np.max(np.abs(in_plane_ref - recorded_refs[0]))),
+                )
+            if cycle.control is None:
+                continue
+            U_LVLH = in_plane_controller.control(state=x, ref=in_plane_ref)
+            U_Z = out_of_plane_controller.control(state=z, ref=out_of_plane_ref)
+            U = (float(U_LVLH[0][0]), float(U_LVLH[1][0]), float(U_Z[0][0]))
+            errors = np.abs(np.subtract(U, cycle.control[:3]))
+            report.compared += 1
+            report.max_error = max(report.max_error, float(errors.max()))
+            report.sum_squared_error += float(errors @ errors)
+            if errors.max() > self.tolerance:
+                report.mismatches.append(
+                    Mismatch(
+                        phase=phase.name,
+                        time=cycle.time,
+                        recorded=cycle.control[:3],
+                        replayed=U,
+                    )
+                )
+
+    def replay(self, telemetry: Telemetry) -> ReplayReport:
+        report = ReplayReport()
+        # gains are solved before timing the replay
+        self.gnc_helper.in_plane_controller.optimal_gain
+        self.gnc_helper.out_of_plane_controller.optimal_gain
+        t_start = time.perf_counter()
+        for phase in telemetry.phases:
+            self.replay_phase(phase, report)
+        report.elapsed = time.perf_counter() - t_start
+        return report
@@ -1,51 +1,90 @@
-import time
 import logging
 
 from src.helpers.space_center_helper import SpaceCenterHelper
+from src.helpers.vessel_control_helper import VesselControlHelper
 
 
 class AttCtrlHelper:
-    def __init__(self, vessel, space_center_helper: SpaceCenterHelper):
-        self.vessel = vessel
+    """SAS and autopilot modes applied without fixed sleeps.
+
+    Mode changes are skipped when already active and only requested here;
+    `VesselControlHelper.confirm` later waits for the game to report them, so
+    planning work can run in between. The autopilot likewise settles in the
+    background between `point_at` and `wait_settled`.
+    """
+
+    def __init__(
+        self,
+        vessel_control_helper: VesselControlHelper,
+        space_center_helper: SpaceCenterHelper,
+        settle_timeout: float = 60.0,  # s
+    ):
+        self.vessel_control_helper = vessel_control_helper
         self.space_center_helper = space_center_helper
+        self.settle_timeout = settle_timeout
+        self.autopilot_engaged = False
+        self.autopilot_frame = None
 
     def enable_sas(self) -> None:
-        self.vessel.control.sas = True
-        time.sleep(1)
+        self.vessel_control_helper.request("sas", True)
         logging.info("SAS enabled")
 
     def disable_sas(self) -> None:
-        self.vessel.control.sas = False
-        time.sleep(1)
+        self.vessel_control_helper.request("sas", False)
         logging.info("SAS disabled")
 
     def change_sas_mode(self, mode) -> None:
-        if self.vessel.control.sas:
-            self.vessel.control.sas_mode = self.space_center_helper.sas_mode(mode)
+        # the game only accepts a SAS mode once SAS is on
+        self.vessel_control_helper.confirm("sas")
+        if self.vessel_control_helper.get("sas"):
+            self.vessel_control_helper.request(
+                "sas_mode", self.space_center_helper.sas_mode(mode)
+            )
             logging.info(f"SAS mode changed to {mode}")
         else:
-            pass  # TODO raise exception
+            logging.warning(f"SAS is off, mode {mode} not applied")
 
-    def orient_vessel(self, direction: tuple) -> None:
-        ap = self.vessel.auto_pilot
-        rf = self.vessel.orbit.body.reference_frame
+    def point_at(self, direction: tuple, reference_frame=None) -> None:
+        """Engage the autopilot towards `direction` and return immediately.
 
-        ap.reference_frame = rf
-        ap.engage()
-        time.sleep(0.1)
-        logging.info("Autopilot engaged")
+        The direction is given in the orbited body frame unless another
+        reference frame is passed.
+        """
+        ap = self.vessel_control_helper.get("auto_pilot")
+        frame = reference_frame or self.vessel_control_helper.get(
+            "body_reference_frame"
+        )
+        if frame != self.autopilot_frame:
+            ap.reference_frame = self.autopilot_frame = frame
+        if not self.autopilot_engaged:
+            ap.engage()
+            self.autopilot_engaged = True
+            logging.info("Autopilot engaged")
         ap.target_direction = direction
-        # ap.target_direction = self.vessel.control.nodes[0].remaining_burn_vector(rf)
-        time.sleep(0.1)
-        ap.wait()
-        time.sleep(0.1)
+
+    def wait_settled(self, tolerance: float = 0.5) -> bool:  # deg
+        settled = self.vessel_control_helper.wait_for(
+            "autopilot_error",
+            lambda error: error <= tolerance,
+            self.settle_timeout,
+            fresh=True,
+        )
         logging.info("Finished autopilot wait")
-        while ap.error > 0.5:  # deg
-            pass
-        ap.disengage()
-        time.sleep(0.1)
-        logging.info("Autopilot disengaged")
+        return settled
+
+    def release_autopilot(self) -> None:
+        if self.autopilot_engaged:
+            self.vessel_control_helper.get("auto_pilot").disengage()
+            self.autopilot_engaged = False
+            logging.info("Autopilot disengaged")
+
+    def orient_vessel(self, direction: tuple) -> None:
+        self.point_at(direction)
+        self.wait_settled()
+        self.release_autopilot()
 
     def change_speed_mode(self, mode) -> None:
-        self.vessel.control.speed_mode = self.space_center_helper.speed_mode(mode)
+        self.vessel_control_helper.request(
+            "speed_mode", self.space_center_helper.speed_mode(mode)
+        )
         logging.info(f"Speed mode changed to {mode}")
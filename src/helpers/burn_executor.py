@@ -0,0 +1,95 @@
+import time
+import logging
+
+from src.physics.orb_dyn_utils import OrbitalDynamicsUtils
+from src.helpers.stream_helper import StreamHelper
+from src.helpers.vessel_control_helper import VesselControlHelper
+
+
+class BurnExecutor:
+    """Main engine burn with a locally predicted cutoff.
+
+    Mass, thrust, isp and the node remaining delta-v are streamed, so a
+    flameout is seen during the burn. The throttle is updated at a fixed
+    rate from the rocket equation, tapered during the last `taper_time`
+    seconds, and the cutoff is commanded at the predicted instant minus the
+    measured command latency. The latency is
+    measured in wall clock time and subtracted from game time, which holds
+    because burns are flown without time warp (the warp scheduler stops
+    warping before the burn starts). The burn ends early, with a warning,
+    when no thrust is left (flameout or staging).
+    """
+
+    def __init__(
+        self,
+        vessel_control_helper: VesselControlHelper,
+        stream_helper: StreamHelper,
+        orb_dyn: OrbitalDynamicsUtils,
+        control_rate: float = 20.0,  # Hz
+        taper_time: float = 1.0,  # s
+        min_throttle: float = 0.05,
+    ) -> None:
+        self.vessel_control_helper = vessel_control_helper
+        self.stream_helper = stream_helper
+        self.orb_dyn = orb_dyn
+        self.period = 1.0 / control_rate
+        self.taper_time = taper_time
+        self.min_throttle = min_throttle
+        self.latency = 0.0  # s, running average of throttle command round trips
+
+    def set_throttle(self, throttle: float) -> None:
+        t_start = time.perf_counter()
+        self.vessel_control_helper.set("throttle", throttle)
+        self.latency = 0.8 * self.latency + 0.2 * (time.perf_counter() - t_start)
+
+    def throttle_and_time_to_go(self, remaining_dv: float) -> tuple:
+        """Throttle and time to cutoff, (0, None) without thrust."""
+        thrust = self.vessel_control_helper.get("available_thrust")
+        isp = self.vessel_control_helper.get("specific_impulse")
+        if thrust <= 0 or isp <= 0:
+            return 0.0, None
+        t_full = self.orb_dyn.burn_time(
+            delta_v=remaining_dv,
+            mass=self.vessel_control_helper.get("mass"),
+            isp=isp,
+            thrust=thrust,
+        )
+        if t_full > self.taper_time:
+            return 1.0, t_full
+        throttle = max(self.min_throttle, t_full / self.taper_time)
+        return throttle, t_full / throttle
+
+    def execute(self, node) -> float:
+        """Burn until the node is done, return the signed residual delta-v."""
+        remaining_delta_v = self.stream_helper.node_stream(node, "remaining_delta_v")
+        throttle = None
+        next_tick = time.perf_counter()
+        try:
+            while True:
+                new_throttle, t_go = self.throttle_and_time_to_go(remaining_delta_v())
+                if t_go is None:
+                    logging.warning(
+                        f"No thrust available, burn ended with {remaining_delta_v():.2f} m/s left"
+                    )
+                    break
+                if t_go <= self.period + self.latency:
+                    # last tick: hold the throttle until the predicted cutoff instant
+                    t_cut = self.stream_helper.ut() + t_go - self.latency
+                    while self.stream_helper.ut() < t_cut:
+                        pass
+                    break
+                if new_throttle != throttle:
+                    throttle = new_throttle
+                    self.set_throttle(throttle)
+                next_tick += self.period
+                time.sleep(max(0.0, next_tick - time.perf_counter()))
+        finally:
+            self.set_throttle(0.0)
+        time.sleep(0.1)
+        # burn vector is along +y of the node frame, negative means over-burn
+        residual = node.remaining_burn_vector(node.reference_frame)[1]
+        logging.info(
+            f"Burn residual dv = {residual:.3f} m/s, command latency = {self.latency * 1000:.1f} ms"
+        )
+        self.stream_helper.release_node_streams(node, ("remaining_delta_v",))
+        return residual
@@ -0,0 +1,119 @@
+import logging
+import numpy as np
+
+from src.helpers.stream_helper import StreamHelper
+from src.helpers.vessel_control_helper import VesselControlHelper
+
+
+def rotation_matrix(quaternion: tuple) -> np.ndarray:
+    """Rotation matrix of a kRPC (x, y, z, w) quaternion."""
+    x, y, z, w = quaternion
+    return np.array(
+        [
+            [1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)],
+            [2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)],
+            [2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)],
+        ]
+    )
+
+
+class DockingPortHelper:
+    """Port-to-port relative state of the chaser, computed locally.
+
+    The ports are chosen once per approach and their offsets read once:
+    ports are rigid, so only the chaser position, velocity and rotation in
+    the target vessel frame are streamed. The port-to-port state is expressed
+    in the target port frame, whose y axis points out of the port, and
+    control accelerations are rotated back to the chaser body frame with the
+    same streamed rotation, without frame transform RPCs.
+    """
+
+    def __init__(
+        self,
+        chaser,
+        target,
+        stream_helper: StreamHelper,
+        vessel_control_helper: VesselControlHelper,
+        space_center,
+    ) -> None:
+        self.chaser = chaser
+        self.target = target
+        self.stream_helper = stream_helper
+        self.vessel_control_helper = vessel_control_helper
+        self.space_center = space_center
+        self.chaser_port = None
+        self.target_port = None
+        self.previous_controlling = None
+        self.streams = None
+        self.chaser_rotation = np.eye(3)
+
+    def free_port(self, vessel, tag: str = None):
+        ready = self.space_center.DockingPortState.ready
+        for port in vessel.parts.docking_ports:
+            if port.state == ready and (tag is None or port.part.tag == tag):
+                return port
+        return None
+
+    def ports_available(self, chaser_tag: str = None, target_tag: str = None) -> bool:
+        return (
+            self.free_port(self.chaser, chaser_tag) is not None
+            and self.free_port(self.target, target_tag) is not None
+        )
+
+    def select_ports(self, chaser_tag: str = None, target_tag: str = None) -> None:
+        """Control from a free chaser port and cache both port offsets."""
+        self.chaser_port = self.free_port(self.chaser, chaser_tag)
+        self.target_port = self.free_port(self.target, target_tag)
+        if self.chaser_port is None or self.target_port is None:
+            raise RuntimeError("No free docking port on the chaser or the target")
+
+        # the vessel frame follows the controlling part
+        self.previous_controlling = self.chaser.parts.controlling
+        self.chaser.parts.controlling = self.chaser_port.part
+        self.vessel_control_helper.invalidate("available_rcs_force")
+
+        self.chaser_offset = np.array(
+            self.chaser_port.position(self.chaser.reference_frame)
+        )
+        target_frame = self.target.reference_frame
+        self.target_offset = np.array(self.target_port.position(target_frame))
+        # target vessel frame -> target port frame
+        self.target_port_rotation = rotation_matrix(
+            self.target_port.rotation(target_frame)
+        ).T
+        self.streams = self.stream_helper.target_frame_streams()
+        logging.info(
+            f"Docking from port {self.chaser_port.part.title} to port {self.target_port.part.title}"
+        )
+
+    def port_state(self) -> tuple:
+        """Chaser port position and velocity (m, m/s) in the target port frame.
+
+        Attitudes are held during the approach, so the port velocity is taken
+        as the chaser centre of mass velocity.
+        """
+        position, velocity, rotation = (stream() for stream in self.streams)
+        self.chaser_rotation = rotation_matrix(rotation)
+        port_position = np.array(position) + self.chaser_rotation @ self.chaser_offset
+        return (
+            self.target_port_rotation @ (port_position - self.target_offset),
+            self.target_port_rotation @ np.array(velocity),
+        )
+
+    def port_to_body(self, vector) -> tuple:
+        """Rotate a target port frame vector to the chaser body frame."""
+        body = self.chaser_rotation.T @ (self.target_port_rotation.T @ vector)
+        return tuple(float(value) for value in body)
+
+    def docked(self) -> bool:
+        return self.chaser_port.state == self.space_center.DockingPortState.docked
+
+    def release(self) -> None:
+        if self.streams is not None:
+            self.stream_helper.release_target_frame_streams()
+            self.streams = None
+        # once docked the chaser is part of the target vessel, keep its control point
+        if self.previous_controlling is not None and not self.docked():
+            self.chaser.parts.controlling = self.previous_controlling
+            self.previous_controlling = None
+            self.vessel_control_helper.invalidate("available_rcs_force")
@@ -0,0 +1,186 @@
+import os
+import re
+import sys
+import copy
+import glob
+import gzip
+import queue
+import atexit
+import shutil
+import logging
+import platform
+import threading
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+LOG_FILE = "rendezvous_docking.log"
+LOG_FORMAT = "%(levelname)s - %(message)s"
+
+
+def compress_rotated(source: str, dest: str) -> None:
+    with open(source, "rb") as file, gzip.open(dest, "wb") as compressed:
+        shutil.copyfileobj(file, compressed)
+    os.remove(source)
+
+
+def latest_log(log_dir: str = "logs") -> str:
+    """Log of the most recent run, or the log of the working directory."""
+    runs = glob.glob(os.path.join(log_dir, "*", "*", LOG_FILE))
+    return max(runs, key=os.path.getmtime) if runs else LOG_FILE
+
+
+def log_parts(path: str) -> list:
+    """Files of the run logged to `path`, the rotated ones first, oldest first."""
+    if path.endswith(".gz"):
+        return [path]
+    numbered = re.compile(re.escape(os.path.basename(path)) + r"\.(\d+)\.gz$")
+    parts = []
+    for part in glob.glob(glob.escape(path) + ".*.gz"):
+        match = numbered.match(os.path.basename(part))
+        if match:
+            parts.append((int(match.group(1)), part))
+    return [part for _, part in sorted(parts, reverse=True)] + [path]
+
+
+def read_lines(path: str):
+    """Lines of a run log, read across its rotated parts."""
+    for part in log_parts(path):
+        # rotated logs are gzipped
+        with (gzip.open if part.endswith(".gz") else open)(part, "rt") as file:
+            yield from file
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Queues the records unformatted, the listener thread formats them."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # QueueHandler.prepare would format on the logging thread
+        return copy.copy(record)
+
+
+class HeaderRotatingFileHandler(RotatingFileHandler):
+    """Size capped log whose every file starts with the run metadata."""
+
+    def __init__(self, filename: str, header: list, **kwargs) -> None:
+        self.header = header
+        super().__init__(filename, **kwargs)
+        self.write_header()
+
+    def write_header(self) -> None:
+        for line in self.header:
+            self.stream.write(f"# {line}\n")
+        self.flush()
+
+    def doRollover(self) -> None:
+        super().doRollover()
+        self.write_header()
+
+
+class LogHelper:
+    """Mission log in its own run directory, written off the control thread.
+
+    Each run logs to logs/<mission>/<start time>/rendezvous_docking.log,
+    so previous runs are kept. The file rotates when it reaches `max_bytes`
+    and rotated files are gzipped, keeping `backup_count` of them. Records
+    are put on a queue by the logging calls and formatted and written by a
+    QueueListener thread, so a slow disk never holds the GNC loop.
+
+    Chasers flown concurrently each log to <chaser>/rendezvous_docking.log
+    in the run directory: records are stamped with the chaser of the
+    thread that logs them and routed on the listener thread.
+    """
+
+    listener = None
+    path = None
+    context = threading.local()  # chaser flown by the thread
+    chaser_paths = {}  # chaser -> log path
+    lock = threading.Lock()
+
+    @classmethod
+    def file_handler(cls, path: str, header: list) -> HeaderRotatingFileHandler:
+        file_handler = HeaderRotatingFileHandler(
+            path,
+            header=[*cls.header, *header],
+            maxBytes=cls.max_bytes,
+            backupCount=cls.backup_count,
+        )
+        file_handler.namer = lambda name: f"{name}.gz"
+        file_handler.rotator = compress_rotated
+        file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        return file_handler
+
+    @classmethod
+    def stamp(cls, record: logging.LogRecord) -> bool:
+        record.chaser = getattr(cls.context, "chaser", None)
+        return True
+
+    @classmethod
+    def setup(
+        cls,
+        mission_name: str,
+        log_dir: str = "logs",
+        max_bytes: int = 50 * 2**20,
+        backup_count: int = 10,
+    ) -> str:
+        # missions flown concurrently share the log of the first one
+        if cls.listener is not None:
+            return cls.path
+        run_dir = os.path.join(
+            log_dir,
+            "".join(c if c.isalnum() or c in "-_" else "_" for c in mission_name),
+            datetime.now().strftime("%Y%m%d-%H%M%S"),
+        )
+        os.makedirs(run_dir, exist_ok=True)
+        cls.run_dir = run_dir
+        cls.path = os.path.join(run_dir, LOG_FILE)
+        cls.max_bytes = max_bytes
+        cls.backup_count = backup_count
+        cls.header = [
+            f"Mission name: {mission_name}",
+            f"Started: {datetime.now().isoformat(timespec='seconds')}",
+            f"Command line: {' '.join(sys.argv)}",
+            f"Python {platform.python_version()} on {platform.platform()}",
+        ]
+        file_handler = cls.file_handler(cls.path, [])
+        # records of the chasers go to their own logs
+        file_handler.addFilter(lambda record: record.chaser is None)
+
+        records = queue.SimpleQueue()
+        queue_handler = DeferredQueueHandler(records)
+        queue_handler.addFilter(cls.stamp)
+        root = logging.getLogger()
+        root.setLevel(logging.DEBUG)
+        root.addHandler(queue_handler)
+        cls.listener = QueueListener(records, file_handler)
+        cls.listener.start()
+        atexit.register(cls.stop)
+        return cls.path
+
+    @classmethod
+    def chaser_log(cls, chaser: str) -> str:
+        """Routes the records of the calling thread to the log of the chaser."""
+        chaser = "".join(c if c.isalnum() or c in "-_" else "_" for c in str(chaser))
+        with cls.lock:
+            if chaser not in cls.chaser_paths and cls.listener is not None:
+                os.makedirs(os.path.join(cls.run_dir, chaser), exist_ok=True)
+                path = os.path.join(cls.run_dir, chaser, LOG_FILE)
+                file_handler = cls.file_handler(path, [f"Chaser: {chaser}"])
+                file_handler.addFilter(lambda record: record.chaser == chaser)
+                cls.listener.handlers = (*cls.listener.handlers, file_handler)
+                cls.chaser_paths[chaser] = path
+        cls.context.chaser = chaser
+        return cls.chaser_paths.get(chaser)
+
+    @classmethod
+    def end_chaser_log(cls) -> None:
+        cls.context.chaser = None
+
+    @classmethod
+    def stop(cls) -> None:
+        """Writes the queued records and closes the log."""
+        if cls.listener is not None:
+            cls.listener.stop()
+            for handler in cls.listener.handlers:
+                handler.close()
+            cls.listener = None
+            cls.chaser_paths = {}
@@ -1,69 +1,89 @@
 import math
 import logging
-import time
 
 from src.physics.orb_dyn_utils import OrbitalDynamicsUtils, CelestialBodyParameters
+from src.physics.mission_snapshot import MissionSnapshot, PlannedNode
 from src.helpers.stream_helper import StreamHelper
+from src.helpers.vessel_control_helper import VesselControlHelper
 from src.helpers.att_ctrl_helper import AttCtrlHelper
 from src.helpers.space_center_helper import SpaceCenterHelper
 from src.helpers.rcs_ctrl_helper import RCSCtrlHelper
+from src.helpers.burn_executor import BurnExecutor
+from src.helpers.warp_scheduler import WarpScheduler
 
 
 class NodeHelper:
     def __init__(
         self,
-        vessel,
+        vessel_control_helper: VesselControlHelper,
         orb_dyn: OrbitalDynamicsUtils,
         params: CelestialBodyParameters,
         stream_helper: StreamHelper,
         space_center_helper: SpaceCenterHelper,
         att_ctrl_helper: AttCtrlHelper,
         rcs_ctrl_helper: RCSCtrlHelper,
+        burn_executor: BurnExecutor,
+        warp_scheduler: WarpScheduler,
     ) -> None:
-        self.vessel = vessel
+        self.vessel_control_helper = vessel_control_helper
         self.orb_dyn = orb_dyn
         self.params = params
         self.stream_helper = stream_helper
         self.space_center_helper = space_center_helper
         self.att_ctrl_helper = att_ctrl_helper
         self.rcs_ctrl_helper = rcs_ctrl_helper
+        self.burn_executor = burn_executor
+        self.warp_scheduler = warp_scheduler
 
     @property
     def next_node_burn_time(self) -> float:
-        vessel = self.vessel
-        node = vessel.control.nodes[0]
+        node = self.vessel_control_helper.next_node()
 
-        mass = vessel.mass
-        isp = vessel.specific_impulse
-        dv = node.delta_v
-        avail_thrust = vessel.available_thrust
-        g = self.params.body_surface_gravity
-
-        burn_time = (mass - (mass / math.exp(dv / (isp * g)))) / (
-            avail_thrust / (isp * g)
+        return self.orb_dyn.burn_time(
+            delta_v=node.delta_v,
+            mass=self.vessel_control_helper.get("mass"),
+            isp=self.vessel_control_helper.get("specific_impulse"),
+            thrust=self.vessel_control_helper.get("available_thrust"),
         )
-        return burn_time
 
-    def plan_and_execute_node(
+    def plan_node(
         self,
+        snapshot: MissionSnapshot,
+        step: str,
         radii: float,
+        current_semi_maj_ax: float,
         new_semi_maj_ax: float,
-        time: float,
-        absolute: bool = False,
+        ut: float,
         direction: str = "prograde",
-    ) -> None:
+        description: str = "",
+    ) -> PlannedNode:
+        """Plan a node locally, without touching the vessel."""
         dv = self.orb_dyn.delta_v(
             radii=radii,
-            current_semi_major_axis=self.vessel.orbit.semi_major_axis,
+            current_semi_major_axis=current_semi_maj_ax,
             new_semi_major_axis=new_semi_maj_ax,
         )
-        self.add_node(
-            dv=dv,
-            time=time,
-            absolute=absolute,
+        return PlannedNode(
+            step=step,
+            ut=ut,
+            delta_v=dv,
             direction=direction,
+            burn_time=self.orb_dyn.burn_time(
+                delta_v=dv,
+                mass=snapshot.mass,
+                isp=snapshot.specific_impulse,
+                thrust=snapshot.available_thrust,
+            ),
+            description=description,
         )
 
+    def execute_planned_node(self, planned_node: PlannedNode) -> None:
+        self.add_node(
+            dv=planned_node.delta_v,
+            time=planned_node.ut,
+            absolute=True,
+            direction=planned_node.direction,
+        )
         self.execute_next_node()
 
     def add_node(
@@ -76,95 +96,87 @@ class NodeHelper:
         if not absolute:
             time += self.stream_helper.ut()
         if direction == "prograde":
-            self.vessel.control.add_node(time, prograde=dv)
+            self.vessel_control_helper.add_node(time, prograde=dv)
         elif direction == "normal":
-            self.vessel.control.add_node(time, normal=dv)
+            self.vessel_control_helper.add_node(time, normal=dv)
         elif direction == "radial":
-            self.vessel.control.add_node(time, radial=dv)
+            self.vessel_control_helper.add_node(time, radial=dv)
         else:
             raise ValueError("Invalid direction")
         logging.info(
             f"Maneuver node with delta V = {dv:.2f} m/s added in the {direction} direction"
         )
 
-    def thrust_controller(self) -> float:
-        TWR = self.vessel.available_thrust / self.vessel.mass
-        remain_dv = self.vessel.control.nodes[0].remaining_delta_v
-        if remain_dv / TWR > 1:
-            return 1.0
-        else:
-            return math.log10(remain_dv / TWR * 9 + 1)
-
-    def rcs_node_execution(self) -> None:
+    def rcs_node_execution(self, max_duration: float = 60.0) -> None:  # s
         logging.info("----- Node execution - with RCS ------")
 
         self.att_ctrl_helper.enable_sas()
         self.att_ctrl_helper.change_sas_mode("Prograde")
         self.rcs_ctrl_helper.enable_rcs()
 
-        node = self.vessel.control.nodes[0]
-        burn_direction = node.direction(self.vessel.reference_frame)  # unit vector
-
-        if self.stream_helper.ut() < node.ut - 30:
-            self.space_center_helper.warp_time(
-                node.ut - 30,
-                absolute=True,
-            )
+        node = self.vessel_control_helper.next_node()
+        burn_direction = node.direction(
+            self.vessel_control_helper.get("reference_frame")
+        )  # unit vector
+        remaining_delta_v = self.stream_helper.node_stream(node, "remaining_delta_v")
+        self.vessel_control_helper.confirm()
 
-        while self.stream_helper.ut() < node.ut - 5:
-            pass
+        self.warp_scheduler.warp_to(node.ut, lead_time=30)
 
-        previous = node.remaining_delta_v + 1
+        with self.warp_scheduler.active_control():
+            while self.stream_helper.ut() < node.ut - 5:
+                pass
 
-        while node.remaining_delta_v > 0.1:  # and node.remaining_delta_v <= previous:
-            self.vessel.control.right = burn_direction[0]
-            self.vessel.control.forward = burn_direction[1]
-            self.vessel.control.up = -burn_direction[2]
-            previous = node.remaining_delta_v
+            self.rcs_ctrl_helper.set_translation(
+                burn_direction[0], burn_direction[1], -burn_direction[2]
+            )
+            burn_end = self.stream_helper.ut() + max_duration
+            while remaining_delta_v() > 0.1:
+                if self.stream_helper.ut() > burn_end:
+                    logging.warning(
+                        f"RCS burn stopped after {max_duration:.0f} s with {remaining_delta_v():.2f} m/s left"
+                    )
+                    break
 
-        self.vessel.control.right = 0.0
-        self.vessel.control.forward = 0.0
-        self.vessel.control.up = 0.0
+            self.rcs_ctrl_helper.set_translation(0.0, 0.0, 0.0)
 
         logging.info("Burn completed")
         logging.info("----- End of node execution -----")
-        node.remove()
+        self.stream_helper.release_node_streams(node, ("remaining_delta_v",))
+        self.vessel_control_helper.remove_node(node)
 
     def execute_next_node(self) -> None:
         logging.info("----- Node execution ------")
-        node = self.vessel.control.nodes[0]
-        rf = self.vessel.orbit.body.reference_frame
-
-        self.att_ctrl_helper.orient_vessel(direction=node.remaining_burn_vector(rf))
-        self.att_ctrl_helper.enable_sas()
-        self.att_ctrl_helper.change_sas_mode("Maneuver")
+        node = self.vessel_control_helper.next_node()
+        rf = self.vessel_control_helper.get("body_reference_frame")
 
+        # the vessel turns while the burn is timed
+        self.att_ctrl_helper.point_at(direction=node.remaining_burn_vector(rf))
         next_node_burn_time = self.next_node_burn_time
         logging.info(f"Nominal burn time: {next_node_burn_time} s")
 
-        not_warped_time_before_burn = 5.0
-        self.space_center_helper.warp_time(
-            node.ut - (next_node_burn_time / 2.0) - not_warped_time_before_burn,
-            absolute=True,
-        )
-        while node.time_to > (next_node_burn_time / 2.0):
-            pass
+        self.att_ctrl_helper.wait_settled()
+        self.att_ctrl_helper.release_autopilot()
+        self.att_ctrl_helper.enable_sas()
+        self.att_ctrl_helper.change_sas_mode("Maneuver")
+        self.vessel_control_helper.confirm()
 
-        previous = node.remaining_delta_v + 1
-        while node.remaining_delta_v > 0.1:  # and node.remaining_delta_v <= previous:
-            self.vessel.control.throttle = self.thrust_controller()
-            # previous = node.remaining_delta_v
+        not_warped_time_before_burn = 5.0
+        if math.isnan(next_node_burn_time):
+            logging.warning("No main engine thrust, the burn starts at the node")
+            next_node_burn_time = 0.0
+        burn_start = node.ut - next_node_burn_time / 2.0
+        self.warp_scheduler.warp_to(burn_start, lead_time=not_warped_time_before_burn)
+        with self.warp_scheduler.active_control():
+            while self.stream_helper.ut() < burn_start:
+                pass
 
-        self.vessel.control.throttle = 0.0
-        time.sleep(0.1)
-        logging.info(
-            f"remaining dv = {node.remaining_delta_v}, throttle = {self.vessel.control.throttle}"
-        )
+            self.burn_executor.execute(node)
 
         logging.info("Burn completed")
 
         self.att_ctrl_helper.change_sas_mode("Stability Assist")
-        node.remove()
+        self.vessel_control_helper.remove_node(node)
 
         logging.info("Maneuver node removed")
         logging.info("----- End of node execution -----")
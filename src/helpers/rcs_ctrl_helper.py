@@ -2,60 +2,65 @@ import time
 import logging
 
 from src.helpers.space_center_helper import SpaceCenterHelper
+from src.helpers.vessel_control_helper import VesselControlHelper
+from src.helpers.tracer import tracer
 
 
 class RCSCtrlHelper:
-    def __init__(self, vessel, space_center_helper: SpaceCenterHelper) -> None:
-        self.vessel = vessel
+    def __init__(
+        self,
+        vessel_control_helper: VesselControlHelper,
+        space_center_helper: SpaceCenterHelper,
+    ) -> None:
+        self.vessel_control_helper = vessel_control_helper
         self.space_center_helper = space_center_helper
 
     def enable_rcs(self) -> None:
-        self.vessel.control.rcs = True
-        time.sleep(1)
+        self.vessel_control_helper.request("rcs", True)
+        # the available force depends on the RCS state
+        self.vessel_control_helper.invalidate("available_rcs_force")
         logging.info("RCS activated")
 
     def disable_rcs(self) -> None:
-        self.vessel.control.rcs = False
-        time.sleep(1)
+        self.vessel_control_helper.request("rcs", False)
+        self.vessel_control_helper.invalidate("available_rcs_force")
         logging.info("RCS deactivated")
 
     def compute_available_acceleration(self) -> (tuple, tuple):
         # Unpack the tuples
-        tuple1, tuple2 = self.vessel.available_rcs_force
+        tuple1, tuple2 = self.vessel_control_helper.get("available_rcs_force")
+        if not any(tuple1 + tuple2):
+            # read before the RCS was applied, not kept so the next call re-reads it
+            self.vessel_control_helper.invalidate("available_rcs_force")
+        mass = self.vessel_control_helper.get("mass")
 
         # Divide elements in inner tuples by the divisor
-        right_forward_bottom = tuple(value / self.vessel.mass for value in tuple1)
-        left_backward_up = tuple(value / self.vessel.mass for value in tuple2)
+        right_forward_bottom = tuple(value / mass for value in tuple1)
+        left_backward_up = tuple(value / mass for value in tuple2)
 
         return (right_forward_bottom, left_backward_up)
 
+    @tracer.traced("actuation")
     def rcs_actuation(self, U_BODY: tuple) -> None:
         # available_acceleration = tuple(
         #     element / self.vessel.mass for element in self.vessel.available_rcs_force
         # )
         available_acceleration = self.compute_available_acceleration()
 
-        controls = [
-            self.vessel.control.right,
-            self.vessel.control.forward,
-            self.vessel.control.up,
-        ]
+        controls = [0.0, 0.0, 0.0]
         u_values = [
             U_BODY[0],
             U_BODY[1],
             -U_BODY[2],
         ]
         for i in range(3):
-            if u_values[i] >= 0:
-                controls[i] = u_values[i] / abs(available_acceleration[0][i])
-            else:
-                controls[i] = u_values[i] / abs(available_acceleration[1][i])
+            available = abs(available_acceleration[0 if u_values[i] >= 0 else 1][i])
+            if available > 0:
+                controls[i] = u_values[i] / available
+            elif u_values[i] != 0:
+                logging.warning(f"No RCS force available on axis {i}")
 
-        (
-            self.vessel.control.right,
-            self.vessel.control.forward,
-            self.vessel.control.up,
-        ) = controls
+        self.set_translation(*controls)
 
         # if U_BODY[0] >= 0:
         #     self.vessel.control.right = U_BODY[0] / abs(
@@ -84,3 +89,33 @@ class RCSCtrlHelper:
         #     self.vessel.control.up = -U_BODY[2] / abs(
         #         available_acceleration[0][2]  # bottom
         #     )
+
+    def rcs_impulse(self, delta_v: tuple, min_duration: float = 0.2) -> None:
+        """Apply a body frame delta-v with the RCS, blocking for the burn.
+
+        The axis needing the longest firing runs at full thrust, the others
+        are scaled so that all axes stop together.
+        """
+        available_acceleration = self.compute_available_acceleration()
+        u_values = [delta_v[0], delta_v[1], -delta_v[2]]
+        duration = max(
+            [min_duration]
+            + [
+                abs(u_values[i]) / abs(available)
+                for i in range(3)
+                if (
+                    available := available_acceleration[0 if u_values[i] >= 0 else 1][i]
+                )
+            ]
+        )
+        stream_helper = self.vessel_control_helper.stream_helper
+        t_end = stream_helper.ut() + duration
+        self.rcs_actuation(tuple(value / duration for value in delta_v))
+        while stream_helper.ut() < t_end:
+            time.sleep(0.01)
+        self.set_translation(0.0, 0.0, 0.0)
+
+    def set_translation(self, right: float, forward: float, up: float) -> None:
+        self.vessel_control_helper.set("right", right)
+        self.vessel_control_helper.set("forward", forward)
+        self.vessel_control_helper.set("up", up)
@@ -1,31 +1,88 @@
-import logging
+import math
+import threading
+from contextlib import contextmanager
+
 from src.helpers.stream_helper import StreamHelper
+from src.helpers.tracer import tracer
 
 
-class SpaceCenterHelper:
-    def __init__(self, space_center, stream: StreamHelper):
-        self.space_center = space_center
-        self.stream = stream
+class WarpLock:
+    """Rails warp of one game, shared by the missions flown in it.
+
+    Time warp is global, so a mission warps only while no other mission is
+    under active control (closed loop legs, burns, docking), and taking
+    control waits for a warp in progress to stop. Any number of missions
+    can be under control at once. Missions waiting to warp are served
+    earliest event first, and a warp in progress stops at the event of a
+    mission that asks to warp or to take control meanwhile, so no mission
+    is warped past its own event.
+    """
 
-    def warp_time(self, warping_time: float, absolute: bool = False) -> None:
-        starting_time = self.stream.ut()
+    def __init__(self) -> None:
+        self.condition = threading.Condition()
+        self.warping = False
+        self.controlling = {}  # thread id -> nested control sections
+        self.waiting_controls = 0
+        self.deadlines = {}  # thread id -> ut a waiting or warping mission warps to
 
-        if absolute:
-            final_time = warping_time
-            duration = final_time - starting_time
-        else:
-            duration = warping_time
-            final_time = starting_time + duration
+    def held(self) -> bool:
+        """True when the calling thread is under active control."""
+        with self.condition:
+            return threading.get_ident() in self.controlling
 
-        logging.info(f"Warping {duration} s. Warping to time {final_time} s.")
+    @contextmanager
+    def control(self):
+        thread = threading.get_ident()
+        with self.condition:
+            self.waiting_controls += 1
+            while self.warping:
+                self.condition.wait()
+            self.waiting_controls -= 1
+            self.controlling[thread] = self.controlling.get(thread, 0) + 1
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.controlling[thread] -= 1
+                if self.controlling[thread] == 0:
+                    del self.controlling[thread]
+                self.condition.notify_all()
 
-        self.space_center.warp_to(final_time)
-        while self.stream.ut() < final_time:
-            pass
-        logging.info("Finished warping time")
+    @contextmanager
+    def warp(self, final_time: float):
+        thread = threading.get_ident()
+        with self.condition:
+            self.deadlines[thread] = final_time
+            while (
+                self.warping
+                or self.controlling
+                or self.waiting_controls
+                or final_time > min(self.deadlines.values())
+            ):
+                self.condition.wait()
+            self.warping = True
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.warping = False
+                del self.deadlines[thread]
+                self.condition.notify_all()
 
-    def warp_factor(self, warp_factor: int = 2) -> None:
-        self.space_center.rails_warp_factor = warp_factor
+    def stop_time(self, final_time: float) -> float:
+        """Game time the warp in progress stops at, -inf when control is waiting."""
+        with self.condition:
+            if self.waiting_controls:
+                return -math.inf
+            return min(final_time, *self.deadlines.values())
+
+
+class SpaceCenterHelper:
+    def __init__(self, space_center, stream: StreamHelper, warp_lock: WarpLock = None):
+        self.space_center = space_center
+        self.stream = stream
+        # shared between missions of one game, since time warp is global
+        self.warp_lock = warp_lock or WarpLock()
 
     def speed_mode(self, mode: str) -> None:
         if mode == "Target":
@@ -57,5 +114,6 @@ class SpaceCenterHelper:
         elif mode == "Anti-Radial":
             return self.space_center.SASMode.anti_radial
 
+    @tracer.traced("frame transform")
     def transform_position(self, vector: tuple, from_frame, to_frame) -> tuple:
         return self.space_center.transform_position(vector, from_frame, to_frame)
@@ -1,5 +1,138 @@
+import threading
+
+
+class StreamRegistry:
+    """Named, reference counted kRPC streams of one connection.
+
+    Several helpers asking for the same name share one stream, which is
+    removed when its last user releases it. A stream runs at the highest
+    rate any of its users asked for (0 means every physics tick).
+    """
+
+    def __init__(self, conn) -> None:
+        self.conn = conn
+        self.streams = {}  # name -> [stream, reference count, rate]
+        self.lock = threading.Lock()
+
+    def acquire(self, name: str, func, *args, rate: float = 0):
+        with self.lock:
+            if name in self.streams:
+                entry = self.streams[name]
+                entry[1] += 1
+                if entry[2] != 0 and (rate == 0 or rate > entry[2]):
+                    entry[0].rate = entry[2] = rate
+                return entry[0]
+            stream = self.conn.add_stream(func, *args)
+            stream.rate = rate
+            self.streams[name] = [stream, 1, rate]
+            return stream
+
+    def release(self, name: str) -> None:
+        with self.lock:
+            entry = self.streams.get(name)
+            if entry is None:
+                return
+            entry[1] -= 1
+            if entry[1] == 0:
+                entry[0].remove()
+                del self.streams[name]
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                name: {"references": references, "rate": rate}
+                for name, (_, references, rate) in self.streams.items()
+            }
+
+
 class StreamHelper:
-    def __init__(self, conn, chaser, target):
-        self.ut = conn.add_stream(getattr, conn.space_center, "ut")
-        self.rel_pos = conn.add_stream(chaser.position, target.orbital_reference_frame)
-        self.rel_vel = conn.add_stream(chaser.velocity, target.orbital_reference_frame)
+    # stream name -> (object path, attribute, rate in Hz)
+    catalog = {
+        "mass": ("chaser", "mass", 10),
+        # change on flameout and staging, burns must see it
+        "available_thrust": ("chaser", "available_thrust", 10),
+        "specific_impulse": ("chaser", "specific_impulse", 10),
+        "sas": ("chaser.control", "sas", 10),
+        "rcs": ("chaser.control", "rcs", 10),
+        "sas_mode": ("chaser.control", "sas_mode", 10),
+        "speed_mode": ("chaser.control", "speed_mode", 10),
+        "autopilot_error": ("chaser.auto_pilot", "error", 20),
+        "chaser_radius": ("chaser.orbit", "radius", 1),
+        "chaser_semi_major_axis": ("chaser.orbit", "semi_major_axis", 1),
+        "target_radius": ("target.orbit", "radius", 1),
+        "target_period": ("target.orbit", "period", 1),
+    }
+
+    def __init__(self, conn, chaser, target, registry: StreamRegistry = None):
+        self.chaser = chaser
+        self.target = target
+        self.registry = registry or StreamRegistry(conn)
+        # streams are per vessel, so names are prefixed with the chaser id
+        self.prefix = f"{chaser._object_id}."
+        self.ut = self.registry.acquire("ut", getattr, conn.space_center, "ut")
+        self.rel_pos = self.registry.acquire(
+            f"{self.prefix}rel_pos", chaser.position, target.orbital_reference_frame
+        )
+        self.rel_vel = self.registry.acquire(
+            f"{self.prefix}rel_vel", chaser.velocity, target.orbital_reference_frame
+        )
+        self.named = {}
+
+    def stream(self, name: str):
+        if name not in self.named:
+            path, attribute, rate = self.catalog[name]
+            obj = self
+            for part in path.split("."):
+                obj = getattr(obj, part)
+            self.named[name] = self.registry.acquire(
+                f"{self.prefix}{name}", getattr, obj, attribute, rate=rate
+            )
+        return self.named[name]
+
+    def get(self, name: str):
+        return self.stream(name)()
+
+    def node_stream(self, node, attribute: str, rate: float = 0):
+        return self.registry.acquire(
+            f"node.{node._object_id}.{attribute}", getattr, node, attribute, rate=rate
+        )
+
+    def release_node_streams(self, node, attributes: tuple) -> None:
+        for attribute in attributes:
+            self.registry.release(f"node.{node._object_id}.{attribute}")
+
+    def resource_stream(self, resource: str, rate: float = 1):
+        """Amount of a resource left in the whole chaser, in units."""
+        return self.registry.acquire(
+            f"{self.prefix}resource.{resource}",
+            self.chaser.resources.amount,
+            resource,
+            rate=rate,
+        )
+
+    def release_resource_stream(self, resource: str) -> None:
+        self.registry.release(f"{self.prefix}resource.{resource}")
+
+    def target_frame_streams(self) -> tuple:
+        """Chaser position, velocity and rotation in the target vessel frame."""
+        frame = self.target.reference_frame
+        return tuple(
+            self.registry.acquire(f"{self.prefix}target_frame.{name}", func, frame)
+            for name, func in (
+                ("position", self.chaser.position),
+                ("velocity", self.chaser.velocity),
+                ("rotation", self.chaser.rotation),
+            )
+        )
+
+    def release_target_frame_streams(self) -> None:
+        for name in ("position", "velocity", "rotation"):
+            self.registry.release(f"{self.prefix}target_frame.{name}")
+
+    def release(self) -> None:
+        for name in self.named:
+            self.registry.release(f"{self.prefix}{name}")
+        self.named = {}
+        self.registry.release(f"{self.prefix}rel_pos")
+        self.registry.release(f"{self.prefix}rel_vel")
+        self.registry.release("ut")
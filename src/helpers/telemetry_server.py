@@ -0,0 +1,134 @@
+import json
+import socket
+import logging
+import threading
+from collections import deque
+
+# log messages streamed to dashboards, prefix -> sample kind
+SAMPLE_PREFIXES = {
+    "Nav,": "nav",
+    "Guid,": "guid",
+    "Control,": "control",
+    "Port nav,": "port_nav",
+    "Port control,": "port_control",
+}
+
+
+def parse_message(message: str) -> dict:
+    """JSON-ready sample of a log message, numbers for GNC samples."""
+    if message.startswith("====="):
+        return {"kind": "phase", "name": message.strip("= ")}
+    for prefix, kind in SAMPLE_PREFIXES.items():
+        if message.startswith(prefix):
+            return {
+                "kind": kind,
+                "values": [float(value) for value in message.split(",")[1:]],
+            }
+    return {"kind": "message", "text": message}
+
+
+class Subscriber:
+    """Bounded queue of one client, the oldest samples are dropped when full."""
+
+    def __init__(self, connection: socket.socket, queue_size: int) -> None:
+        self.connection = connection
+        self.queue = deque(maxlen=queue_size)
+        self.ready = threading.Event()
+        self.dropped = 0
+        self.closed = False
+
+    def put(self, message: str) -> None:
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+        self.queue.append(message)
+        self.ready.set()
+
+    def send_loop(self) -> None:
+        # runs in its own thread, a slow client only ever blocks itself
+        try:
+            while not self.closed:
+                self.ready.wait()
+                self.ready.clear()
+                while self.queue:
+                    sample = parse_message(self.queue.popleft())
+                    self.connection.sendall((json.dumps(sample) + "\n").encode())
+        except OSError:
+            pass
+        finally:
+            self.closed = True
+            self.connection.close()
+
+    def close(self) -> None:
+        self.closed = True
+        self.ready.set()
+
+
+class TelemetryServer(logging.Handler):
+    """Streams decimated GNC samples of the log to local TCP subscribers.
+
+    Attached to the root logger, it sees every Nav, Guid and Control line of
+    the control loop. Only every `decimation`-th navigation cycle is kept,
+    with the guidance and control that follow it. Messages are queued raw
+    in a bounded queue per subscriber and parsed and sent from the
+    subscriber thread, so publishing costs the control loop a prefix check
+    and a deque append. Samples are sent as JSON lines.
+    """
+
+    def __init__(
+        self,
+        port: int = 8765,  # 0 picks a free port
+        host: str = "127.0.0.1",
+        decimation: int = 5,
+        queue_size: int = 1000,
+    ) -> None:
+        super().__init__(level=logging.INFO)
+        self.decimation = decimation
+        self.queue_size = queue_size
+        self.subscribers = []
+        self.subscribers_lock = threading.Lock()
+        self.cycles = 0
+        self.publishing = True
+        self.listener = socket.create_server((host, port))
+        self.port = self.listener.getsockname()[1]
+        threading.Thread(target=self.accept_loop, daemon=True).start()
+        logging.info(f"Telemetry server listening on {host}:{self.port}")
+
+    def accept_loop(self) -> None:
+        while True:
+            try:
+                connection, address = self.listener.accept()
+            except OSError:
+                return
+            subscriber = Subscriber(connection, self.queue_size)
+            with self.subscribers_lock:
+                self.subscribers.append(subscriber)
+            threading.Thread(target=subscriber.send_loop, daemon=True).start()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if not self.subscribers:
+            return
+        message = record.getMessage()
+        if message.startswith(("Nav,", "Port nav,")):
+            self.cycles += 1
+            self.publishing = self.cycles % self.decimation == 0
+        if not self.publishing and message.startswith(tuple(SAMPLE_PREFIXES)):
+            return
+        for subscriber in self.subscribers:
+            subscriber.put(message)
+        if any(subscriber.closed for subscriber in self.subscribers):
+            with self.subscribers_lock:
+                self.subscribers = [s for s in self.subscribers if not s.closed]
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self.subscribers),
+            "dropped": sum(subscriber.dropped for subscriber in self.subscribers),
+        }
+
+    def close(self) -> None:
+        self.listener.close()
+        with self.subscribers_lock:
+            for subscriber in self.subscribers:
+                subscriber.close()
+            self.subscribers = []
+        super().close()
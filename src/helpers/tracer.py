@@ -0,0 +1,154 @@
+import time
+import logging
+import threading
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+NULL_CONTEXT = nullcontext()
+
+
+class StageStats:
+    """Histogram of one stage, in power of two buckets."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self.buckets = {}  # bit length -> count, values below 2**bit_length
+
+    def add(self, value: int) -> None:
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        bucket = value.bit_length()
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def percentile(self, q: float) -> int:
+        """Upper bound of the bucket holding the q-th percentile."""
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= q * self.count:
+                return 2**bucket
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(0.5),
+            "p99": self.percentile(0.99),
+            "max": self.max,
+        }
+
+
+class Tracer:
+    """Per-stage timings of the GNC loop, off unless enabled.
+
+    Stages are timed with perf_counter_ns and kept per thread, so chasers
+    flown concurrently report separately. RPCs are counted per control
+    cycle when a connection is given to `enable`. Disabled, a traced call
+    costs one attribute check.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.local = threading.local()
+
+    def enable(self, *connections) -> None:
+        self.enabled = True
+        for conn in connections:
+            self.count_rpcs(conn)
+
+    def count_rpcs(self, conn) -> None:
+        invoke = conn._invoke
+
+        @wraps(invoke)
+        def counted(*args, **kwargs):
+            self.local.rpcs = getattr(self.local, "rpcs", 0) + 1
+            return invoke(*args, **kwargs)
+
+        conn._invoke = counted
+
+    @property
+    def stats(self) -> dict:
+        if not hasattr(self.local, "stats"):
+            self.local.stats = {}
+        return self.local.stats
+
+    def record(self, name: str, value: int) -> None:
+        stats = self.stats
+        if name not in stats:
+            stats[name] = StageStats()
+        stats[name].add(value)
+
+    @contextmanager
+    def timed(self, name: str):
+        t_start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter_ns() - t_start)
+
+    def stage(self, name: str):
+        """Context manager timing the enclosed block as `name`."""
+        if not self.enabled:
+            return NULL_CONTEXT
+        return self.timed(name)
+
+    def traced(self, name: str):
+        """Decorator timing every call of the function as `name`."""
+
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                t_start = time.perf_counter_ns()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter_ns() - t_start)
+
+            return wrapper
+
+        return decorator
+
+    @contextmanager
+    def timed_cycle(self):
+        rpcs_start = getattr(self.local, "rpcs", 0)
+        t_start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record("cycle", time.perf_counter_ns() - t_start)
+            self.record("rpcs per cycle", getattr(self.local, "rpcs", 0) - rpcs_start)
+
+    def cycle(self):
+        """Context manager around one control cycle, timing it and counting its RPCs."""
+        if not self.enabled:
+            return NULL_CONTEXT
+        return self.timed_cycle()
+
+    def report(self, title: str) -> dict:
+        """Log the stage histograms collected since the last report and reset."""
+        if not self.enabled:
+            return {}
+        report = {name: stats.summary() for name, stats in self.stats.items()}
+        del self.local.stats
+        logging.info(f"===== Performance report: {title} =====")
+        for name, summary in report.items():
+            if name == "rpcs per cycle":
+                logging.info(
+                    f"Perf, {name}, n={summary['count']}, mean={summary['mean']:.1f}, max={summary['max']}"
+                )
+                continue
+            logging.info(
+                f"Perf, {name}, n={summary['count']}, mean={summary['mean'] / 1000:.1f} us, "
+                f"p50<{summary['p50'] / 1000:.1f} us, p99<{summary['p99'] / 1000:.1f} us, "
+                f"max={summary['max'] / 1000:.1f} us"
+            )
+        return report
+
+
+tracer = Tracer()
@@ -0,0 +1,95 @@
+import time
+import logging
+
+from src.helpers.space_center_helper import SpaceCenterHelper
+from src.helpers.stream_helper import StreamHelper
+from src.helpers.vessel_control_helper import VesselControlHelper
+
+# game seconds per real second of each rails warp factor
+RAILS_WARP_RATES = (1, 5, 10, 50, 100, 1000, 10000, 100000)
+
+
+class WarpScheduler:
+    """Rails warp to a locally predicted event time.
+
+    The highest warp factor allowed by the game is used as long as at least
+    `step_down_time` real seconds at that rate remain before the event, so
+    the warp steps down on its own as the event approaches. Pending attitude
+    and RCS mode changes are confirmed before warping starts. Warps of the
+    missions sharing a game are coordinated by its WarpLock.
+    """
+
+    def __init__(
+        self,
+        space_center_helper: SpaceCenterHelper,
+        stream_helper: StreamHelper,
+        vessel_control_helper: VesselControlHelper,
+        step_down_time: float = 1.0,  # s
+        poll_period: float = 0.05,  # s
+    ) -> None:
+        self.space_center_helper = space_center_helper
+        self.space_center = space_center_helper.space_center
+        self.stream_helper = stream_helper
+        self.vessel_control_helper = vessel_control_helper
+        self.step_down_time = step_down_time
+        self.poll_period = poll_period
+
+    def safe_factor(self, remaining: float, current: int) -> int:
+        factor = 0
+        for i, rate in enumerate(RAILS_WARP_RATES):
+            if rate * self.step_down_time <= remaining:
+                factor = i
+        # the altitude limit only matters when warping faster
+        if factor > current:
+            factor = max(
+                current, min(factor, self.space_center.maximum_rails_warp_factor)
+            )
+        return factor
+
+    def warp_to(self, ut: float, lead_time: float = 0.0) -> None:
+        """Warp until `lead_time` seconds before `ut`, at 1x from then on.
+
+        Warping waits while other missions of the game are under active
+        control, and pauses at the events of other missions on the way.
+        """
+        final_time = ut - lead_time
+        remaining = final_time - self.stream_helper.ut()
+        if remaining <= 0:
+            return
+        warp_lock = self.space_center_helper.warp_lock
+        if warp_lock.held():
+            # waiting for the warp lock here would wait for this mission itself
+            logging.warning(f"Not warping {remaining:.1f} s under active control")
+            return
+        self.vessel_control_helper.confirm()
+        logging.info(f"Warping {remaining:.1f} s. Warping to time {final_time:.2f} s.")
+
+        t_start = time.perf_counter()
+        while remaining > 0:
+            with warp_lock.warp(final_time):
+                self.rails_warp(final_time)
+            remaining = final_time - self.stream_helper.ut()
+        logging.info(
+            f"Finished warping time in {time.perf_counter() - t_start:.1f} s wall clock"
+        )
+
+    def rails_warp(self, final_time: float) -> None:
+        """Warp towards `final_time` until another mission needs the game at 1x."""
+        warp_lock = self.space_center_helper.warp_lock
+        factor = 0
+        remaining = warp_lock.stop_time(final_time) - self.stream_helper.ut()
+        while remaining > 0:
+            new_factor = self.safe_factor(remaining, factor)
+            if new_factor != factor:
+                self.space_center.rails_warp_factor = factor = new_factor
+            time.sleep(min(self.poll_period, remaining))
+            remaining = warp_lock.stop_time(final_time) - self.stream_helper.ut()
+        if factor != 0:
+            self.space_center.rails_warp_factor = 0
+        # the game ramps the rate down over a few frames
+        while self.space_center.warp_rate > 1:
+            time.sleep(0.02)
+
+    def active_control(self):
+        """Context in which the vessel is actively controlled, no mission warps."""
+        return self.space_center_helper.warp_lock.control()
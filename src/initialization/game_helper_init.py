@@ -1,10 +1,14 @@
 from src.physics.orb_dyn_utils import OrbitalDynamicsUtils, CelestialBodyParameters
 from src.helpers.stream_helper import StreamHelper
-from src.helpers.space_center_helper import SpaceCenterHelper
+from src.helpers.space_center_helper import SpaceCenterHelper, WarpLock
 from src.helpers.att_ctrl_helper import AttCtrlHelper
 from src.helpers.rcs_ctrl_helper import RCSCtrlHelper
 from src.helpers.node_helper import NodeHelper
-from src.game_connector import KRPCConnector
+from src.helpers.vessel_control_helper import VesselControlHelper
+from src.helpers.burn_executor import BurnExecutor
+from src.helpers.warp_scheduler import WarpScheduler
+from src.helpers.docking_port_helper import DockingPortHelper
+from src.game_connector import KRPCConnector, VesselPairConnector
 
 
 class GameHelper:
@@ -19,6 +23,9 @@ class GameHelper:
         space_center_helper: SpaceCenterHelper,
         att_ctrl_helper: AttCtrlHelper,
         rcs_ctrl_helper: RCSCtrlHelper,
+        vessel_control_helper: VesselControlHelper,
+        warp_scheduler: WarpScheduler,
+        docking_port_helper: DockingPortHelper,
     ):
         self.chaser = chaser
         self.target = target
@@ -29,16 +36,26 @@ class GameHelper:
         self.space_center_helper = space_center_helper
         self.att_ctrl_helper = att_ctrl_helper
         self.rcs_ctrl_helper = rcs_ctrl_helper
+        self.vessel_control_helper = vessel_control_helper
+        self.warp_scheduler = warp_scheduler
+        self.docking_port_helper = docking_port_helper
 
 
 class GameHelperInit:
     @classmethod
-    def game_helper_init(cls, connector: KRPCConnector) -> GameHelper:
+    def game_helper_init(
+        cls, connector: KRPCConnector, warp_lock: WarpLock = None
+    ) -> GameHelper:
         stream_helper = StreamHelper(
-            conn=connector.conn, chaser=connector.chaser, target=connector.target
+            conn=connector.conn,
+            chaser=connector.chaser,
+            target=connector.target,
+            registry=connector.streams,
         )
         space_center_helper = SpaceCenterHelper(
-            space_center=connector.space_center, stream=stream_helper
+            space_center=connector.space_center,
+            stream=stream_helper,
+            warp_lock=warp_lock,
         )
         orb_dyn_params = CelestialBodyParameters(
             connector.chaser.orbit.body.gravitational_parameter,
@@ -46,20 +63,38 @@ class GameHelperInit:
             connector.chaser.orbit.body.equatorial_radius,
         )
         orb_dyn = OrbitalDynamicsUtils(celestial_body_params=orb_dyn_params)
+        vessel_control_helper = VesselControlHelper(
+            vessel=connector.chaser,
+            stream_helper=stream_helper,
+            space_center_helper=space_center_helper,
+        )
+        warp_scheduler = WarpScheduler(
+            space_center_helper=space_center_helper,
+            stream_helper=stream_helper,
+            vessel_control_helper=vessel_control_helper,
+        )
         att_ctrl_helper = AttCtrlHelper(
-            vessel=connector.chaser, space_center_helper=space_center_helper
+            vessel_control_helper=vessel_control_helper,
+            space_center_helper=space_center_helper,
         )
         rcs_ctrl_helper = RCSCtrlHelper(
-            vessel=connector.chaser, space_center_helper=space_center_helper
+            vessel_control_helper=vessel_control_helper,
+            space_center_helper=space_center_helper,
         )
         node_helper = NodeHelper(
-            vessel=connector.chaser,
+            vessel_control_helper=vessel_control_helper,
             orb_dyn=orb_dyn,
             params=orb_dyn_params,
             stream_helper=stream_helper,
             space_center_helper=space_center_helper,
             att_ctrl_helper=att_ctrl_helper,
             rcs_ctrl_helper=rcs_ctrl_helper,
+            burn_executor=BurnExecutor(
+                vessel_control_helper=vessel_control_helper,
+                stream_helper=stream_helper,
+                orb_dyn=orb_dyn,
+            ),
+            warp_scheduler=warp_scheduler,
         )
         return GameHelper(
             chaser=connector.chaser,
@@ -71,4 +106,20 @@ class GameHelperInit:
             space_center_helper=space_center_helper,
             att_ctrl_helper=att_ctrl_helper,
             rcs_ctrl_helper=rcs_ctrl_helper,
+            vessel_control_helper=vessel_control_helper,
+            warp_scheduler=warp_scheduler,
+            docking_port_helper=DockingPortHelper(
+                chaser=connector.chaser,
+                target=connector.target,
+                stream_helper=stream_helper,
+                vessel_control_helper=vessel_control_helper,
+                space_center=connector.space_center,
+            ),
+        )
+
+    @classmethod
+    def vessel_pair_init(cls, connector: VesselPairConnector) -> GameHelper:
+        """Game helpers for one chaser of a multi-chaser run, with its own streams."""
+        return cls.game_helper_init(
+            connector=connector, warp_lock=connector.pool.warp_lock
         )
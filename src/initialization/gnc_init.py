@@ -5,8 +5,12 @@ from src.gnc.cw_linear_dynamics import (
     InPlaneDynamics,
     OutOfPlaneDynamics,
 )
-from src.gnc.guidance.guidance import SmoothGuidance, CWGuidance
+from src.gnc.guidance.guidance import Guidance, SmoothGuidance, CWGuidance
 from src.gnc.guidance.guidance_profiles import SmoothProfile, GuidanceParameters
+from src.gnc.guidance.cw_targeting import CWTargeting
+from src.gnc.guidance.relative_motion_guidance import RelativeMotionGuidance
+from src.gnc.relative_dynamics import RelativeMotionModel, GainSchedule
+from src.physics.orb_dyn_utils import OrbitElements
 from src.gnc.navigation import FullKnowledgeNavigation
 from src.gnc.lqr_continuous_ctrl import LQRControl, LQRCost
 
@@ -21,13 +25,41 @@ class GNCHelper:
         out_of_plane_controller: LQRControl,
         smooth_guidance: SmoothGuidance,
         cw_guidance: CWGuidance,
+        homing_guidance: Guidance,
+        cw_targeting: CWTargeting,
         navigation: FullKnowledgeNavigation,
+        orbital_rate: float,
+        lqr_cost: LQRCost,
+        relative_dynamics: str = "cw",
+        homing_gain_schedule: GainSchedule = None,
     ):
         self.in_plane_controller = in_plane_controller
         self.out_of_plane_controller = out_of_plane_controller
         self.smooth_guidance = smooth_guidance
         self.cw_guidance = cw_guidance
+        self.homing_guidance = homing_guidance
+        self.cw_targeting = cw_targeting
         self.navigation = navigation
+        self.orbital_rate = orbital_rate
+        self.lqr_cost = lqr_cost
+        self.relative_dynamics = relative_dynamics
+        self.homing_gain_schedule = homing_gain_schedule
+
+    def homing_controllers(self, ut: float) -> tuple:
+        """In plane and out of plane controllers of the homing loop at game time ut."""
+        if self.homing_gain_schedule is None:
+            return self.in_plane_controller, self.out_of_plane_controller
+        return self.homing_gain_schedule.controllers_at(ut)
+
+    def gains(self) -> dict:
+        return {
+            "orbital_rate": self.orbital_rate,
+            "relative_dynamics": self.relative_dynamics,
+            "Q": self.lqr_cost.Q,
+            "R": self.lqr_cost.R,
+            "in_plane": self.in_plane_controller.optimal_gain.tolist(),
+            "out_of_plane": self.out_of_plane_controller.optimal_gain.tolist(),
+        }
 
 
 class GNCInit:
@@ -38,26 +70,129 @@ class GNCInit:
         cls,
         game_helper: GameHelper,
         connector: KRPCConnector,
+        cached_gains: dict = None,
+        relative_dynamics: str = "cw",
     ) -> GNCHelper:
         # Clohessy Wiltshire linearized dynamics
         n = game_helper.orb_dyn.orbital_rate(connector.target.orbit.semi_major_axis)
         logging.info(f"Target orbital rate: {n} rad/s")
         in_plane_dynamics = InPlaneDynamics(orbital_rate=n)
         out_of_plane_dynamics = OutOfPlaneDynamics(orbital_rate=n)
+        cw_guidance = CWGuidance(orbital_rate=n)
+        homing_guidance = cw_guidance
+        homing_model = true_anomaly_at = None
+
+        # eccentric target (Tschauner-Hempel) or nonlinear relative dynamics
+        if relative_dynamics != "cw":
+            target_orbit = OrbitElements.from_orbit(connector.target.orbit)
+            homing_model = RelativeMotionModel(
+                gravitational_parameter=game_helper.orb_dyn_params.gravitational_parameter,
+                semi_major_axis=target_orbit.semi_major_axis,
+                eccentricity=target_orbit.eccentricity,
+                linearized=relative_dynamics == "tschauner_hempel",
+            )
+
+            def true_anomaly_at(ut: float) -> float:
+                return game_helper.orb_dyn.true_anomaly_at_ut(target_orbit, ut)
+
+            homing_guidance = RelativeMotionGuidance(homing_model, true_anomaly_at)
+            logging.info(f"Relative dynamics: {relative_dynamics}")
+
+        # Navigation
+        navigation = FullKnowledgeNavigation(stream_helper=game_helper.stream_helper)
+
+        return cls.gnc_helper_init(
+            orbital_rate=n,
+            in_plane_dynamics=in_plane_dynamics,
+            out_of_plane_dynamics=out_of_plane_dynamics,
+            cw_guidance=cw_guidance,
+            homing_guidance=homing_guidance,
+            navigation=navigation,
+            cached_gains=cached_gains,
+            relative_dynamics=relative_dynamics,
+            homing_model=homing_model,
+            true_anomaly_at=true_anomaly_at,
+        )
+
+    @classmethod
+    def init_replay_gnc(
+        cls,
+        orbital_rate: float,
+        stream_helper,  # any source of ut, rel_pos and rel_vel
+        cached_gains: dict = None,
+    ) -> GNCHelper:
+        """CW GN&C objects flown offline, without a game connection.
+
+        Gains saved in a checkpoint are used as they are, whatever relative
+        dynamics they were designed with.
+        """
+        relative_dynamics = "cw"
+        if cached_gains:
+            orbital_rate = cached_gains["orbital_rate"]
+            relative_dynamics = cached_gains.get("relative_dynamics", "cw")
+        cw_guidance = CWGuidance(orbital_rate=orbital_rate)
+        return cls.gnc_helper_init(
+            orbital_rate=orbital_rate,
+            in_plane_dynamics=InPlaneDynamics(orbital_rate=orbital_rate),
+            out_of_plane_dynamics=OutOfPlaneDynamics(orbital_rate=orbital_rate),
+            cw_guidance=cw_guidance,
+            homing_guidance=cw_guidance,
+            navigation=FullKnowledgeNavigation(stream_helper=stream_helper),
+            cached_gains=cached_gains,
+            relative_dynamics=relative_dynamics,
+        )
+
+    @classmethod
+    def gnc_helper_init(
+        cls,
+        orbital_rate: float,
+        in_plane_dynamics,
+        out_of_plane_dynamics,
+        cw_guidance: CWGuidance,
+        homing_guidance: Guidance,
+        navigation: FullKnowledgeNavigation,
+        cached_gains: dict = None,
+        relative_dynamics: str = "cw",
+        homing_model: RelativeMotionModel = None,
+        true_anomaly_at=None,  # ut -> target true anomaly (rad)
+    ) -> GNCHelper:
+        n = orbital_rate
 
         # Continuous thrust controllers for closing phase
         lqr_cost = LQRCost(Q=10**3, R=10**5)
-        in_plane_controller = LQRControl(costs=lqr_cost, dynamics=in_plane_dynamics)
+        if not cached_gains or (
+            cached_gains["Q"] != lqr_cost.Q
+            or cached_gains["R"] != lqr_cost.R
+            or not np.isclose(cached_gains["orbital_rate"], n, rtol=1e-9)
+            or cached_gains.get("relative_dynamics", "cw") != relative_dynamics
+        ):
+            cached_gains = {"in_plane": None, "out_of_plane": None}
+        else:
+            logging.info("Using cached LQR gains")
+        in_plane_controller = LQRControl(
+            costs=lqr_cost,
+            dynamics=in_plane_dynamics,
+            optimal_gain=cached_gains["in_plane"],
+        )
         out_of_plane_controller = LQRControl(
-            costs=lqr_cost, dynamics=out_of_plane_dynamics
+            costs=lqr_cost,
+            dynamics=out_of_plane_dynamics,
+            optimal_gain=cached_gains["out_of_plane"],
         )
-        print(f"in plane gain: {in_plane_controller.optimal_gain}")
-        print(f"out of plane gain: {out_of_plane_controller.optimal_gain}")
 
         logging.info("===== Optimal control parameters for closed loop maneuvers =====")
         logging.info(f"state cost (Q): {lqr_cost.Q}")
         logging.info(f"control cost (R): {lqr_cost.R}")
 
+        # close range and docking stay on CW, homing gains follow the target
+        # true anomaly along its eccentric orbit
+        homing_gain_schedule = None
+        if homing_model is not None:
+            homing_gain_schedule = GainSchedule(homing_model, true_anomaly_at, lqr_cost)
+            logging.info(
+                f"Homing gains scheduled on {len(homing_gain_schedule.controllers)} target true anomalies"
+            )
+
         # Forced guidance for closing phase
         guidance_params = GuidanceParameters(
             norm_pos_pol_coeff=np.array([0, 0, 0, 10, -15, 6]),
@@ -68,7 +203,7 @@ class GNCInit:
         y = SmoothProfile(guid_params=guidance_params)
         z = SmoothProfile(guid_params=guidance_params)
         smooth_guidance = SmoothGuidance(profiles=[x, y, z])
-        cw_guidance = CWGuidance(orbital_rate=n)
+        cw_targeting = CWTargeting(orbital_rate=n)
 
         logging.info("===== Guidance parameters =====")
         logging.info(
@@ -78,13 +213,16 @@ class GNCInit:
             f"Velocity polynomial coefficients: {guidance_params.norm_vel_pol_coeff}"
         )
 
-        # Navigation
-        navigation = FullKnowledgeNavigation(stream_helper=game_helper.stream_helper)
-
         return GNCHelper(
             in_plane_controller=in_plane_controller,
             out_of_plane_controller=out_of_plane_controller,
             smooth_guidance=smooth_guidance,
             cw_guidance=cw_guidance,
+            homing_guidance=homing_guidance,
+            cw_targeting=cw_targeting,
             navigation=navigation,
+            orbital_rate=n,
+            lqr_cost=lqr_cost,
+            relative_dynamics=relative_dynamics,
+            homing_gain_schedule=homing_gain_schedule,
         )
@@ -2,9 +2,13 @@ from src.mission.orbit_raise import OrbitRaise
 from src.mission.phasing import OrbitPhasing
 from src.mission.homing import Homing
 from src.mission.close_range import CloseRangeManeuver
+from src.mission.docking import DockingApproach
+from src.mission.vessel_actions import StageSeparation, DeployParts, Wait
 
 from src.initialization.game_helper_init import GameHelper
 from src.initialization.gnc_init import GNCHelper
+from src.gnc.guidance.cw_safety import CWSafetyChecker
+from src.physics.orbit_propagator import OrbitPropagator
 from src.mission.rdv_phase import RDVPhase
 
 
@@ -15,11 +19,19 @@ class Mission:
         orbit_phasing: RDVPhase,
         homing: RDVPhase,
         close_range_maneuver: RDVPhase,
+        docking: RDVPhase,
+        stage_separation: RDVPhase,
+        deploy_parts: RDVPhase,
+        wait: RDVPhase,
     ):
         self.orbit_raise = orbit_raise
         self.orbit_phasing = orbit_phasing
         self.homing = homing
         self.close_range_maneuver = close_range_maneuver
+        self.docking = docking
+        self.stage_separation = stage_separation
+        self.deploy_parts = deploy_parts
+        self.wait = wait
 
 
 class MissionInit:
@@ -30,6 +42,10 @@ class MissionInit:
         gnc_helper: GNCHelper,
         desired_apoapsis: float,
         phase_offset_end_phasing: float,
+        safety_checker: CWSafetyChecker,
+        body_j2: float = 0.0,
+        phasing_v_bar_tolerance: float = 1000.0,
+        phasing_r_bar_tolerance: float = 200.0,
     ):
         raiser = OrbitRaise(
             game_helper=game_helper,
@@ -39,12 +55,16 @@ class MissionInit:
             game_helper=game_helper,
             desired_apoapsis=desired_apoapsis,
             desired_final_phase=phase_offset_end_phasing,
+            propagator=OrbitPropagator(orb_dyn=game_helper.orb_dyn, j2=body_j2),
+            v_bar_tolerance=phasing_v_bar_tolerance,
+            r_bar_tolerance=phasing_r_bar_tolerance,
         )
         homer = Homing(game_helper=game_helper, gnc_helper=gnc_helper)
 
         close_range_maneuver = CloseRangeManeuver(
             game_helper=game_helper,
             gnc_helper=gnc_helper,
+            safety_checker=safety_checker,
         )
 
         return Mission(
@@ -52,4 +72,8 @@ class MissionInit:
             orbit_phasing=phaser,
             homing=homer,
             close_range_maneuver=close_range_maneuver,
+            docking=DockingApproach(game_helper=game_helper, gnc_helper=gnc_helper),
+            stage_separation=StageSeparation(game_helper=game_helper),
+            deploy_parts=DeployParts(game_helper=game_helper),
+            wait=Wait(),
         )
@@ -0,0 +1,71 @@
+import logging
+
+from src.game_connector import KRPCConnector
+from src.initialization.game_helper_init import GameHelper
+from src.initialization.gnc_init import GNCInit
+from src.gnc.guidance.cw_safety import CWSafetyChecker
+from src.initialization.mission_init import MissionInit
+from src.mission.checkpoint import Checkpoint, CheckpointStore
+from src.mission.delta_v_accounting import DeltaVAccounting, PropellantMonitor
+from src.mission.mission_plan import MissionPlan
+from src.mission.mission_runner import MissionRunner
+
+
+class RunnerInit:
+    @classmethod
+    def runner_init(
+        cls,
+        connector: KRPCConnector,
+        game_helper: GameHelper,
+        plan: MissionPlan,
+        checkpoint_store: CheckpointStore = None,
+        checkpoint: Checkpoint = None,
+    ) -> MissionRunner:
+        desired_apoapsis = (
+            game_helper.target.orbit.periapsis
+            - plan.parameters["r_bar_safety_distance"]
+        )
+        logging.info(f"Chaser orbit desired apoapsis: {desired_apoapsis} m")
+
+        # GN&C objects initialization
+        gnc_helper = GNCInit.init_gnc_classes(
+            game_helper=game_helper,
+            connector=connector,
+            cached_gains=checkpoint.gains if checkpoint is not None else None,
+            relative_dynamics=plan.parameters["relative_dynamics"],
+        )
+
+        safety_checker = CWSafetyChecker(
+            orbital_rate=gnc_helper.orbital_rate,
+            keep_out_radius=plan.parameters["keep_out_radius"],
+            cone_half_angle=plan.parameters["approach_cone_half_angle"],
+            cone_axis=plan.approach_axis(),
+        )
+
+        mission_phases = MissionInit.mission_init(
+            game_helper=game_helper,
+            gnc_helper=gnc_helper,
+            desired_apoapsis=desired_apoapsis,
+            phase_offset_end_phasing=plan.parameters["phase_offset_end_phasing"],
+            safety_checker=safety_checker,
+            body_j2=plan.parameters["body_j2"],
+            phasing_v_bar_tolerance=plan.parameters["phasing_v_bar_tolerance"],
+            phasing_r_bar_tolerance=plan.parameters["phasing_r_bar_tolerance"],
+        )
+
+        return MissionRunner(
+            plan=plan,
+            mission=mission_phases,
+            game_helper=game_helper,
+            gnc_helper=gnc_helper,
+            checkpoint_store=checkpoint_store,
+            checkpoint=checkpoint,
+            accounting=DeltaVAccounting(
+                orbital_rate=gnc_helper.orbital_rate,
+                propellant_monitor=PropellantMonitor(
+                    stream_helper=game_helper.stream_helper,
+                    vessel_control_helper=game_helper.vessel_control_helper,
+                    space_center=game_helper.space_center_helper.space_center,
+                ),
+            ),
+        )
@@ -0,0 +1,110 @@
+import os
+import json
+import logging
+from dataclasses import dataclass, field, asdict
+from typing import List, Optional
+
+from src.initialization.game_helper_init import GameHelper
+
+
+class CheckpointMismatchError(RuntimeError):
+    pass
+
+
+@dataclass
+class Checkpoint:
+    mission_name: str
+    mission_file: str
+    completed_steps: List[str] = field(default_factory=list)
+    current_step: Optional[str] = None
+    vessels: dict = field(default_factory=dict)  # names and orbits at save time
+    nodes: List[dict] = field(default_factory=list)  # planned maneuver nodes
+    phase_state: dict = field(default_factory=dict)  # step name -> guidance state
+    gains: dict = field(default_factory=dict)  # cached LQR gains
+    ut: float = 0.0  # game time of the last save
+
+
+class CheckpointStore:
+    """Persist mission progress as a JSON file, rewritten atomically."""
+
+    # relative semi-major axis change accepted between checkpoint and live vessel
+    sma_tolerance = 0.01
+    # s, a live node this close to a checkpoint node is the one the mission planned
+    node_ut_tolerance = 0.01
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def load(self) -> Optional[Checkpoint]:
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "r") as file:
+                return Checkpoint(**json.load(file))
+        except (json.JSONDecodeError, TypeError) as e:
+            raise CheckpointMismatchError(f"Unreadable checkpoint {self.path}: {e}")
+
+    def save(self, checkpoint: Checkpoint) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(asdict(checkpoint), file, indent=2)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def capture_vessels(game_helper: GameHelper) -> dict:
+        return {
+            "chaser": game_helper.chaser.name,
+            "target": game_helper.target.name,
+            "chaser_semi_major_axis": game_helper.chaser.orbit.semi_major_axis,
+            "target_semi_major_axis": game_helper.target.orbit.semi_major_axis,
+        }
+
+    @staticmethod
+    def capture_nodes(game_helper: GameHelper) -> List[dict]:
+        return [
+            {
+                "ut": node.ut,
+                "prograde": node.prograde,
+                "normal": node.normal,
+                "radial": node.radial,
+            }
+            for node in game_helper.vessel_control_helper.get("nodes")
+        ]
+
+    def check_live_state(self, checkpoint: Checkpoint, game_helper: GameHelper) -> None:
+        # the vessel may have been flown by hand since the checkpoint was saved
+        game_helper.vessel_control_helper.invalidate()
+        live = self.capture_vessels(game_helper)
+        for vessel in ("chaser", "target"):
+            if live[vessel] != checkpoint.vessels.get(vessel):
+                raise CheckpointMismatchError(
+                    f"Live {vessel} '{live[vessel]}' does not match checkpoint "
+                    f"'{checkpoint.vessels.get(vessel)}'"
+                )
+            key = f"{vessel}_semi_major_axis"
+            drift = abs(live[key] - checkpoint.vessels[key]) / checkpoint.vessels[key]
+            if drift > self.sma_tolerance:
+                raise CheckpointMismatchError(
+                    f"{vessel} semi-major axis changed by {drift:.2%} since checkpoint"
+                )
+
+        live_nodes = self.capture_nodes(game_helper)
+        if len(live_nodes) != len(checkpoint.nodes):
+            logging.warning(
+                f"Checkpoint has {len(checkpoint.nodes)} planned nodes, vessel has {len(live_nodes)}"
+            )
+        # the resumed step plans its nodes again from the live orbit, nodes
+        # added by hand since the checkpoint are left alone
+        planned_uts = [node["ut"] for node in checkpoint.nodes]
+        for node in list(game_helper.vessel_control_helper.get("nodes")):
+            ut = node.ut
+            if any(
+                abs(ut - planned) < self.node_ut_tolerance for planned in planned_uts
+            ):
+                game_helper.vessel_control_helper.remove_node(node)
+                logging.info(f"Removed checkpoint node at {ut:.2f} s")
+            else:
+                logging.warning(f"Kept node at {ut:.2f} s, not planned by the mission")
+        logging.info(
+            f"Live vessel state matches checkpoint saved at {checkpoint.ut:.2f} s"
+        )
@@ -1,24 +1,57 @@
+import math
 import time
 import numpy as np
 import logging
 
 from src.initialization.game_helper_init import GameHelper
 from src.initialization.gnc_init import GNCHelper
+from src.gnc.guidance.cw_safety import CWSafetyChecker, UnsafeTrajectoryError
 
 from src.mission.rdv_phase import RDVPhase
+from src.mission.leg_state_machine import (
+    LegAbortError,
+    LegState,
+    LegStateMachine,
+    NavSnapshot,
+    Transition,
+)
+from src.helpers.tracer import tracer
+from src.physics.mission_snapshot import MissionSnapshot, PlannedNode
+from dataclasses import replace
 
 
 class CloseRangeManeuver(RDVPhase):
+    """Closed loop or CW targeting legs towards a point of the target orbital frame.
+
+    Tracking legs run as a LegStateMachine: the leg ends as soon as the
+    chaser is settled inside tolerance of its end, a tracking error above
+    `hold_error` brakes and holds where the chaser stops, then replans the
+    leg from there once settled. Braking or holding longer than `max_hold`,
+    or entering the keep-out sphere outside the approach cone, flies back
+    to the start of the leg, and a tracking error above `abort_error` turns
+    the thrusters off.
+    """
+
     def __init__(
         self,
         game_helper: GameHelper,
         gnc_helper: GNCHelper,
+        safety_checker: CWSafetyChecker,
+        period: float = 0.1,  # s, of the tracking loop
+        settle_speed: float = 0.1,  # m/s, to end a leg or resume from a hold
     ) -> None:
         self.game_helper = game_helper
+        self.period = period
+        self.settle_speed = settle_speed
+        self.safety_checker = safety_checker
+        self.safe = True
         self.in_plane_control = gnc_helper.in_plane_controller
         self.out_of_plane_control = gnc_helper.out_of_plane_controller
         self.guidance = gnc_helper.smooth_guidance
+        self.targeting = gnc_helper.cw_targeting
         self.navigation = gnc_helper.navigation
+        self.guidance_state = {}
+        self.resume_state = None
 
         @property
         def final_state(self) -> tuple[float, float, float]:
@@ -61,90 +94,514 @@ class CloseRangeManeuver(RDVPhase):
     #     )
     #     return in_plane, out_of_plane
 
-    def norm_time(self, time: float, t_0: float) -> float:
-        return (time - t_0) / self.duration
+    def checkpoint_state(self) -> dict:
+        return self.guidance_state
 
-    def inside_tolerance(self, tau: float, tolerance: float = 3) -> bool:
-        if tau < 1:
-            return False
-        else:
-            return (
-                abs(self.game_helper.stream_helper.rel_pos()[0] - self.final_state[0])
-                < tolerance
-                and abs(
-                    self.game_helper.stream_helper.rel_pos()[1] - self.final_state[1]
+    def restore_state(self, state: dict) -> None:
+        self.resume_state = state or None
+
+    def plan_phase(
+        self,
+        snapshot: MissionSnapshot,
+        final_state: tuple,
+        duration: float = 60,
+        tolerance: float = 3,
+        mode: str = "tracking",
+        correction_interval: float = 20,
+        **params,
+    ) -> tuple:
+        self.check_leg(snapshot.rel_pos, final_state, duration, mode)
+        if mode == "targeting":
+            transfer_time, dv_1, dv_2 = self.targeting.cheapest(
+                snapshot.rel_pos, (0, 0, 0), final_state, self.transfer_times(duration)
+            )
+            nodes = [
+                PlannedNode(
+                    step="close_range",
+                    ut=ut,
+                    delta_v=float(np.linalg.norm(dv)),
+                    direction="rcs",
+                    burn_time=0.0,
+                    description=f"CW targeting {name} impulse towards {tuple(final_state)} m",
                 )
-                < tolerance
-                and abs(
-                    self.game_helper.stream_helper.rel_pos()[2] - self.final_state[2]
+                for ut, dv, name in (
+                    (snapshot.ut, dv_1, "departure"),
+                    (snapshot.ut + transfer_time, dv_2, "arrival"),
+                )
+            ]
+            return nodes, replace(
+                snapshot,
+                ut=snapshot.ut + transfer_time,
+                rel_pos=tuple(final_state),
+            )
+
+        # integral of |acceleration| of the normalized position polynomial is 3.75
+        delta_v = sum(
+            3.75 * abs(p_f - p_i) / duration
+            for p_i, p_f in zip(snapshot.rel_pos, final_state)
+        )
+        node = PlannedNode(
+            step="close_range",
+            ut=snapshot.ut,
+            delta_v=delta_v,
+            direction="rcs",
+            burn_time=duration,
+            description=f"closed loop maneuver towards {tuple(final_state)} m",
+        )
+        return [node], replace(
+            snapshot, ut=snapshot.ut + 2 * duration, rel_pos=tuple(final_state)
+        )
+
+    def transfer_times(self, duration: float) -> np.ndarray:
+        # candidate transfer times around the requested leg duration
+        return np.linspace(0.5, 1.5, 41) * duration
+
+    def reference_states(
+        self, p_i, p_f, duration: float, mode: str, v_0=(0, 0, 0), samples: int = 50
+    ) -> tuple:
+        """Sampled positions and velocities, shape (samples, 3), of a planned leg."""
+        p_i, p_f = np.asarray(p_i, dtype=float), np.asarray(p_f, dtype=float)
+        if mode == "targeting":
+            transfer_time, dv_1, _ = self.targeting.cheapest(
+                p_i, v_0, p_f, self.transfer_times(duration)
+            )
+            rr, rv, vr, vv = self.targeting.stm(np.linspace(0, transfer_time, samples))
+            v_1 = np.asarray(v_0, dtype=float) + dv_1
+            return rr @ p_i + rv @ v_1, vr @ p_i + vv @ v_1
+        profile = self.guidance.profiles[0]
+        tau = np.linspace(0, 1, samples)
+        return (
+            p_i + np.outer(profile.normalized_pos(tau), p_f - p_i),
+            np.outer(profile.normalized_vel(tau), (p_f - p_i) / duration),
+        )
+
+    def check_leg(self, p_i, p_f, duration: float, mode: str, v_0=(0, 0, 0)) -> None:
+        if not self.safety_checker.enabled:
+            return
+        violations = self.safety_checker.violations(
+            *self.reference_states(p_i, p_f, duration, mode, v_0)
+        )
+        if violations:
+            message = f"Leg towards {tuple(p_f)} m is unsafe: " + "; ".join(violations)
+            logging.critical(message)
+            raise UnsafeTrajectoryError(message)
+
+    def monitor_safety(self, r, v) -> None:
+        """Online passive abort check, logged when the state changes."""
+        safe = self.safety_checker.is_safe(r, v)
+        if safe != self.safe:
+            if safe:
+                logging.info("Passive abort trajectory clear of the keep-out sphere")
+            else:
+                logging.warning("Passive abort trajectory enters the keep-out sphere")
+        self.safe = safe
+
+    def relative_state(self) -> tuple:
+        x, z = self.navigation.output()
+        logging.info(
+            f"Nav, {self.game_helper.stream_helper.ut():.2f}, {x[0][0]:.2f}, {x[1][0]:.2f}, {z[0][0]:.2f}, {x[2][0]:.2f}, {x[3][0]:.2f}, {z[1][0]:.2f}"
+        )
+        return (
+            np.array([x[0][0], x[1][0], z[0][0]]),
+            np.array([x[2][0], x[3][0], z[1][0]]),
+        )
+
+    def wait_until(self, ut: float) -> None:
+        while self.game_helper.stream_helper.ut() < ut:
+            time.sleep(0.05)
+
+    def apply_impulse(self, delta_v, name: str) -> None:
+        body = self.game_helper.vessel_control_helper.rotate_orbital_to_body(
+            tuple(float(value) for value in delta_v)
+        )
+        self.game_helper.rcs_ctrl_helper.rcs_impulse(body)
+        logging.info(
+            f"{name} impulse, {delta_v[0]:.3f}, {delta_v[1]:.3f}, {delta_v[2]:.3f} m/s"
+        )
+
+    def execute_targeting(
+        self,
+        final_state: tuple,
+        duration: float,
+        correction_interval: float,
+        min_correction: float = 0.02,  # m/s
+    ) -> None:
+        """Two-impulse CW transfer with corrections at fixed intervals.
+
+        The RCS is idle between impulses, so a leg costs a handful of
+        actuation commands instead of one per control tick.
+        """
+        ut = self.game_helper.stream_helper.ut()
+        state, self.resume_state = self.resume_state, None
+        if (
+            state is not None
+            and state.get("mode") == "targeting"
+            and tuple(state["final_state"]) == tuple(final_state)
+            and ut < state["t_arrival"]
+        ):
+            logging.info(f"Resuming transfer arriving at {state['t_arrival']:.2f} s")
+            t_arrival = state["t_arrival"]
+        else:
+            r, v = self.relative_state()
+            transfer_time, dv_1, dv_2 = self.targeting.cheapest(
+                r, v, final_state, self.transfer_times(duration)
+            )
+            logging.info(
+                f"Transfer time {transfer_time:.1f} s, departure dv {np.linalg.norm(dv_1):.3f} m/s, arrival dv {np.linalg.norm(dv_2):.3f} m/s"
+            )
+            t_arrival = ut + transfer_time
+            self.apply_impulse(dv_1, "Departure")
+        self.guidance_state = {
+            "mode": "targeting",
+            "t_arrival": t_arrival,
+            "final_state": list(final_state),
+            "duration": duration,
+        }
+        self.save_checkpoint()
+
+        # coast, correcting towards the same arrival time
+        next_correction = self.game_helper.stream_helper.ut() + correction_interval
+        while next_correction < t_arrival - correction_interval / 2:
+            self.wait_until(next_correction)
+            with tracer.cycle():
+                r, v = self.relative_state()
+                self.monitor_safety(r, v)
+                dv, _ = self.targeting.two_impulse(
+                    r, v, final_state, t_arrival - self.game_helper.stream_helper.ut()
                 )
-                < tolerance
+                if np.linalg.norm(dv[0]) > min_correction:
+                    self.apply_impulse(dv[0], "Correction")
+            next_correction += correction_interval
+
+        self.wait_until(t_arrival)
+        r, v = self.relative_state()
+        self.apply_impulse(-v, "Arrival")
+        logging.info(
+            f"Arrived at {tuple(round(float(p), 2) for p in r)} m, target {tuple(final_state)} m"
+        )
+
+    def sample(self) -> NavSnapshot:
+        """Navigation of the tick, with the leg reference at the same time."""
+        ut = self.game_helper.stream_helper.ut()
+        x, z = self.navigation.output()
+        logging.info(
+            f"Nav, {ut:.2f}, {x[0][0]:.2f}, {x[1][0]:.2f}, {z[0][0]:.2f}, {x[2][0]:.2f}, {x[3][0]:.2f}, {z[1][0]:.2f}"
+        )
+        snapshot = NavSnapshot(
+            ut=ut,
+            r=np.array([x[0][0], x[1][0], z[0][0]]),
+            v=np.array([x[2][0], x[3][0], z[1][0]]),
+            state=(x, z),
+        )
+        self.monitor_safety(snapshot.r, snapshot.v)
+        self.update_reference(snapshot)
+        return snapshot
+
+    def start_leg(self, t_0: float, p_i, p_f, duration: float) -> None:
+        for i, profile in enumerate(self.guidance.profiles):
+            profile.config_profile(p_i=p_i[i], p_f=p_f[i], duration=duration)
+        self.leg = (t_0, tuple(float(p) for p in p_i), tuple(p_f), duration)
+        self.braking = False
+        # leg definition, enough to recompute the reference when replaying
+        logging.info(
+            f"Leg, {t_0:.2f}, {p_i[0]:.2f}, {p_i[1]:.2f}, {p_i[2]:.2f}, {p_f[0]:.2f}, {p_f[1]:.2f}, {p_f[2]:.2f}, {duration:.2f}"
+        )
+
+    def save_leg(self) -> None:
+        t_0, p_i, p_f, duration = self.leg
+        self.guidance_state = {
+            "t_0": t_0,
+            "p_i": list(p_i),
+            "final_state": list(p_f),
+            "duration": duration,
+        }
+        self.save_checkpoint()
+
+    def update_reference(self, snapshot: NavSnapshot) -> None:
+        t_0, _, _, duration = self.leg
+        tau = (snapshot.ut - t_0) / duration
+        if self.braking:
+            # zero relative velocity where the chaser is
+            r = snapshot.r
+            self.reference = (
+                tau,
+                np.array([[r[0]], [r[1]], [0], [0]]),
+                np.array([[r[2]], [0]]),
             )
+        else:
+            self.reference = (tau, *self.ref_signal(tau=min(tau, 1)))
+
+    def tracking_error(self, snapshot: NavSnapshot) -> float:
+        _, in_plane_ref, out_of_plane_ref = self.reference
+        return math.dist(
+            snapshot.r,
+            (in_plane_ref[0][0], in_plane_ref[1][0], out_of_plane_ref[0][0]),
+        )
+
+    def arrived(self, snapshot: NavSnapshot) -> bool:
+        """Leg time elapsed, every axis inside the tolerance of the leg end and slow."""
+        return (
+            self.reference[0] >= 1
+            and bool(np.all(np.abs(snapshot.r - self.leg[2]) < self.tolerance))
+            and np.linalg.norm(snapshot.v) < self.settle_speed
+        )
+
+    def settled(self, snapshot: NavSnapshot) -> bool:
+        return (
+            self.tracking_error(snapshot) < self.tolerance
+            and np.linalg.norm(snapshot.v) < self.settle_speed
+        )
+
+    def keep_out_violated(self, snapshot: NavSnapshot) -> bool:
+        """Inside the keep-out sphere and outside the approach cone."""
+        checker = self.safety_checker
+        return (
+            checker.enabled
+            and np.linalg.norm(snapshot.r) < checker.keep_out_radius
+            and not checker.inside_cone(snapshot.r)
+        )
+
+    def can_resume(self, snapshot: NavSnapshot) -> bool:
+        return self.settled(snapshot) and not self.safety_checker.violations(
+            *self.reference_states(
+                snapshot.r, self.final_state, self.duration, "tracking"
+            )
+        )
+
+    def track(self, snapshot: NavSnapshot) -> None:
+        tau, in_plane_ref, out_of_plane_ref = self.reference
+        logging.info(
+            f"Guid, {min(tau, 1):.2f}, {in_plane_ref[0][0]:.2f}, {in_plane_ref[1][0]:.2f}, {out_of_plane_ref[0][0]:.2f}, {in_plane_ref[2][0]:.2f}, {in_plane_ref[3][0]:.2f}, {out_of_plane_ref[1][0]:.2f}"
+        )
+        x, z = snapshot.state
+        # control
+        U_LVLH = self.in_plane_control.control(state=x, ref=in_plane_ref)
+        U_Z = self.out_of_plane_control.control(state=z, ref=out_of_plane_ref)
+        U = (float(U_LVLH[0][0]), float(U_LVLH[1][0]), float(U_Z[0][0]))
+        # change of reference frame
+        U_BODY = self.game_helper.vessel_control_helper.rotate_orbital_to_body(U)
+        # actuation
+        self.game_helper.rcs_ctrl_helper.rcs_actuation(U_BODY)
+        logging.info(
+            f"Control, {U[0]:.2f}, {U[1]:.2f}, {U[2]:.2f}, {U_BODY[0]:.2f}, {U_BODY[1]:.2f}, {U_BODY[2]:.2f}"
+        )
+
+    def brake(self, snapshot: NavSnapshot) -> None:
+        self.braking = True
+        self.update_reference(snapshot)
+
+    def hold(self, snapshot: NavSnapshot) -> None:
+        # a leg that ends where it starts, the reference stays on the hold point
+        self.start_leg(snapshot.ut, snapshot.r, tuple(snapshot.r), self.duration)
+        self.update_reference(snapshot)
+
+    def replan(self, snapshot: NavSnapshot) -> None:
+        self.start_leg(snapshot.ut, snapshot.r, self.final_state, self.duration)
+        self.update_reference(snapshot)
+        self.save_leg()
+
+    def retreat(self, snapshot: NavSnapshot) -> None:
+        # a resumed mission flies the leg again from the retreat point
+        self.guidance_state = {}
+        self.start_leg(snapshot.ut, snapshot.r, self.retreat_point, self.duration)
+        self.update_reference(snapshot)
+
+    def stop(self, snapshot: NavSnapshot) -> None:
+        self.game_helper.rcs_ctrl_helper.set_translation(0.0, 0.0, 0.0)
+
+    def abort(self, snapshot: NavSnapshot) -> None:
+        # thrusters off, the chaser flies its passive abort trajectory
+        self.guidance_state = {}
+        self.stop(snapshot)
+
+    def leg_states(
+        self, hold_error: float, abort_error: float, max_hold: float
+    ) -> list:
+        def error_above(limit: float):
+            return lambda snapshot: self.tracking_error(snapshot) > limit
+
+        abort = Transition(
+            "aborted",
+            error_above(abort_error),
+            f"tracking error above {abort_error:.1f} m",
+        )
+        keep_out = Transition(
+            "retreat",
+            self.keep_out_violated,
+            "inside the keep-out sphere, outside the approach cone",
+        )
+        return [
+            LegState(
+                "tracking",
+                action=self.track,
+                on_enter=self.replan,
+                transitions=[
+                    abort,
+                    keep_out,
+                    Transition(
+                        "brake",
+                        error_above(hold_error),
+                        f"tracking error above {hold_error:.1f} m",
+                    ),
+                    Transition("complete", self.arrived, "inside tolerance"),
+                    Transition(
+                        "timed_out",
+                        lambda snapshot: self.reference[0] >= 2,
+                        "leg time elapsed outside tolerance",
+                    ),
+                ],
+            ),
+            LegState(
+                "brake",
+                action=self.track,
+                on_enter=self.brake,
+                log_level=logging.WARNING,
+                transitions=[
+                    keep_out,
+                    Transition(
+                        "retreat",
+                        lambda snapshot: self.machine.time_in_state(snapshot)
+                        > max_hold,
+                        f"braking for more than {max_hold:.0f} s",
+                    ),
+                    Transition(
+                        "hold",
+                        lambda snapshot: np.linalg.norm(snapshot.v) < self.settle_speed,
+                        "stopped",
+                    ),
+                ],
+            ),
+            LegState(
+                "hold",
+                action=self.track,
+                on_enter=self.hold,
+                log_level=logging.WARNING,
+                transitions=[
+                    abort,
+                    keep_out,
+                    Transition(
+                        "retreat",
+                        lambda snapshot: self.machine.time_in_state(snapshot)
+                        > max_hold,
+                        f"held for more than {max_hold:.0f} s",
+                    ),
+                    Transition(
+                        "tracking", self.can_resume, "settled, leg replanned from here"
+                    ),
+                ],
+            ),
+            LegState(
+                "retreat",
+                action=self.track,
+                on_enter=self.retreat,
+                log_level=logging.WARNING,
+                transitions=[
+                    abort,
+                    Transition(
+                        "retreated",
+                        lambda snapshot: self.arrived(snapshot)
+                        or self.reference[0] >= 2,
+                        f"back at {self.retreat_point} m",
+                    ),
+                ],
+            ),
+            LegState("complete", on_enter=self.stop, terminal=True),
+            LegState(
+                "timed_out",
+                on_enter=self.stop,
+                terminal=True,
+                log_level=logging.WARNING,
+            ),
+            LegState(
+                "retreated",
+                on_enter=self.stop,
+                terminal=True,
+                log_level=logging.WARNING,
+            ),
+            LegState(
+                "aborted",
+                on_enter=self.abort,
+                terminal=True,
+                log_level=logging.CRITICAL,
+            ),
+        ]
 
     def execute_phase(
         self,
         final_state: tuple,  # (x, y, z)
         duration: float = 60,  # s
         tolerance: float = 3,  # m
+        mode: str = "tracking",  # or "targeting"
+        correction_interval: float = 20,  # s, targeting mode only
+        hold_error: float = None,  # m, 10 tolerances or a tenth of the leg by default
+        abort_error: float = None,  # m, twice the hold error by default
+        max_hold: float = None,  # s, the leg duration by default
     ) -> None:
+        if mode not in ("tracking", "targeting"):
+            raise ValueError(f"Unknown close range mode '{mode}'")
         self.final_state = final_state
         self.duration = duration
         self.tolerance = tolerance
 
         logging.info("===== Closed loop proximity maneuver phase =====")
 
+        # re-check the leg from the live state before firing anything
+        r, v = self.relative_state()
+        self.check_leg(r, final_state, duration, mode, v)
+        self.safe = True
+
         self.game_helper.rcs_ctrl_helper.enable_rcs()
         self.game_helper.att_ctrl_helper.enable_sas()
         self.game_helper.att_ctrl_helper.change_sas_mode("Target")
         self.game_helper.att_ctrl_helper.change_speed_mode("Target")
 
+        if mode == "targeting":
+            self.game_helper.vessel_control_helper.confirm()
+            with self.game_helper.warp_scheduler.active_control():
+                self.execute_targeting(final_state, duration, correction_interval)
+            logging.info("===== End of closed loop proximity maneuver phase =====")
+            return
+
         t_0 = self.game_helper.stream_helper.ut()
-        tod = t_0
+        p_i = self.game_helper.stream_helper.rel_pos()
 
-        for i, profile in enumerate(self.guidance.profiles):
-            profile.config_profile(
-                p_i=self.game_helper.stream_helper.rel_pos()[i],
-                p_f=final_state[i],
-                duration=duration,
-            )
-        ref_signal = self.guidance.ref_signal()
+        # keep the reference of an interrupted maneuver towards the same point
+        state, self.resume_state = self.resume_state, None
+        if (
+            state is not None
+            and tuple(state["final_state"]) == tuple(final_state)
+            and t_0 < state["t_0"] + 2 * duration
+        ):
+            logging.info(f"Resuming maneuver started at {state['t_0']:.2f} s")
+            t_0 = state["t_0"]
+            p_i = state["p_i"]
+
+        self.ref_signal = self.guidance.ref_signal()
+        self.start_leg(t_0, p_i, final_state, duration)
+        self.save_leg()
+        # a leg that cannot be held is flown back to its start, checked safe
+        self.retreat_point = tuple(float(p) for p in p_i)
+        if hold_error is None:
+            hold_error = max(10 * tolerance, 0.1 * math.dist(p_i, final_state))
+        if abort_error is None:
+            abort_error = 2 * hold_error
+        if max_hold is None:
+            max_hold = duration
+        self.machine = LegStateMachine(
+            self.sample,
+            self.leg_states(hold_error, abort_error, max_hold),
+            period=self.period,
+        )
+        self.game_helper.vessel_control_helper.confirm()
 
         logging.info(
             f"Starting maneuver from state: {self.navigation.output()} [m, m/s] towards position: {final_state} [m]"
         )
-
-        while tod < t_0 + 2 * self.duration:
-            # time of day == current time
-            tod = self.game_helper.stream_helper.ut()
-            # navigation
-            x, z = self.navigation.output()
-            logging.info(
-                f"Nav, {tod:.2f}, {x[0][0]:.2f}, {x[1][0]:.2f}, {z[0][0]:.2f}, {x[2][0]:.2f}, {x[3][0]:.2f}, {z[1][0]:.2f}"
-            )
-            # guidance
-            tau = self.norm_time(time=tod, t_0=t_0)
-            in_plane_ref, out_of_plane_ref = ref_signal(tau=min(tau, 1))
-            logging.info(
-                f"Guid, {min(tau, 1):.2f}, {in_plane_ref[0][0]:.2f}, {in_plane_ref[1][0]:.2f}, {out_of_plane_ref[0][0]:.2f}, {in_plane_ref[2][0]:.2f}, {in_plane_ref[3][0]:.2f}, {out_of_plane_ref[1][0]:.2f}"
-            )
-            if not self.inside_tolerance(tau=tau, tolerance=tolerance):
-                # control
-                U_LVLH = self.in_plane_control.control(state=x, ref=in_plane_ref)
-                U_Z = self.out_of_plane_control.control(state=z, ref=out_of_plane_ref)
-                U = (float(U_LVLH[0]), float(U_LVLH[1]), float(U_Z))
-                # change of reference frame
-                U_BODY = self.game_helper.space_center_helper.transform_position(
-                    vector=U,
-                    from_frame=self.game_helper.chaser.orbital_reference_frame,
-                    to_frame=self.game_helper.chaser.reference_frame,
-                )
-                # actuation
-                self.game_helper.rcs_ctrl_helper.rcs_actuation(U_BODY)
-                logging.info(
-                    f"Control, {U[0]:.2f}, {U[1]:.2f}, {U[2]:.2f}, {U_BODY[0]:.2f}, {U_BODY[1]:.2f}, {U_BODY[2]:.2f}"
-                )
-            else:
-                logging.info("Inside tolerance, not controlling")
-            time.sleep(0.1)
+        with self.game_helper.warp_scheduler.active_control():
+            outcome = self.machine.run()
+        if outcome in ("retreated", "aborted"):
+            message = f"Leg towards {tuple(final_state)} m {outcome}"
+            logging.critical(message)
+            raise LegAbortError(message)
 
         logging.info("===== End of closed loop proximity maneuver phase =====")
@@ -0,0 +1,231 @@
+import math
+import logging
+import threading
+import numpy as np
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from src.helpers.stream_helper import StreamHelper
+
+MAIN_PROPELLANTS = ("LiquidFuel", "Oxidizer")
+RCS_PROPELLANTS = ("MonoPropellant",)
+G_0 = 9.80665  # m/s**2, standard gravity of specific impulses
+
+
+@dataclass
+class StepAccount:
+    step: str
+    planned: float = 0.0  # m/s, of the dry run nodes
+    commanded: float = 0.0  # m/s, closed loop RCS commands integrated
+    measured: float = 0.0  # m/s, navigation velocity change not due to free drift
+    propellant: dict = field(default_factory=dict)  # resource -> units used
+    main_delta_v: float = 0.0  # m/s, from the main engine propellant used
+    rcs_delta_v: float = 0.0  # m/s, from the monopropellant used
+
+    @property
+    def actual(self) -> float:
+        """Delta-v spent according to the propellant, or measured without it."""
+        if self.propellant:
+            return self.main_delta_v + self.rcs_delta_v
+        return self.measured
+
+
+class PropellantMonitor:
+    """Propellant left in the chaser, read through low rate streams."""
+
+    def __init__(
+        self,
+        stream_helper: StreamHelper,
+        vessel_control_helper,
+        space_center,
+        rate: float = 1.0,  # Hz
+    ) -> None:
+        self.stream_helper = stream_helper
+        self.vessel_control_helper = vessel_control_helper
+        self.rate = rate
+        self.streams = {
+            resource: stream_helper.resource_stream(resource, rate)
+            for resource in MAIN_PROPELLANTS + RCS_PROPELLANTS
+        }
+        self.densities = {
+            resource: space_center.Resources.density(resource)
+            for resource in self.streams
+        }
+        thrusters = vessel_control_helper.vessel.parts.rcs
+        self.rcs_specific_impulse = max(
+            (thruster.vacuum_specific_impulse for thruster in thrusters), default=0.0
+        )
+
+    def sample(self, fresh: bool = False) -> dict:
+        """Propellant levels, mass and isp, after one more stream update with `fresh`.
+
+        A fresh sample does not take values streamed before a vessel change,
+        such as the tanks and engines of a stage just jettisoned.
+        """
+        if fresh:
+            for stream in self.streams.values():
+                with stream.condition:
+                    stream.wait(2 / self.rate)
+        levels = {resource: stream() for resource, stream in self.streams.items()}
+        levels["mass"] = self.vessel_control_helper.get("mass")
+        levels["specific_impulse"] = self.vessel_control_helper.get("specific_impulse")
+        return levels
+
+    def delta_v(self, start: dict, end: dict) -> tuple:
+        """Main engine and RCS delta-v of the propellant used between two samples.
+
+        The main engine burns with the isp of the start sample, the engines
+        of the step, as a flameout during the step leaves no isp at its end.
+        """
+        used = {resource: start[resource] - end[resource] for resource in self.streams}
+
+        def rocket_equation(resources: tuple, specific_impulse: float) -> float:
+            mass = sum(
+                used[resource] * self.densities[resource] for resource in resources
+            )
+            if mass <= 0 or mass >= start["mass"]:
+                return 0.0
+            return (
+                specific_impulse
+                * G_0
+                * math.log(start["mass"] / (start["mass"] - mass))
+            )
+
+        return used, (
+            rocket_equation(MAIN_PROPELLANTS, start["specific_impulse"]),
+            rocket_equation(RCS_PROPELLANTS, self.rcs_specific_impulse),
+        )
+
+    def release(self) -> None:
+        for resource in self.streams:
+            self.stream_helper.release_resource_stream(resource)
+
+
+class DeltaVAccounting(logging.Handler):
+    """Delta-v spent by each mission step, against the planned delta-v.
+
+    Fed by the telemetry of the log: every Control command is held until
+    the next navigation sample and its norm integrated, targeting impulses
+    are added as they are logged, and the navigation velocity change not
+    explained by the CW free drift is summed over `window` seconds, so that
+    rounding noise does not add up. Propellant levels are read at the start
+    and end of each step. Only records of the
+    thread flying the step are counted, missions flown concurrently keep
+    their own accounts.
+    """
+
+    def __init__(
+        self,
+        orbital_rate: float,  # rad/s
+        propellant_monitor: Optional[PropellantMonitor] = None,
+        window: float = 5.0,  # s
+    ) -> None:
+        super().__init__(level=logging.INFO)
+        self.n = orbital_rate
+        self.propellant_monitor = propellant_monitor
+        self.window = window
+        self.accounts: List[StepAccount] = []
+        self.account = None
+        self.thread = None
+        self.vessel_changed = False  # the last step was a vessel action
+
+    def start_step(
+        self, step: str, planned: float, vessel_action: bool = False
+    ) -> None:
+        """Opens the account of a step.
+
+        Vessel actions burn no propellant but staging drops tanks, so their
+        propellant is not counted and the step after them samples fresh levels.
+        """
+        self.account = StepAccount(step=step, planned=planned)
+        self.thread = threading.get_ident()
+        self.levels = None
+        if self.propellant_monitor is not None and not vessel_action:
+            self.levels = self.propellant_monitor.sample(fresh=self.vessel_changed)
+        self.vessel_changed = vessel_action
+        self.previous = None  # (t, r, v, port frame) of the last navigation sample
+        self.command = 0.0  # m/s**2, norm of the command being held
+        self.drift = np.zeros(3)  # m/s, unexplained velocity change of the window
+        self.window_start = None
+
+    def free_acceleration(self, r: np.ndarray, v: np.ndarray) -> np.ndarray:
+        n = self.n
+        return np.array([3 * n**2 * r[0] - 2 * n * v[1], 2 * n * v[0], -(n**2) * r[2]])
+
+    def add_navigation(self, t: float, r, v, port_frame: bool = False) -> None:
+        account = self.account
+        r, v = np.asarray(r), np.asarray(v)
+        previous = self.previous
+        self.previous = (t, r, v, port_frame)
+        # homing logs times from its burn, the clock may restart between legs
+        if previous is None or previous[3] != port_frame or t <= previous[0]:
+            self.flush_window()
+            self.window_start = t
+            return
+        t_0, r_0, v_0, _ = previous
+        dt = t - t_0
+        account.commanded += self.command * dt
+        self.command = 0.0
+        # CW terms are negligible in the port frame, over the last metres
+        free = 0.0 if port_frame else self.free_acceleration(r_0, v_0) * dt
+        self.drift += v - v_0 - free
+        if t - self.window_start >= self.window:
+            self.flush_window()
+            self.window_start = t
+
+    def flush_window(self) -> None:
+        if self.account is not None:
+            self.account.measured += float(np.linalg.norm(self.drift))
+        self.drift = np.zeros(3)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self.account is None or record.thread != self.thread:
+            return
+        message = record.getMessage()
+        if message.startswith(("Nav,", "Port nav,")):
+            values = [float(value) for value in message.split(",")[1:]]
+            self.add_navigation(
+                values[0],
+                values[1:4],
+                values[4:7],
+                port_frame=message.startswith("Port"),
+            )
+        elif message.startswith(("Control,", "Port control,")):
+            values = [float(value) for value in message.split(",")[1:4]]
+            self.command = math.sqrt(sum(value**2 for value in values))
+        elif " impulse, " in message:
+            # CW targeting impulses, "<name> impulse, dv_x, dv_y, dv_z m/s"
+            values = [float(value) for value in message[:-4].split(",")[1:4]]
+            self.account.commanded += math.sqrt(sum(value**2 for value in values))
+
+    def end_step(self) -> StepAccount:
+        account = self.account
+        self.flush_window()
+        if self.levels is not None:
+            account.propellant, (account.main_delta_v, account.rcs_delta_v) = (
+                self.propellant_monitor.delta_v(
+                    self.levels, self.propellant_monitor.sample()
+                )
+            )
+        self.accounts.append(account)
+        self.account = None
+        logging.info(
+            f"Delta-v of {account.step}: planned {account.planned:.2f} m/s, actual {account.actual:.2f} m/s "
+            f"(main engine {account.main_delta_v:.2f} m/s, RCS {account.rcs_delta_v:.2f} m/s, "
+            f"commanded {account.commanded:.2f} m/s, measured {account.measured:.2f} m/s)"
+        )
+        if account.propellant:
+            used = ", ".join(
+                f"{resource} {amount:.2f}"
+                for resource, amount in account.propellant.items()
+            )
+            logging.info(f"Propellant used by {account.step}: {used}")
+        return account
+
+    def log_summary(self) -> None:
+        planned = sum(account.planned for account in self.accounts)
+        actual = sum(account.actual for account in self.accounts)
+        logging.info(
+            f"Delta-v budget: planned {planned:.2f} m/s, actual {actual:.2f} m/s"
+            + (f" ({100 * actual / planned:.0f} % of plan)" if planned else "")
+        )
@@ -0,0 +1,299 @@
+import math
+import logging
+import numpy as np
+from dataclasses import replace
+
+from src.initialization.game_helper_init import GameHelper
+from src.initialization.gnc_init import GNCHelper
+
+from src.mission.rdv_phase import RDVPhase
+from src.mission.leg_state_machine import (
+    LegAbortError,
+    LegState,
+    LegStateMachine,
+    NavSnapshot,
+    Transition,
+)
+from src.physics.mission_snapshot import MissionSnapshot, PlannedNode
+
+
+class DockingApproach(RDVPhase):
+    """Port-to-port final approach, guided and controlled in the target port frame.
+
+    The chaser first holds a standoff point on the target port axis, then
+    closes along the axis until capture. The CW terms are negligible over the
+    last tens of metres, so every port axis is controlled on its own with the
+    out-of-plane LQR gain. The loop runs faster as the range decreases.
+    Legs run as a LegStateMachine: the final approach flies back to the
+    standoff point when the chaser drifts more than `max_lateral` off the
+    port axis, and any leg turns the thrusters off and aborts the phase
+    when its tracking error exceeds `abort_error`.
+    """
+
+    def __init__(
+        self,
+        game_helper: GameHelper,
+        gnc_helper: GNCHelper,
+        min_period: float = 0.02,  # s
+        max_period: float = 0.1,  # s
+        rate_distance: float = 10.0,  # m, range below which the loop speeds up
+    ) -> None:
+        self.game_helper = game_helper
+        self.ports = game_helper.docking_port_helper
+        self.controller = gnc_helper.out_of_plane_controller
+        self.guidance = gnc_helper.smooth_guidance
+        self.min_period = min_period
+        self.max_period = max_period
+        self.rate_distance = rate_distance
+
+    def plan_phase(
+        self,
+        snapshot: MissionSnapshot,
+        standoff: float = 10,
+        duration: float = 60,
+        approach_duration: float = 60,
+        **params,
+    ) -> tuple:
+        # the port axis is only known in flight, the standoff leg is taken as
+        # long as the current range
+        delta_v = 3.75 * (
+            np.linalg.norm(snapshot.rel_pos) / duration + standoff / approach_duration
+        )
+        node = PlannedNode(
+            step="docking",
+            ut=snapshot.ut,
+            delta_v=float(delta_v),
+            direction="rcs",
+            burn_time=duration + approach_duration,
+            description=f"port-to-port approach from a {standoff} m standoff",
+        )
+        return [node], replace(
+            snapshot,
+            ut=snapshot.ut + 2 * duration + approach_duration,
+            rel_pos=(0.0, 0.0, 0.0),
+        )
+
+    def cycle_period(self, distance: float) -> float:
+        return min(
+            self.max_period,
+            max(self.min_period, self.max_period * distance / self.rate_distance),
+        )
+
+    def sample(self) -> NavSnapshot:
+        ut = self.game_helper.stream_helper.ut()
+        r, v = self.ports.port_state()
+        logging.info(
+            f"Port nav, {ut:.2f}, {r[0]:.3f}, {r[1]:.3f}, {r[2]:.3f}, {v[0]:.3f}, {v[1]:.3f}, {v[2]:.3f}"
+        )
+        snapshot = NavSnapshot(ut=ut, r=np.asarray(r), v=np.asarray(v))
+        t_0, _, _, duration = self.leg
+        self.tau = (ut - t_0) / duration
+        self.reference = self.ref_signal(tau=min(self.tau, 1))
+        return snapshot
+
+    def start_leg(self, t_0: float, p_i, p_f, duration: float) -> None:
+        for i, profile in enumerate(self.guidance.profiles):
+            profile.config_profile(p_i=p_i[i], p_f=p_f[i], duration=duration)
+        self.leg = (t_0, p_i, p_f, duration)
+        logging.info(f"Port frame leg from {np.round(p_i, 2)} m to {p_f} m")
+
+    def reference_position(self) -> np.ndarray:
+        in_plane_ref, out_of_plane_ref = self.reference
+        return np.array(
+            [in_plane_ref[0][0], in_plane_ref[1][0], out_of_plane_ref[0][0]]
+        )
+
+    def captured(self, snapshot: NavSnapshot) -> bool:
+        distance = float(np.linalg.norm(snapshot.r))
+        return distance < self.capture_distance or self.ports.docked()
+
+    def arrived(self, snapshot: NavSnapshot) -> bool:
+        return (
+            self.tau >= 1 and np.linalg.norm(snapshot.r - self.leg[2]) < self.tolerance
+        )
+
+    def track(self, snapshot: NavSnapshot) -> None:
+        r, v = snapshot.r, snapshot.v
+        in_plane_ref, out_of_plane_ref = self.reference
+        ref = (
+            (in_plane_ref[0][0], in_plane_ref[2][0]),
+            (in_plane_ref[1][0], in_plane_ref[3][0]),
+            (out_of_plane_ref[0][0], out_of_plane_ref[1][0]),
+        )
+        U = np.array(
+            [
+                float(
+                    self.controller.control(
+                        state=np.array([[r[i]], [v[i]]]),
+                        ref=np.array([[ref[i][0]], [ref[i][1]]]),
+                    )[0][0]
+                )
+                for i in range(3)
+            ]
+        )
+        U_BODY = self.ports.port_to_body(U)
+        self.game_helper.rcs_ctrl_helper.rcs_actuation(U_BODY)
+        logging.info(
+            f"Port control, {U[0]:.3f}, {U[1]:.3f}, {U[2]:.3f}, {U_BODY[0]:.3f}, {U_BODY[1]:.3f}, {U_BODY[2]:.3f}"
+        )
+
+    def retreat(self, snapshot: NavSnapshot) -> None:
+        self.start_leg(snapshot.ut, snapshot.r, self.retreat_point, self.leg[3])
+        self.tau = 0.0
+        self.reference = self.ref_signal(tau=0.0)
+
+    def stop(self, snapshot: NavSnapshot) -> None:
+        self.game_helper.rcs_ctrl_helper.set_translation(0.0, 0.0, 0.0)
+
+    def capture(self, snapshot: NavSnapshot) -> None:
+        logging.info(f"Captured at {np.linalg.norm(snapshot.r):.2f} m")
+        self.stop(snapshot)
+
+    def leg_states(
+        self, abort_error: float, capture: bool = False, max_lateral: float = None
+    ) -> list:
+        abort = Transition(
+            "aborted",
+            lambda snapshot: np.linalg.norm(snapshot.r - self.reference_position())
+            > abort_error,
+            f"tracking error above {abort_error:.1f} m",
+        )
+        tracking = [abort]
+        if capture:
+            tracking.insert(
+                0, Transition("captured", self.captured, "inside capture distance")
+            )
+        if max_lateral is not None:
+            tracking.append(
+                Transition(
+                    "retreat",
+                    lambda snapshot: math.hypot(snapshot.r[0], snapshot.r[2])
+                    > max_lateral,
+                    f"more than {max_lateral:.2f} m off the port axis",
+                )
+            )
+        return [
+            LegState(
+                "tracking",
+                action=self.track,
+                transitions=[
+                    *tracking,
+                    Transition("complete", self.arrived, "inside tolerance"),
+                    Transition(
+                        "timed_out",
+                        lambda snapshot: self.tau >= 2,
+                        "leg time elapsed outside tolerance",
+                    ),
+                ],
+            ),
+            LegState(
+                "retreat",
+                action=self.track,
+                on_enter=self.retreat,
+                log_level=logging.WARNING,
+                transitions=[
+                    abort,
+                    Transition(
+                        "retreated",
+                        lambda snapshot: self.arrived(snapshot) or self.tau >= 2,
+                        f"back at {self.retreat_point} m",
+                    ),
+                ],
+            ),
+            LegState("captured", on_enter=self.capture, terminal=True),
+            LegState("complete", on_enter=self.stop, terminal=True),
+            LegState(
+                "timed_out",
+                on_enter=self.stop,
+                terminal=True,
+                log_level=logging.WARNING,
+            ),
+            LegState(
+                "retreated",
+                on_enter=self.stop,
+                terminal=True,
+                log_level=logging.WARNING,
+            ),
+            LegState(
+                "aborted", on_enter=self.stop, terminal=True, log_level=logging.CRITICAL
+            ),
+        ]
+
+    def fly_leg(
+        self,
+        final_state: tuple,
+        duration: float,
+        tolerance: float,
+        abort_error: float,
+        capture_distance: float = None,
+        max_lateral: float = None,
+    ) -> str:
+        """Track a smooth profile in the port frame, returns how the leg ended."""
+        p_i, _ = self.ports.port_state()
+        self.ref_signal = self.guidance.ref_signal()
+        self.start_leg(self.game_helper.stream_helper.ut(), p_i, final_state, duration)
+        self.tolerance = tolerance
+        self.capture_distance = capture_distance
+        self.machine = LegStateMachine(
+            self.sample,
+            self.leg_states(abort_error, capture_distance is not None, max_lateral),
+            period=lambda snapshot: self.cycle_period(
+                float(np.linalg.norm(snapshot.r))
+            ),
+        )
+        return self.machine.run()
+
+    def execute_phase(
+        self,
+        standoff: float = 10,  # m, on the target port axis
+        duration: float = 60,  # s, to the standoff point
+        approach_duration: float = 60,  # s, from the standoff point to contact
+        tolerance: float = 0.5,  # m, at the standoff point
+        capture_distance: float = 0.3,  # m, port to port
+        chaser_port: str = None,  # part tag, first free port by default
+        target_port: str = None,  # part tag, first free port by default
+        abort_error: float = None,  # m, twice the standoff by default
+        max_lateral: float = 1.0,  # m, off the port axis during the final approach
+    ) -> None:
+        logging.info("===== Docking port approach phase =====")
+        att_ctrl_helper = self.game_helper.att_ctrl_helper
+        rcs_ctrl_helper = self.game_helper.rcs_ctrl_helper
+
+        self.ports.select_ports(chaser_port, target_port)
+        # SAS would fight the autopilot holding the chaser port on the port axis
+        att_ctrl_helper.disable_sas()
+        rcs_ctrl_helper.enable_rcs()
+        self.game_helper.vessel_control_helper.confirm()
+        if abort_error is None:
+            abort_error = 2 * standoff
+        # the final approach backs out to the standoff point when off the axis
+        self.retreat_point = (0, standoff, 0)
+        with self.game_helper.warp_scheduler.active_control():
+            att_ctrl_helper.point_at((0, -1, 0), self.ports.target_port.reference_frame)
+            att_ctrl_helper.wait_settled()
+            outcome = self.fly_leg((0, standoff, 0), duration, tolerance, abort_error)
+            if outcome in ("complete", "timed_out"):
+                outcome = self.fly_leg(
+                    (0, 0, 0),
+                    approach_duration,
+                    tolerance,
+                    abort_error,
+                    capture_distance,
+                    max_lateral,
+                )
+            rcs_ctrl_helper.set_translation(0.0, 0.0, 0.0)
+        captured = outcome == "captured"
+        att_ctrl_helper.release_autopilot()
+        self.ports.release()
+
+        if self.ports.docked():
+            logging.info("Docked")
+        elif not captured:
+            att_ctrl_helper.enable_sas()
+            # retreated, timed out or aborted, the mission cannot go on undocked
+            message = (
+                f"Docking port approach {outcome.replace('_', ' ')} without capture"
+            )
+            logging.critical(message)
+            raise LegAbortError(message)
+        logging.info("===== End of docking port approach phase =====")
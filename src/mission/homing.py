@@ -1,9 +1,13 @@
 import math
 import logging
 import time
+from dataclasses import replace
 from numpy import array
 
+from src.mission.leg_state_machine import LegAbortError
 from src.mission.rdv_phase import RDVPhase
+from src.helpers.tracer import tracer
+from src.physics.mission_snapshot import MissionSnapshot, PlannedNode
 from src.initialization.game_helper_init import GameHelper
 from src.initialization.gnc_init import GNCHelper
 
@@ -12,6 +16,14 @@ class Homing(RDVPhase):
     def __init__(self, game_helper: GameHelper, gnc_helper: GNCHelper) -> None:
         self.game_helper = game_helper
         self.gnc_helper = gnc_helper
+        self.guidance_state = {}
+        self.resume_state = None
+
+    def checkpoint_state(self) -> dict:
+        return self.guidance_state
+
+    def restore_state(self, state: dict) -> None:
+        self.resume_state = state or None
 
     # def prograde_drift_time(
     #     self,
@@ -32,10 +44,21 @@ class Homing(RDVPhase):
     #     return 2.0 / 3.0 * prograde_drift_distance / (height_difference * w)
 
     def cw_hohmann_transfer(self) -> tuple:
-        w = 2 * math.pi / self.game_helper.target.orbit.period
-        delta_h = (
-            self.game_helper.target.orbit.radius - self.game_helper.chaser.orbit.radius
+        # both radii from one snapshot, low rate streams can be a second apart
+        snapshot = MissionSnapshot.capture(self.game_helper)
+        w = self.game_helper.orb_dyn.mean_motion(snapshot.target)
+        return self.cw_hohmann_parameters(w, self.radius_difference(snapshot))
+
+    def radius_difference(self, snapshot: MissionSnapshot) -> float:
+        """Target radius minus chaser radius at the snapshot time."""
+        orb_dyn = self.game_helper.orb_dyn
+        return orb_dyn.radius_at_true_anomaly(
+            snapshot.target, orb_dyn.true_anomaly_at_ut(snapshot.target, snapshot.ut)
+        ) - orb_dyn.radius_at_true_anomaly(
+            snapshot.chaser, orb_dyn.true_anomaly_at_ut(snapshot.chaser, snapshot.ut)
         )
+
+    def cw_hohmann_parameters(self, w: float, delta_h: float) -> tuple:
         if delta_h < 0:
             logging.error("Chaser orbit is above target orbit")
             raise ValueError("Chaser orbit is above target orbit")
@@ -46,6 +69,77 @@ class Homing(RDVPhase):
         y_i = y_f - delta_y
         return y_i, delta_h, delta_v, delta_y
 
+    def trigger_time(self, y_i: float, w: float) -> float:
+        """Time the free CW drift reaches y_i, solved from one navigation read."""
+        ut = self.game_helper.stream_helper.ut()
+        in_plane_nav, _ = self.gnc_helper.navigation.output()
+        x_0, y_0, x_dot_0, y_dot_0 = (float(value[0]) for value in in_plane_nav)
+        if y_0 >= y_i:
+            return ut
+        drift = self.gnc_helper.homing_guidance.ref_signal(
+            initial_pos=(x_0, y_0, 0), initial_vel=(x_dot_0, y_dot_0, 0), epoch=ut
+        )
+        # mean drift as first guess, refined with Newton steps on y(tau)
+        drift_rate = 6 * w * x_0 - 3 * y_dot_0
+        if drift_rate <= 0:
+            raise LegAbortError(
+                f"Chaser at y = {y_0:.0f} m is not drifting toward y_i = {y_i:.0f} m "
+                f"(mean drift {drift_rate:.3f} m/s)"
+            )
+        tau = (y_i - y_0) / drift_rate
+        for _ in range(20):
+            in_plane, _ = drift(tau)
+            y, y_dot = in_plane[1][0], in_plane[3][0]
+            if y_dot <= 0:
+                break
+            step = (y - y_i) / y_dot
+            tau -= step
+            if abs(step) < 1e-3:
+                break
+        return ut + max(0.0, tau)
+
+    def plan_phase(self, snapshot: MissionSnapshot) -> tuple:
+        orb_dyn = self.game_helper.orb_dyn
+        w = orb_dyn.mean_motion(snapshot.target)
+        T_target = 2 * math.pi / w
+        delta_h = self.radius_difference(snapshot)
+        y_i, delta_h, delta_v, delta_y = self.cw_hohmann_parameters(w, delta_h)
+
+        # mean prograde drift of a lower circular orbit
+        drift_rate = 1.5 * w * delta_h
+        if drift_rate <= 0:
+            raise ValueError(
+                f"Chaser is not below the target (delta_h = {delta_h:.0f} m)"
+            )
+        t_trigger = snapshot.ut + max(0.0, (y_i - snapshot.rel_pos[1]) / drift_rate)
+        # no RCS force is reported before the RCS is deployed and enabled
+        rcs_burn_time = (
+            delta_v * snapshot.mass / snapshot.rcs_forward_force
+            if snapshot.rcs_forward_force > 0
+            else math.nan
+        )
+        nodes = [
+            PlannedNode(
+                step="homing",
+                ut=t_trigger,
+                delta_v=delta_v,
+                direction="prograde",
+                burn_time=rcs_burn_time,
+                description=f"CW Hohmann transfer start at y = {y_i:.0f} m (RCS)",
+            ),
+            PlannedNode(
+                step="homing",
+                ut=t_trigger + T_target / 2,
+                delta_v=delta_v,
+                direction="prograde",
+                burn_time=rcs_burn_time,
+                description=f"CW Hohmann transfer end at y = {y_i + delta_y:.0f} m (RCS)",
+            ),
+        ]
+        return nodes, replace(
+            snapshot, ut=t_trigger + T_target, rel_pos=(0.0, y_i + delta_y, 0.0)
+        )
+
     def execute_phase(self) -> None:
         logging.info("===== Homing Phase =====")
 
@@ -62,80 +156,103 @@ class Homing(RDVPhase):
         logging.info(f"Altitude difference = {delta_h} m")
         logging.info(f"Delta V in the prograde direction = {delta_v} m/s")
         logging.info(f"Distance in prograde direction as a result of dv = {delta_y} m")
+        self.game_helper.vessel_control_helper.confirm()
 
-        time.sleep(5)
-        self.game_helper.space_center_helper.warp_factor(2)
+        state, self.resume_state = self.resume_state, None
+        if state is None:
+            t_0 = self.trigger_time(y_i=y_i, w=w)
+            logging.info(f"Homing burn predicted at {t_0:.2f} s")
 
-        while self.game_helper.stream_helper.rel_pos()[1] < y_i:
-            time.sleep(1.0)
-            y_i, _, _, _ = self.cw_hohmann_transfer()
-        self.game_helper.space_center_helper.warp_factor(0)
-        time.sleep(3.0)
-        y_i, delta_h, delta_v, delta_y = self.cw_hohmann_transfer()
+            # print(f"y={self.game_helper.stream_helper.rel_pos()[1]} m")
+            # print(
+            #     f"y_i={y_i} m, delta_h={delta_h} m, delta_v={delta_v} m/s, delta_y={delta_y} m"
+            # )
 
-        # print(f"y={self.game_helper.stream_helper.rel_pos()[1]} m")
-        # print(
-        #     f"y_i={y_i} m, delta_h={delta_h} m, delta_v={delta_v} m/s, delta_y={delta_y} m"
-        # )
+            # RCS node burns start 5 s before the node time
+            self.game_helper.node_helper.add_node(
+                dv=delta_v,
+                time=t_0 + 5,
+                absolute=True,
+                direction="prograde",
+            )
 
-        in_plane_nav, out_of_plane_nav = self.gnc_helper.navigation.output()
-        ref_signal = self.gnc_helper.cw_guidance.ref_signal(
+            circ_burn_done = False
+            self.game_helper.node_helper.rcs_node_execution()
+            self.guidance_state = {
+                "t_0": t_0,
+                "y_i": y_i,
+                "delta_h": delta_h,
+                "delta_v": delta_v,
+                "circ_burn_done": circ_burn_done,
+            }
+            self.save_checkpoint()
+        else:
+            logging.info("Resuming homing after the first burn")
+            self.guidance_state = state
+            t_0 = state["t_0"]
+            y_i = state["y_i"]
+            delta_h = state["delta_h"]
+            delta_v = state["delta_v"]
+            circ_burn_done = state["circ_burn_done"]
+
+        ref_signal = self.gnc_helper.homing_guidance.ref_signal(
             initial_pos=(abs(delta_h), y_i, 0),
             initial_vel=(0, 7 * w / 4 * abs(delta_h), 0),
+            epoch=t_0,
         )
-        self.game_helper.node_helper.add_node(
-            dv=delta_v,
-            time=5,
-            absolute=False,
-            direction="prograde",
-        )
+        tau = self.game_helper.stream_helper.ut() - t_0
+        if tau < T_target / 4:
+            self.game_helper.warp_scheduler.warp_to(t_0 + T_target / 4)
+        # reference is held at its value at T/2 once the circularization is due
+        in_plane_ref, out_of_plane_ref = ref_signal(min(tau, T_target / 2))
+        with self.game_helper.warp_scheduler.active_control():
+            while tau < T_target:
+                with tracer.cycle():
+                    tau = self.game_helper.stream_helper.ut() - t_0
+                    if tau <= T_target / 4:
+                        pass
+                    else:
+                        in_plane_nav, out_of_plane_nav = (
+                            self.gnc_helper.navigation.output()
+                        )
+                        logging.info(
+                            f"Nav, {tau:.2f}, {in_plane_nav[0][0]:.2f}, {in_plane_nav[1][0]:.2f}, {out_of_plane_nav[0][0]:.2f}, {in_plane_nav[2][0]:.2f}, {in_plane_nav[3][0]:.2f}, {out_of_plane_nav[1][0]:.2f}"
+                        )
+                        if tau <= T_target / 2:
+                            in_plane_ref, out_of_plane_ref = ref_signal(tau)
+                        elif not circ_burn_done:
+                            self.game_helper.node_helper.add_node(
+                                dv=delta_v,
+                                time=5,
+                                absolute=False,
+                                direction="prograde",
+                            )
+                            self.game_helper.node_helper.rcs_node_execution()
+                            circ_burn_done = True
+                            self.guidance_state["circ_burn_done"] = True
+                            self.save_checkpoint()
+                        logging.info(
+                            f"Guid, {in_plane_ref[0][0]:.2f}, {in_plane_ref[1][0]:.2f}, {in_plane_ref[2][0]:.2f}, {in_plane_ref[3][0]:.2f}"
+                        )
 
-        circ_burn_done = False
-        t_0 = self.game_helper.stream_helper.ut()
-        tau = 0
-        self.game_helper.node_helper.rcs_node_execution()
-        self.game_helper.space_center_helper.warp_time(
-            warping_time=T_target / 4, absolute=False
-        )
-        while tau < T_target:
-            tau = self.game_helper.stream_helper.ut() - t_0
-            if tau <= T_target / 4:
-                pass
-            else:
-                in_plane_nav, out_of_plane_nav = self.gnc_helper.navigation.output()
-                logging.info(
-                    f"Nav, {tau:.2f}, {in_plane_nav[0][0]:.2f}, {in_plane_nav[1][0]:.2f}, {out_of_plane_nav[0][0]:.2f}, {in_plane_nav[2][0]:.2f}, {in_plane_nav[3][0]:.2f}, {out_of_plane_nav[1][0]:.2f}"
-                )
-                if tau <= T_target / 2:
-                    in_plane_ref, out_of_plane_ref = ref_signal(tau)
-                elif not circ_burn_done:
-                    self.game_helper.node_helper.add_node(
-                        dv=delta_v,
-                        time=5,
-                        absolute=False,
-                        direction="prograde",
-                    )
-                    self.game_helper.node_helper.rcs_node_execution()
-                    circ_burn_done = True
-                logging.info(
-                    f"Guid, {in_plane_ref[0][0]:.2f}, {in_plane_ref[1][0]:.2f}, {in_plane_ref[2][0]:.2f}, {in_plane_ref[3][0]:.2f}"
-                )
-
-                u_plane = self.gnc_helper.in_plane_controller.control(
-                    in_plane_nav, in_plane_ref
-                )
-                u_out_of_plane = self.gnc_helper.out_of_plane_controller.control(
-                    out_of_plane_nav, out_of_plane_ref
-                )
-                u = (float(u_plane[0]), float(u_plane[1]), float(u_out_of_plane))
-                u_body = self.game_helper.space_center_helper.transform_position(
-                    vector=u,
-                    from_frame=self.game_helper.chaser.orbital_reference_frame,
-                    to_frame=self.game_helper.chaser.reference_frame,
-                )
-                self.game_helper.rcs_ctrl_helper.rcs_actuation(u_body)
-                logging.info(
-                    f"Control, {u[0]:.2f}, {u[1]:.2f}, {u[2]:.2f}, {u_body[0]:.2f}, {u_body[1]:.2f}, {u_body[2]:.2f}"
-                )
-                time.sleep(0.2)
+                        in_plane_control, out_of_plane_control = (
+                            self.gnc_helper.homing_controllers(t_0 + tau)
+                        )
+                        u_plane = in_plane_control.control(in_plane_nav, in_plane_ref)
+                        u_out_of_plane = out_of_plane_control.control(
+                            out_of_plane_nav, out_of_plane_ref
+                        )
+                        u = (
+                            float(u_plane[0]),
+                            float(u_plane[1]),
+                            float(u_out_of_plane),
+                        )
+                        u_body = self.game_helper.vessel_control_helper.rotate_orbital_to_body(
+                            u
+                        )
+                        self.game_helper.rcs_ctrl_helper.rcs_actuation(u_body)
+                        logging.info(
+                            f"Control, {u[0]:.2f}, {u[1]:.2f}, {u[2]:.2f}, {u_body[0]:.2f}, {u_body[1]:.2f}, {u_body[2]:.2f}"
+                        )
+                        time.sleep(0.2)
         logging.info("===== Homing Phase finished =====")
@@ -0,0 +1,120 @@
+import time
+import logging
+import threading
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Union
+
+from src.helpers.tracer import tracer
+
+
+class LegAbortError(RuntimeError):
+    pass
+
+
+@dataclass
+class NavSnapshot:
+    """Relative state sampled once per tick, shared by every condition and action."""
+
+    ut: float  # s
+    r: np.ndarray  # m
+    v: np.ndarray  # m/s
+    state: tuple = None  # navigation output, as the controllers take it
+
+
+@dataclass
+class Transition:
+    target: str
+    condition: Callable[[NavSnapshot], bool]
+    reason: str  # logged when the transition is taken
+
+
+@dataclass
+class LegState:
+    name: str
+    action: Optional[Callable[[NavSnapshot], None]] = None  # every tick in the state
+    on_enter: Optional[Callable[[NavSnapshot], None]] = None  # on transitions to it
+    transitions: List[Transition] = field(default_factory=list)  # by priority
+    terminal: bool = False
+    log_level: int = logging.INFO  # of the transitions to the state
+
+
+class LegStateMachine:
+    """Closed loop leg run as states evaluated once per control tick.
+
+    Each tick samples the navigation once. The transitions of the current
+    state are checked in order against that snapshot and the first whose
+    condition holds is taken, then the action of the state runs on the same
+    snapshot, so hold, retreat and abort modes start within one period.
+    Transitions can also be commanded from another thread and are taken at
+    the next tick. Ticks are scheduled on a fixed grid, the time spent in a
+    tick is not added to the period.
+    """
+
+    def __init__(
+        self,
+        sample: Callable[[], NavSnapshot],
+        states: List[LegState],
+        period: Union[float, Callable[[NavSnapshot], float]] = 0.1,  # s
+    ) -> None:
+        self.sample = sample
+        self.states: Dict[str, LegState] = {state.name: state for state in states}
+        self.period = period if callable(period) else lambda snapshot: period
+        self.state = states[0]
+        self.entered_at = None  # s, game time of the last transition
+        self.commanded = None
+        self.commanded_lock = threading.Lock()
+
+    def command(self, target: str, reason: str) -> None:
+        """Requests a transition, taken at the next tick whatever the state."""
+        if target not in self.states:
+            raise ValueError(f"Unknown leg state '{target}'")
+        with self.commanded_lock:
+            self.commanded = (target, reason)
+
+    def time_in_state(self, snapshot: NavSnapshot) -> float:
+        return snapshot.ut - self.entered_at
+
+    def enter(self, target: str, reason: str, snapshot: NavSnapshot) -> None:
+        state = self.states[target]
+        logging.log(
+            state.log_level, f"Leg state {self.state.name} -> {target}: {reason}"
+        )
+        self.state = state
+        self.entered_at = snapshot.ut
+        if state.on_enter is not None:
+            state.on_enter(snapshot)
+
+    def tick(self) -> NavSnapshot:
+        snapshot = self.sample()
+        if self.entered_at is None:
+            self.entered_at = snapshot.ut
+        with self.commanded_lock:
+            commanded, self.commanded = self.commanded, None
+        if commanded is not None:
+            self.enter(*commanded, snapshot)
+        else:
+            for transition in self.state.transitions:
+                if transition.condition(snapshot):
+                    self.enter(transition.target, transition.reason, snapshot)
+                    break
+        if self.state.action is not None and not self.state.terminal:
+            self.state.action(snapshot)
+        return snapshot
+
+    def run(self) -> str:
+        """Ticks until a terminal state is reached, returns its name."""
+        next_tick = time.perf_counter()
+        while not self.state.terminal:
+            with tracer.cycle():
+                snapshot = self.tick()
+            if self.state.terminal:
+                break
+            next_tick += self.period(snapshot)
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # overran the period, the grid restarts from now
+                next_tick = time.perf_counter()
+        return self.state.name
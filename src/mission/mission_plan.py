@@ -0,0 +1,347 @@
+import json
+import math
+import inspect
+import tomllib
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from src.mission.orbit_raise import OrbitRaise
+from src.mission.phasing import OrbitPhasing
+from src.mission.homing import Homing
+from src.mission.close_range import CloseRangeManeuver
+from src.mission.docking import DockingApproach
+from src.mission.vessel_actions import StageSeparation, DeployParts, Wait
+from src.mission.preconditions import PRECONDITIONS
+from src.gnc.relative_dynamics import RELATIVE_DYNAMICS
+
+# phase type used in mission files -> (Mission attribute, phase class)
+PHASE_TYPES = {
+    "orbit_raise": ("orbit_raise", OrbitRaise),
+    "orbit_phasing": ("orbit_phasing", OrbitPhasing),
+    "homing": ("homing", Homing),
+    "close_range": ("close_range_maneuver", CloseRangeManeuver),
+    "docking": ("docking", DockingApproach),
+    "stage_separation": ("stage_separation", StageSeparation),
+    "deploy_parts": ("deploy_parts", DeployParts),
+    "wait": ("wait", Wait),
+}
+
+# phase types acting on the vessel without maneuvering
+VESSEL_ACTIONS = ("stage_separation", "deploy_parts", "wait")
+
+# mission parameters understood by MissionInit and their defaults
+MISSION_PARAMETERS = {
+    "r_bar_safety_distance": 2000.0,  # m
+    "phase_offset_end_phasing": 3.0,  # degrees
+    "keep_out_radius": 50.0,  # m, 0 disables the close range safety checks
+    "approach_cone_half_angle": 30.0,  # degrees
+    "phasing_v_bar_tolerance": 1000.0,  # m, corrected during phasing when exceeded
+    "phasing_r_bar_tolerance": 200.0,  # m, reported during phasing when exceeded
+    "body_j2": 0.0,  # oblateness for the phasing predictions, 0 is two-body
+    "relative_dynamics": "cw",  # or "tschauner_hempel", "nonlinear", for homing
+}
+
+
+class MissionFileError(ValueError):
+    pass
+
+
+def is_number(value) -> bool:
+    return (
+        isinstance(value, (int, float))
+        and not isinstance(value, bool)
+        and math.isfinite(value)
+    )
+
+
+def positive(value) -> bool:
+    return is_number(value) and value > 0
+
+
+def non_negative(value) -> bool:
+    return is_number(value) and value >= 0
+
+
+def vector(value) -> bool:
+    return isinstance(value, tuple) and len(value) == 3 and all(map(is_number, value))
+
+
+# phase type -> parameter -> (check, expected value for the error message)
+PARAMETER_CHECKS = {
+    "close_range": {
+        "final_state": (vector, "3 numbers"),
+        "duration": (positive, "a positive number"),
+        "tolerance": (positive, "a positive number"),
+        "mode": (
+            lambda value: value in ("tracking", "targeting"),
+            "tracking or targeting",
+        ),
+        "correction_interval": (positive, "a positive number"),
+        "hold_error": (positive, "a positive number"),
+        "abort_error": (positive, "a positive number"),
+        "max_hold": (positive, "a positive number"),
+    },
+    "docking": {
+        "standoff": (positive, "a positive number"),
+        "duration": (positive, "a positive number"),
+        "approach_duration": (positive, "a positive number"),
+        "tolerance": (positive, "a positive number"),
+        "capture_distance": (positive, "a positive number"),
+        "chaser_port": (lambda value: isinstance(value, str), "a part tag"),
+        "target_port": (lambda value: isinstance(value, str), "a part tag"),
+        "abort_error": (positive, "a positive number"),
+        "max_lateral": (positive, "a positive number"),
+    },
+    "deploy_parts": {
+        "antennas": (lambda value: isinstance(value, bool), "true or false"),
+        "solar_panels": (lambda value: isinstance(value, bool), "true or false"),
+    },
+    "wait": {
+        "duration": (positive, "a positive number"),
+    },
+}
+
+# mission parameters with a range, the others only need their default type
+MISSION_PARAMETER_CHECKS = {
+    "r_bar_safety_distance": (non_negative, "a non-negative number"),
+    "phase_offset_end_phasing": (is_number, "a finite number"),
+    "keep_out_radius": (non_negative, "a non-negative number"),
+    "approach_cone_half_angle": (
+        lambda value: is_number(value) and 0 < value < 90,
+        "between 0 and 90 degrees",
+    ),
+    "phasing_v_bar_tolerance": (positive, "a positive number"),
+    "phasing_r_bar_tolerance": (positive, "a positive number"),
+    "body_j2": (non_negative, "a non-negative number"),
+}
+
+
+@dataclass
+class Precondition:
+    check: str
+    value: Optional[float] = None
+
+
+@dataclass
+class MissionStep:
+    name: str
+    phase: str
+    params: dict = field(default_factory=dict)
+    depends_on: List[str] = field(default_factory=list)
+    preconditions: List[Precondition] = field(default_factory=list)
+    timeout: Optional[float] = None  # s of game time
+
+
+@dataclass
+class MissionPlan:
+    name: str
+    parameters: dict
+    steps: List[MissionStep]  # topologically sorted
+    path: str = ""
+
+    def step(self, name: str) -> MissionStep:
+        for step in self.steps:
+            if step.name == name:
+                return step
+        raise MissionFileError(f"Unknown mission step '{name}'")
+
+    def approach_axis(self) -> tuple:
+        """Direction of the last close range waypoint, V-bar if there is none."""
+        waypoints = [
+            step.params["final_state"]
+            for step in self.steps
+            if step.phase == "close_range" and "final_state" in step.params
+        ]
+        if waypoints and any(waypoints[-1]):
+            return tuple(float(value) for value in waypoints[-1])
+        return (0.0, 1.0, 0.0)
+
+    def steps_from(self, name: Optional[str] = None) -> List[MissionStep]:
+        if name is None:
+            return self.steps
+        return self.steps[self.steps.index(self.step(name)) :]
+
+
+class MissionFileHelper:
+    """Load a mission description file into a validated MissionPlan.
+
+    Steps run in file order unless they declare `depends_on`; a step without
+    `depends_on` depends on the step before it. Everything is checked here so
+    that a bad mission file fails before connecting to the game.
+    """
+
+    @classmethod
+    def load(cls, path: str) -> MissionPlan:
+        path = Path(path)
+        try:
+            if path.suffix == ".json":
+                with open(path, "r") as file:
+                    content = json.load(file)
+            elif path.suffix == ".toml":
+                with open(path, "rb") as file:
+                    content = tomllib.load(file)
+            elif path.suffix in (".yaml", ".yml"):
+                try:
+                    import yaml
+                except ImportError:
+                    raise MissionFileError("YAML mission files require PyYAML")
+                with open(path, "r") as file:
+                    content = yaml.safe_load(file)
+            else:
+                raise MissionFileError(f"Unsupported mission file format: {path}")
+        except (OSError, json.JSONDecodeError, tomllib.TOMLDecodeError) as e:
+            raise MissionFileError(f"Cannot read mission file {path}: {e}")
+        plan = cls.parse(content)
+        plan.path = str(path)
+        return plan
+
+    @classmethod
+    def parse(cls, content: dict) -> MissionPlan:
+        if not isinstance(content, dict) or not content.get("steps"):
+            raise MissionFileError("Mission file must define a list of steps")
+
+        parameters = dict(MISSION_PARAMETERS)
+        raw_parameters = content.get("parameters", {})
+        if not isinstance(raw_parameters, dict):
+            raise MissionFileError("Mission parameters must be a table of values")
+        for key, value in raw_parameters.items():
+            if key not in MISSION_PARAMETERS:
+                raise MissionFileError(f"Unknown mission parameter '{key}'")
+            # float(True) is 1.0, booleans are only taken by boolean parameters
+            if isinstance(value, bool) != isinstance(MISSION_PARAMETERS[key], bool):
+                raise MissionFileError(f"Invalid value {value!r} for parameter '{key}'")
+            try:
+                parameters[key] = type(MISSION_PARAMETERS[key])(value)
+            except (TypeError, ValueError):
+                raise MissionFileError(f"Invalid value {value!r} for parameter '{key}'")
+            check, expected = MISSION_PARAMETER_CHECKS.get(key, (None, None))
+            if check is not None and not check(parameters[key]):
+                raise MissionFileError(f"Parameter '{key}' must be {expected}")
+        if parameters["relative_dynamics"] not in RELATIVE_DYNAMICS:
+            raise MissionFileError(
+                f"Unknown relative dynamics '{parameters['relative_dynamics']}'"
+            )
+
+        if not isinstance(content["steps"], list):
+            raise MissionFileError("Mission file must define a list of steps")
+        if not isinstance(content.get("name", ""), str):
+            raise MissionFileError("Mission name must be a string")
+        steps = []
+        previous = None
+        for raw_step in content["steps"]:
+            step = cls.parse_step(raw_step, previous)
+            if step.name in (s.name for s in steps):
+                raise MissionFileError(f"Duplicate mission step '{step.name}'")
+            steps.append(step)
+            previous = step.name
+
+        return MissionPlan(
+            name=content.get("name", "mission name"),
+            parameters=parameters,
+            steps=cls.sort_steps(steps),
+        )
+
+    @classmethod
+    def parse_step(cls, raw_step: dict, previous: Optional[str]) -> MissionStep:
+        if not isinstance(raw_step, dict):
+            raise MissionFileError(f"Mission step must be a table, got {raw_step!r}")
+        name = raw_step.get("name", raw_step.get("phase"))
+        phase = raw_step.get("phase")
+        if not isinstance(phase, str) or phase not in PHASE_TYPES:
+            raise MissionFileError(f"Step '{name}': unknown phase type '{phase}'")
+        if not isinstance(name, str):
+            raise MissionFileError(f"Mission step name must be a string, got {name!r}")
+
+        raw_params = raw_step.get("params", {})
+        if not isinstance(raw_params, dict):
+            raise MissionFileError(f"Step '{name}': params must be a table")
+        params = {
+            key: tuple(value) if isinstance(value, list) else value
+            for key, value in raw_params.items()
+        }
+        phase_class = PHASE_TYPES[phase][1]
+        try:
+            inspect.signature(phase_class.execute_phase).bind(None, **params)
+        except TypeError as e:
+            raise MissionFileError(f"Step '{name}': invalid parameters: {e}")
+        for key, value in params.items():
+            check, expected = PARAMETER_CHECKS.get(phase, {}).get(key, (None, None))
+            if check is not None and value is not None and not check(value):
+                raise MissionFileError(
+                    f"Step '{name}': parameter '{key}' must be {expected}, got {value!r}"
+                )
+
+        preconditions = []
+        raw_conditions = raw_step.get("preconditions", [])
+        if not isinstance(raw_conditions, list):
+            raise MissionFileError(f"Step '{name}': preconditions must be a list")
+        for raw_condition in raw_conditions:
+            try:
+                condition = Precondition(**raw_condition)
+            except TypeError:
+                raise MissionFileError(
+                    f"Step '{name}': invalid precondition {raw_condition!r}"
+                )
+            if condition.value is not None and not is_number(condition.value):
+                raise MissionFileError(
+                    f"Step '{name}': precondition '{condition.check}' value must be a number"
+                )
+            if not isinstance(condition.check, str) or (
+                condition.check not in PRECONDITIONS
+            ):
+                raise MissionFileError(
+                    f"Step '{name}': unknown precondition '{condition.check}'"
+                )
+            if PRECONDITIONS[condition.check][1] != (condition.value is not None):
+                raise MissionFileError(
+                    f"Step '{name}': precondition '{condition.check}' value mismatch"
+                )
+            preconditions.append(condition)
+
+        timeout = raw_step.get("timeout")
+        if timeout is not None and not positive(timeout):
+            raise MissionFileError(f"Step '{name}': timeout must be a positive number")
+
+        depends_on = raw_step.get("depends_on")
+        if depends_on is None:
+            depends_on = [] if previous is None else [previous]
+        elif isinstance(depends_on, str):
+            depends_on = [depends_on]
+        elif not isinstance(depends_on, list) or not all(
+            isinstance(dependency, str) for dependency in depends_on
+        ):
+            raise MissionFileError(f"Step '{name}': depends_on must be a list of steps")
+
+        return MissionStep(
+            name=name,
+            phase=phase,
+            params=params,
+            depends_on=list(depends_on),
+            preconditions=preconditions,
+            timeout=timeout,
+        )
+
+    @classmethod
+    def sort_steps(cls, steps: List[MissionStep]) -> List[MissionStep]:
+        names = [step.name for step in steps]
+        for step in steps:
+            for dependency in step.depends_on:
+                if dependency not in names:
+                    raise MissionFileError(
+                        f"Step '{step.name}' depends on unknown step '{dependency}'"
+                    )
+
+        # Kahn's algorithm, keeping file order between independent steps
+        done = set()
+        ordered = []
+        pending = list(steps)
+        while pending:
+            ready = [s for s in pending if set(s.depends_on) <= done]
+            if not ready:
+                cycle = ", ".join(s.name for s in pending)
+                raise MissionFileError(f"Dependency cycle between steps: {cycle}")
+            ordered.append(ready[0])
+            done.add(ready[0].name)
+            pending.remove(ready[0])
+        return ordered
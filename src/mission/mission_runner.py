@@ -0,0 +1,191 @@
+import logging
+from typing import List, Optional, Tuple
+
+from src.initialization.game_helper_init import GameHelper
+from src.initialization.gnc_init import GNCHelper
+from src.initialization.mission_init import Mission
+from src.gnc.guidance.cw_safety import UnsafeTrajectoryError
+from src.mission.checkpoint import Checkpoint, CheckpointStore
+from src.mission.delta_v_accounting import DeltaVAccounting
+from src.mission.mission_plan import (
+    MissionPlan,
+    MissionStep,
+    PHASE_TYPES,
+    VESSEL_ACTIONS,
+)
+from src.mission.preconditions import PRECONDITIONS
+from src.mission.rdv_phase import RDVPhase
+from src.helpers.tracer import tracer
+from src.physics.mission_snapshot import MissionSnapshot, PlannedNode
+
+
+class MissionPreconditionError(RuntimeError):
+    pass
+
+
+class MissionTimeoutError(RuntimeError):
+    pass
+
+
+class MissionRunner:
+    def __init__(
+        self,
+        plan: MissionPlan,
+        mission: Mission,
+        game_helper: GameHelper,
+        gnc_helper: GNCHelper = None,
+        checkpoint_store: CheckpointStore = None,
+        checkpoint: Checkpoint = None,
+        accounting: DeltaVAccounting = None,
+    ) -> None:
+        self.plan = plan
+        self.accounting = accounting
+        self.planned_delta_v = {}  # step name -> m/s
+        self.mission = mission
+        self.game_helper = game_helper
+        self.gnc_helper = gnc_helper
+        self.checkpoint_store = checkpoint_store
+        self.checkpoint = checkpoint or Checkpoint(
+            mission_name=plan.name, mission_file=plan.path
+        )
+
+    def phase(self, step: MissionStep) -> RDVPhase:
+        return getattr(self.mission, PHASE_TYPES[step.phase][0])
+
+    def save_checkpoint(self, phase: RDVPhase = None) -> None:
+        if self.checkpoint_store is None:
+            return
+        checkpoint = self.checkpoint
+        if phase is not None and checkpoint.current_step is not None:
+            checkpoint.phase_state[checkpoint.current_step] = phase.checkpoint_state()
+        checkpoint.vessels = CheckpointStore.capture_vessels(self.game_helper)
+        checkpoint.nodes = CheckpointStore.capture_nodes(self.game_helper)
+        if self.gnc_helper is not None:
+            checkpoint.gains = self.gnc_helper.gains()
+        checkpoint.ut = self.game_helper.stream_helper.ut()
+        self.checkpoint_store.save(checkpoint)
+
+    def check_preconditions(self, step: MissionStep) -> None:
+        for condition in step.preconditions:
+            check, takes_value = PRECONDITIONS[condition.check]
+            args = (condition.value,) if takes_value else ()
+            if not check(self.game_helper, *args):
+                logging.critical(
+                    f"Precondition {condition.check} failed before step {step.name}"
+                )
+                raise MissionPreconditionError(
+                    f"Precondition '{condition.check}' failed before '{step.name}'"
+                )
+
+    def execute_step(self, step: MissionStep) -> None:
+        logging.info(f"===== Mission step: {step.name} ({step.phase}) =====")
+        self.check_preconditions(step)
+        phase = self.phase(step)
+        phase.checkpoint_hook = self.save_checkpoint
+
+        self.checkpoint.current_step = step.name
+        self.save_checkpoint()
+
+        if self.accounting is not None:
+            self.accounting.start_step(
+                step.name,
+                self.planned_delta_v.get(step.name, 0.0),
+                vessel_action=step.phase in VESSEL_ACTIONS,
+            )
+        t_start = self.game_helper.stream_helper.ut()
+        phase.execute_phase(**step.params)
+        elapsed = self.game_helper.stream_helper.ut() - t_start
+        tracer.report(step.name)
+        if self.accounting is not None:
+            self.accounting.end_step()
+
+        self.checkpoint.phase_state[step.name] = phase.checkpoint_state()
+        self.checkpoint.completed_steps.append(step.name)
+        self.checkpoint.current_step = None
+        self.save_checkpoint()
+
+        # phases block until done, so a timeout is only detected at step end
+        if step.timeout is not None and elapsed > step.timeout:
+            logging.critical(
+                f"Step {step.name} took {elapsed:.1f} s (timeout: {step.timeout} s)"
+            )
+            raise MissionTimeoutError(f"Step '{step.name}' timed out")
+
+    def resume_step(self) -> Optional[str]:
+        """Step to continue from according to the checkpoint, None if done."""
+        if self.checkpoint.current_step is not None:
+            return self.checkpoint.current_step
+        for step in self.plan.steps:
+            if step.name not in self.checkpoint.completed_steps:
+                return step.name
+        return None
+
+    def resume(self) -> None:
+        self.checkpoint_store.check_live_state(self.checkpoint, self.game_helper)
+        start_from = self.resume_step()
+        if start_from is None:
+            logging.info("Checkpoint shows a completed mission, nothing to resume")
+            return
+        state = self.checkpoint.phase_state.get(start_from)
+        if state:
+            self.phase(self.plan.step(start_from)).restore_state(state)
+        self.run(start_from=start_from)
+
+    def dry_run(
+        self, snapshot: MissionSnapshot, start_from: Optional[str] = None
+    ) -> Tuple[List[PlannedNode], MissionSnapshot]:
+        """Plan every step from one snapshot, without touching the vessel."""
+        nodes = []
+        for step in self.plan.steps_from(start_from):
+            step_nodes, snapshot = self.phase(step).plan_phase(snapshot, **step.params)
+            for node in step_nodes:
+                node.step = step.name
+            nodes.extend(step_nodes)
+        return nodes, snapshot
+
+    def check_plan(self, start_from: Optional[str] = None) -> None:
+        """Plan the remaining steps once, so an unsafe leg is rejected before flying.
+
+        The planned delta-v of each step is kept for the delta-v accounting.
+        """
+        safety_enabled = self.mission.close_range_maneuver.safety_checker.enabled
+        if not safety_enabled and self.accounting is None:
+            return
+        self.planned_delta_v = {}
+        try:
+            nodes, _ = self.dry_run(
+                MissionSnapshot.capture(self.game_helper), start_from
+            )
+        except UnsafeTrajectoryError:
+            raise
+        except (ArithmeticError, ValueError) as e:
+            # planning from the launch state can fail, e.g. before the RCS is
+            # deployed, the mission is flown without a plan
+            logging.warning(f"Mission could not be planned before flying: {e}")
+            if safety_enabled:
+                logging.warning("Close range legs are only checked from the live state")
+            return
+        if safety_enabled:
+            logging.info("Close range legs passed the safety checks")
+        for node in nodes:
+            self.planned_delta_v[node.step] = self.planned_delta_v.get(
+                node.step, 0.0
+            ) + abs(node.delta_v)
+
+    def run(self, start_from: Optional[str] = None) -> None:
+        self.check_plan(start_from)
+        steps = self.plan.steps_from(start_from)
+        if start_from is not None:
+            logging.info(f"Resuming mission from step {start_from}")
+        if self.accounting is not None:
+            logging.getLogger().addHandler(self.accounting)
+        try:
+            for step in steps:
+                self.execute_step(step)
+        finally:
+            if self.accounting is not None:
+                logging.getLogger().removeHandler(self.accounting)
+                self.accounting.log_summary()
+                if self.accounting.propellant_monitor is not None:
+                    self.accounting.propellant_monitor.release()
+        logging.info(f"===== Mission {self.plan.name} completed =====")
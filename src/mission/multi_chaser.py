@@ -0,0 +1,108 @@
+import time
+import logging
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from src.game_connector import ConnectionManager, VesselPairConnector
+from src.initialization.game_helper_init import GameHelperInit
+from src.initialization.runner_init import RunnerInit
+from src.mission.checkpoint import CheckpointStore
+from src.mission.mission_plan import MissionPlan
+
+
+@dataclass
+class ChaserMission:
+    chaser_id: str
+    target_id: str
+    plan: MissionPlan
+    checkpoint_path: Optional[str] = None
+
+
+@dataclass
+class ChaserMissionResult:
+    chaser_id: str
+    succeeded: bool
+    duration: float  # wall clock s
+    error: Optional[str] = None
+
+
+class MultiChaserScheduler:
+    """Run several chaser missions at once over a shared connection pool.
+
+    Every mission runs its own loops in a worker thread, with its own streams
+    and vessel objects on the pooled connection it leased, and its own log.
+    Missions are spread evenly over the pool connections and time warp is
+    serialized through the pool warp lock.
+    """
+
+    def __init__(
+        self,
+        pool: ConnectionManager,
+        missions: List[ChaserMission],
+        max_concurrent: int = None,
+    ) -> None:
+        self.pool = pool
+        self.missions = missions
+        self.max_concurrent = max_concurrent or len(missions)
+
+    def run_mission(self, mission: ChaserMission) -> ChaserMissionResult:
+        t_start = time.perf_counter()
+        connector = None
+        game_helper = None
+        try:
+            connector = VesselPairConnector(
+                pool=self.pool,
+                chaser_id=mission.chaser_id,
+                target_id=mission.target_id,
+                mission_name=f"{mission.plan.name} ({mission.chaser_id})",
+            )
+            game_helper = GameHelperInit.vessel_pair_init(connector=connector)
+            runner = RunnerInit.runner_init(
+                connector=connector,
+                game_helper=game_helper,
+                plan=mission.plan,
+                checkpoint_store=(
+                    CheckpointStore(mission.checkpoint_path)
+                    if mission.checkpoint_path
+                    else None
+                ),
+            )
+            runner.run()
+        except Exception as e:
+            logging.exception(f"Mission of chaser {mission.chaser_id} failed")
+            return ChaserMissionResult(
+                chaser_id=mission.chaser_id,
+                succeeded=False,
+                duration=time.perf_counter() - t_start,
+                error=str(e),
+            )
+        finally:
+            if game_helper is not None:
+                game_helper.stream_helper.release()
+            if connector is not None:
+                connector.release()
+        return ChaserMissionResult(
+            chaser_id=mission.chaser_id,
+            succeeded=True,
+            duration=time.perf_counter() - t_start,
+        )
+
+    def run(self) -> List[ChaserMissionResult]:
+        logging.info(
+            f"===== Running {len(self.missions)} chaser missions "
+            f"({self.max_concurrent} concurrent, {len(self.pool.connections)} connections) ====="
+        )
+        t_start = time.perf_counter()
+        with ThreadPoolExecutor(
+            max_workers=self.max_concurrent, thread_name_prefix="chaser"
+        ) as executor:
+            results = list(executor.map(self.run_mission, self.missions))
+        elapsed = time.perf_counter() - t_start
+
+        succeeded = sum(result.succeeded for result in results)
+        logging.info(
+            f"{succeeded}/{len(results)} missions succeeded in {elapsed:.0f} s "
+            f"({succeeded / elapsed * 3600:.2f} missions per hour)"
+        )
+        return results
@@ -3,6 +3,7 @@ import numpy as np
 
 from src.initialization.game_helper_init import GameHelper
 from src.mission.rdv_phase import RDVPhase
+from src.physics.mission_snapshot import MissionSnapshot
 
 
 class OrbitRaise(RDVPhase):
@@ -10,35 +11,43 @@ class OrbitRaise(RDVPhase):
         self.game_helper = game_helper
         self.desired_apoapsis = desired_apoapsis
 
-    def execute_phase(self) -> None:
-        logging.info("===== Orbit raise phase =====")
-        logging.info(f"Orbit raise phase performed to {self.desired_apoapsis} m")
+    def plan_phase(self, snapshot: MissionSnapshot) -> tuple:
+        orb_dyn = self.game_helper.orb_dyn
         ta_raise_maneuver = (
-            self.game_helper.target.orbit.argument_of_periapsis
-            + self.game_helper.target.orbit.longitude_of_ascending_node
-            - self.game_helper.chaser.orbit.argument_of_periapsis
-            - self.game_helper.chaser.orbit.longitude_of_ascending_node
+            snapshot.target.argument_of_periapsis
+            + snapshot.target.longitude_of_ascending_node
+            - snapshot.chaser.argument_of_periapsis
+            - snapshot.chaser.longitude_of_ascending_node
         )
 
-        ta_raise_maneuver += 2 * np.pi if ta_raise_maneuver < 0 else ta_raise_maneuver
+        ta_raise_maneuver += 2 * np.pi if ta_raise_maneuver < 0 else 0
 
-        desired_periapsis = self.game_helper.chaser.orbit.radius_at_true_anomaly(
-            ta_raise_maneuver
+        desired_periapsis = orb_dyn.radius_at_true_anomaly(
+            snapshot.chaser, ta_raise_maneuver
         )
-        maneuver_time = self.game_helper.chaser.orbit.ut_at_true_anomaly(
-            ta_raise_maneuver
+        maneuver_time = orb_dyn.ut_at_true_anomaly(
+            snapshot.chaser, ta_raise_maneuver, snapshot.ut
         )
-        orbit_raise_semi_major_axis = (
-            self.game_helper.orb_dyn.semi_maj_axis_from_apsises(
-                periapsis=desired_periapsis,
-                apoapsis=self.desired_apoapsis,
-            )
+        orbit_raise_semi_major_axis = orb_dyn.semi_maj_axis_from_apsises(
+            periapsis=desired_periapsis,
+            apoapsis=self.desired_apoapsis,
         )
-        logging.info(f"Planning and executing orbit raise node")
-        self.game_helper.node_helper.plan_and_execute_node(
+        node = self.game_helper.node_helper.plan_node(
+            snapshot=snapshot,
+            step="orbit_raise",
             radii=desired_periapsis,
+            current_semi_maj_ax=snapshot.chaser.semi_major_axis,
             new_semi_maj_ax=orbit_raise_semi_major_axis,
-            time=maneuver_time,
-            absolute=True,
+            ut=maneuver_time,
+            description=f"raise apoapsis to {self.desired_apoapsis:.0f} m",
         )
+        after = snapshot.after_burn(orb_dyn, node)
+        return [node], after
+
+    def execute_phase(self) -> None:
+        logging.info("===== Orbit raise phase =====")
+        logging.info(f"Orbit raise phase performed to {self.desired_apoapsis} m")
+        nodes, _ = self.plan_phase(MissionSnapshot.capture(self.game_helper))
+        logging.info(f"Planning and executing orbit raise node")
+        self.game_helper.node_helper.execute_planned_node(nodes[0])
         logging.info("===== Orbit raise phase finished =====")
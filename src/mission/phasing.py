@@ -1,8 +1,12 @@
 import math
 import logging
+from dataclasses import replace
 
 from src.initialization.game_helper_init import GameHelper
 from src.mission.rdv_phase import RDVPhase
+from src.mission.preconditions import rcs_available
+from src.physics.mission_snapshot import MissionSnapshot, PlannedNode
+from src.physics.orbit_propagator import OrbitPropagator, FiniteBurn
 
 
 class OrbitPhasing(RDVPhase):
@@ -11,14 +15,26 @@ class OrbitPhasing(RDVPhase):
         game_helper: GameHelper,
         desired_apoapsis: float,
         desired_final_phase: float,  # degrees
+        propagator: OrbitPropagator,
+        v_bar_tolerance: float = 1000.0,  # m, at the end of phasing
+        r_bar_tolerance: float = 200.0,  # m, at the end of phasing
+        rcs_correction_limit: float = 1.0,  # m/s, larger corrections use the engine
+        correction_lead_time: float = 120.0,  # s, re-prediction before an apsis
     ):
         self.game_helper = game_helper
+        self.propagator = propagator
+        self.v_bar_tolerance = v_bar_tolerance
+        self.r_bar_tolerance = r_bar_tolerance
+        self.rcs_correction_limit = rcs_correction_limit
+        self.correction_lead_time = correction_lead_time
         self.desired_apoapsis = desired_apoapsis
         self.desired_final_phase = desired_final_phase
         self.delta_t = 0
         self.T_phasing = 0
         self.behind = True
         self.phi = 0
+        self.n_phasing_orbit = 3
+        self.nominal_offset = (0.0, 0.0, 0.0)
 
     @property
     def behind(self):
@@ -28,114 +44,227 @@ class OrbitPhasing(RDVPhase):
     def behind(self, value: bool):
         self._behind = value
 
-    def phase_difference(self) -> float:
+    def phase_difference(self, snapshot: MissionSnapshot) -> float:
+        orb_dyn = self.game_helper.orb_dyn
         # true anomaly of target when chaser reaches apoapsis
-        vessel_time_at_apoapsis = self.game_helper.chaser.orbit.time_to_apoapsis
+        vessel_time_at_apoapsis = orb_dyn.time_to_apoapsis(snapshot.chaser, snapshot.ut)
         target_ta_at_chaser_apoapsis = (
-            self.game_helper.target.orbit.true_anomaly_at_ut(
-                self.game_helper.stream_helper.ut() + vessel_time_at_apoapsis
+            orb_dyn.true_anomaly_at_ut(
+                snapshot.target, snapshot.ut + vessel_time_at_apoapsis
             )
             - self.desired_final_phase * math.pi / 180
         )
         if target_ta_at_chaser_apoapsis < 0:
             target_ta_at_chaser_apoapsis += 2 * math.pi
 
-        self.phi = self.game_helper.orb_dyn.phase_offset(
+        self.phi = orb_dyn.phase_offset(
             target_ta_at_chaser_apoapsis=target_ta_at_chaser_apoapsis,
-            target_arg_of_periapsis=self.game_helper.target.orbit.argument_of_periapsis,
-            chaser_arg_of_periapsis=self.game_helper.chaser.orbit.argument_of_periapsis,
+            target_arg_of_periapsis=snapshot.target.argument_of_periapsis,
+            chaser_arg_of_periapsis=snapshot.chaser.argument_of_periapsis,
         )
 
-    def time_difference(self) -> None:
+    def time_difference(self, snapshot: MissionSnapshot) -> None:
         # difference of eccentric anomaly between target and vessel at apoapsis
         delta_E = self.game_helper.orb_dyn.eccentric_anomaly_difference(
-            target_eccentricity=self.game_helper.target.orbit.eccentricity,
+            target_eccentricity=snapshot.target.eccentricity,
             phase_offset=abs(self.phi),
         )
 
         self.delta_t = self.game_helper.orb_dyn.time_difference(
             eccentric_anomaly_difference=delta_E,
-            target_eccentricity=self.game_helper.target.orbit.eccentricity,
-            target_period=self.game_helper.target.orbit.period,
+            target_eccentricity=snapshot.target.eccentricity,
+            target_period=self.game_helper.orb_dyn.period(snapshot.target),
         )
 
-    def compute_phasing_period(self, n_phasing_orbits: int = 3) -> None:
-        T_target = self.game_helper.target.orbit.period
+    def compute_phasing_period(
+        self, snapshot: MissionSnapshot, n_phasing_orbits: int = 3
+    ) -> None:
+        T_target = self.game_helper.orb_dyn.period(snapshot.target)
         self.T_phasing = (
             T_target - self.delta_t / float(n_phasing_orbits)
             if self.behind
             else T_target + self.delta_t / float(n_phasing_orbits)
         )
 
-    def update_phasing_period(self) -> int:
+    def update_phasing_period(self, snapshot: MissionSnapshot) -> int:
         k = 1
         ref_apsis = self.game_helper.orb_dyn.apsis_from_period_and_2nd_apsis(
-            self.T_phasing, self.game_helper.chaser.orbit.apoapsis
+            self.T_phasing, snapshot.chaser.apoapsis
         )
 
         while True:
             if (
                 ref_apsis
                 < self.game_helper.orb_dyn_params.body_equatorial_radius + 100000
-            ) or (ref_apsis > self.game_helper.target.orbit.apoapsis * 1.3):
+            ) or (ref_apsis > snapshot.target.apoapsis * 1.3):
                 k += 1
-                self.compute_phasing_period(k)
+                self.compute_phasing_period(snapshot, k)
                 logging.info(
                     f"Adding phasing orbit execution until rdv (total: {k} orbit executions) by making it closer to target orbit"
                 )
                 ref_apsis = self.game_helper.orb_dyn.apsis_from_period_and_2nd_apsis(
-                    self.T_phasing, self.game_helper.chaser.orbit.apoapsis
+                    self.T_phasing, snapshot.chaser.apoapsis
                 )
             else:
                 break
 
         return k
 
-    def execute_phasing_maneuvers(
-        self,
-        a_phasing: float,
-        n_phasing_orbit: int,
-        circ_maneuver_pos: str,
-    ) -> None:
-        self.game_helper.node_helper.plan_and_execute_node(
+    def plan_phasing_burn(self, snapshot: MissionSnapshot) -> PlannedNode:
+        a_phasing = self.game_helper.orb_dyn.semi_maj_axis_from_period(self.T_phasing)
+        return self.game_helper.node_helper.plan_node(
+            snapshot=snapshot,
+            step="orbit_phasing",
             radii=self.desired_apoapsis,
+            current_semi_maj_ax=snapshot.chaser.semi_major_axis,
             new_semi_maj_ax=a_phasing,
-            time=self.game_helper.chaser.orbit.time_to_apoapsis,
-            absolute=False,
-            direction="prograde",
+            ut=snapshot.ut
+            + self.game_helper.orb_dyn.time_to_apoapsis(snapshot.chaser, snapshot.ut),
+            description=f"enter phasing orbit, period {self.game_helper.orb_dyn.format_time(self.T_phasing)}",
         )
 
-        if circ_maneuver_pos == "apoapsis":
-            circ_maneuver_time = (
-                self.game_helper.chaser.orbit.time_to_apoapsis
-                + self.T_phasing * (n_phasing_orbit - 1)
-            )
+    def plan_circularization_burn(self, snapshot: MissionSnapshot) -> PlannedNode:
+        # if chaser was ahead of target, maneuver node will be at new periapsis
+        orb_dyn = self.game_helper.orb_dyn
+        if self.behind:
+            time_to_apsis = orb_dyn.time_to_apoapsis(snapshot.chaser, snapshot.ut)
         else:
-            circ_maneuver_time = (
-                self.game_helper.chaser.orbit.time_to_periapsis
-                + self.T_phasing * (n_phasing_orbit - 1)
+            time_to_apsis = orb_dyn.time_to_periapsis(snapshot.chaser, snapshot.ut)
+        circ_maneuver_time = time_to_apsis + self.T_phasing * (self.n_phasing_orbit - 1)
+
+        height_difference = snapshot.target.apoapsis - self.desired_apoapsis
+        return self.game_helper.node_helper.plan_node(
+            snapshot=snapshot,
+            step="orbit_phasing",
+            radii=self.desired_apoapsis,
+            current_semi_maj_ax=snapshot.chaser.semi_major_axis,
+            new_semi_maj_ax=snapshot.target.semi_major_axis - 2 * height_difference,
+            ut=snapshot.ut + circ_maneuver_time,
+            description=f"end of phasing after {self.n_phasing_orbit} orbits",
+        )
+
+    def apsis_times(self, snapshot: MissionSnapshot, circ_node: PlannedNode) -> list:
+        """Passes at the circularization apsis before the end of phasing."""
+        return [
+            circ_node.ut - k * self.T_phasing
+            for k in range(self.n_phasing_orbit - 1, 0, -1)
+            if circ_node.ut - k * self.T_phasing > snapshot.ut
+        ]
+
+    def phasing_estimates(
+        self,
+        snapshot: MissionSnapshot,
+        circ_node: PlannedNode,
+        burns: tuple = (),
+        apsis_times: list = None,
+    ) -> list:
+        """Predicted error at the end of phasing, and its correction at each apsis left."""
+        if apsis_times is None:
+            apsis_times = self.apsis_times(snapshot, circ_node)
+        estimates = self.propagator.phasing_estimates(
+            snapshot,
+            circ_node.ut,
+            apsis_times,
+            burns=burns,
+            nominal_offset=self.nominal_offset,
+        )
+        if estimates:
+            x, y, z = estimates[0].offset
+            logging.info(
+                f"Predicted error at the end of phasing: R-bar {x:.0f} m, V-bar {y:.0f} m, normal {z:.0f} m"
             )
+        for estimate in estimates:
+            logging.info(
+                f"Phasing correction at {estimate.ut:.2f} s: {estimate.delta_v:.2f} m/s"
+            )
+        return estimates
+
+    def execute_correction(self, node: PlannedNode) -> None:
+        node_helper = self.game_helper.node_helper
+        # the RCS may not be deployed yet during phasing
+        if abs(node.delta_v) <= self.rcs_correction_limit and rcs_available(
+            self.game_helper
+        ):
+            node_helper.add_node(
+                dv=node.delta_v, time=node.ut, absolute=True, direction=node.direction
+            )
+            node_helper.rcs_node_execution()
+        else:
+            node_helper.execute_planned_node(node)
 
-        height_difference = (
-            self.game_helper.target.orbit.apoapsis - self.desired_apoapsis
+    def correct_phasing(self, apsis_ut: float, circ_node: PlannedNode) -> PlannedNode:
+        """Re-predict the end of phasing before an apsis, correcting it if out of band.
+
+        Returns the circularization node, moved when a correction changed
+        the phasing orbit period.
+        """
+        orb_dyn = self.game_helper.orb_dyn
+        self.game_helper.warp_scheduler.warp_to(
+            apsis_ut, lead_time=self.correction_lead_time
         )
-        self.game_helper.node_helper.plan_and_execute_node(
-            radii=self.desired_apoapsis,
-            new_semi_maj_ax=self.game_helper.target.orbit.semi_major_axis
-            - 2 * height_difference,
-            time=circ_maneuver_time,  # if chaser was ahead of target, maneuver node will be at new periapsis
-            absolute=False,
+        snapshot = MissionSnapshot.capture(self.game_helper)
+        (estimate,) = self.phasing_estimates(
+            snapshot, circ_node, apsis_times=[apsis_ut]
+        )
+        x, y, _ = estimate.offset
+        if abs(x) > self.r_bar_tolerance:
+            # only the V-bar error is corrected here, the circularization is
+            # planned from the orbit reached and homing from the live state
+            logging.warning(
+                f"Predicted R-bar error {x:.0f} m at the end of phasing is out of the {self.r_bar_tolerance:.0f} m band"
+            )
+        if abs(y) <= self.v_bar_tolerance:
+            return circ_node
+
+        correction_node = PlannedNode(
+            step="orbit_phasing",
+            ut=apsis_ut,
+            delta_v=estimate.delta_v,
             direction="prograde",
+            burn_time=orb_dyn.burn_time(
+                delta_v=estimate.delta_v,
+                mass=snapshot.mass,
+                isp=snapshot.specific_impulse,
+                thrust=snapshot.available_thrust,
+            ),
+            description=f"phasing correction of a {y:.0f} m V-bar error",
+        )
+        logging.info(
+            f"Phasing correction of {estimate.delta_v:.2f} m/s at {apsis_ut:.2f} s for a {y:.0f} m V-bar error"
         )
+        self.execute_correction(correction_node)
+
+        # the arrival stays at the same apsis, on the corrected orbit
+        snapshot = MissionSnapshot.capture(self.game_helper)
+        orbits_left = round((circ_node.ut - apsis_ut) / self.T_phasing)
+        self.T_phasing = orb_dyn.period(snapshot.chaser)
+        return replace(
+            self.plan_circularization_burn(snapshot),
+            ut=apsis_ut + orbits_left * orb_dyn.period(snapshot.chaser),
+        )
+
+    def plan_phase(self, snapshot: MissionSnapshot) -> tuple:
+        self.phase_difference(snapshot)
+        self.time_difference(snapshot)
+        self.compute_phasing_period(snapshot, n_phasing_orbits=3)
+
+        # self.n_phasing_orbit = self.update_phasing_period(snapshot)
+        self.n_phasing_orbit = 3
+
+        phasing_node = self.plan_phasing_burn(snapshot)
+        snapshot = snapshot.after_burn(self.game_helper.orb_dyn, phasing_node)
+        circ_node = self.plan_circularization_burn(snapshot)
+        # two-body arrival position the mission is planned around
+        self.nominal_offset = self.game_helper.orb_dyn.relative_position(
+            snapshot.target, snapshot.chaser, circ_node.ut
+        )
+        snapshot = snapshot.after_burn(self.game_helper.orb_dyn, circ_node)
+        return [phasing_node, circ_node], snapshot
 
     def execute_phase(self) -> None:
         logging.info("===== Phasing phase =====")
-        self.phase_difference()
-        self.time_difference()
-        self.compute_phasing_period(n_phasing_orbits=3)
-
-        # n_phasing_orbit = self.update_phasing_period()
-        n_phasing_orbit = 3
+        snapshot = MissionSnapshot.capture(self.game_helper)
+        (phasing_node, circ_node), _ = self.plan_phase(snapshot)
 
         # log if chaser is ahead or behind of target, phase difference, time difference and phasing period
         logging.info("Summary of calculations for phasing:")
@@ -150,15 +279,26 @@ class OrbitPhasing(RDVPhase):
             f"Phasing orbit period: {self.game_helper.orb_dyn.format_time(self.T_phasing)}"
         )
         # log number of phasing orbits until rdv
-        logging.info(f"Number of phasing orbits needed: {n_phasing_orbit}")
+        logging.info(f"Number of phasing orbits needed: {self.n_phasing_orbit}")
         logging.info(
             f"Target orbit period: {self.game_helper.orb_dyn.format_time(self.game_helper.target.orbit.period)}"
         )
-        self.execute_phasing_maneuvers(
-            a_phasing=self.game_helper.orb_dyn.semi_maj_axis_from_period(
-                self.T_phasing
-            ),
-            n_phasing_orbit=n_phasing_orbit,
-            circ_maneuver_pos="apoapsis" if self.behind else "periapsis",
+        self.phasing_estimates(
+            snapshot, circ_node, burns=(FiniteBurn.from_node(phasing_node, snapshot),)
         )
+        self.game_helper.node_helper.execute_planned_node(phasing_node)
+        # the circularization is planned again from the orbit actually reached
+        snapshot = MissionSnapshot.capture(self.game_helper)
+        circ_node = self.plan_circularization_burn(snapshot)
+        apsis_times = self.apsis_times(snapshot, circ_node)
+        while apsis_times:
+            apsis_ut = apsis_times[0]
+            circ_node = self.correct_phasing(apsis_ut, circ_node)
+            # a correction changes the period, the apsis left are predicted again
+            apsis_times = [
+                ut
+                for ut in self.apsis_times(snapshot, circ_node)
+                if ut > apsis_ut + self.T_phasing / 2
+            ]
+        self.game_helper.node_helper.execute_planned_node(circ_node)
         logging.info("===== Phasing phase finished =====")
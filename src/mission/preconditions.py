@@ -0,0 +1,34 @@
+import math
+
+from src.initialization.game_helper_init import GameHelper
+
+
+def chaser_below_target(game_helper: GameHelper) -> bool:
+    stream_helper = game_helper.stream_helper
+    return stream_helper.get("chaser_radius") < stream_helper.get("target_radius")
+
+
+def max_relative_distance(game_helper: GameHelper, value: float) -> bool:
+    return math.dist(game_helper.stream_helper.rel_pos(), (0, 0, 0)) <= value
+
+
+def min_relative_distance(game_helper: GameHelper, value: float) -> bool:
+    return math.dist(game_helper.stream_helper.rel_pos(), (0, 0, 0)) >= value
+
+
+def rcs_available(game_helper: GameHelper) -> bool:
+    return any(game_helper.vessel_control_helper.get("available_rcs_force")[0])
+
+
+def docking_ports_available(game_helper: GameHelper) -> bool:
+    return game_helper.docking_port_helper.ports_available()
+
+
+# check name -> (function, whether the check takes a value)
+PRECONDITIONS = {
+    "chaser_below_target": (chaser_below_target, False),
+    "max_relative_distance": (max_relative_distance, True),
+    "min_relative_distance": (min_relative_distance, True),
+    "rcs_available": (rcs_available, False),
+    "docking_ports_available": (docking_ports_available, False),
+}
@@ -1,10 +1,33 @@
 from abc import ABC, abstractmethod
+from typing import List, Tuple
+
+from src.physics.mission_snapshot import MissionSnapshot, PlannedNode
 
 
 class RDVPhase(ABC):
+    # set by the mission runner to persist progress in the middle of a phase
+    checkpoint_hook = None
+
     def __init__(self) -> None:
         super().__init__()
 
     @abstractmethod
     def execute_phase():
         pass
+
+    def plan_phase(
+        self, snapshot: MissionSnapshot, **params
+    ) -> Tuple[List[PlannedNode], MissionSnapshot]:
+        """Nodes the phase will execute, and the predicted state at its end."""
+        return [], snapshot
+
+    def checkpoint_state(self) -> dict:
+        """Guidance state needed to resume the phase, JSON serializable."""
+        return {}
+
+    def restore_state(self, state: dict) -> None:
+        pass
+
+    def save_checkpoint(self) -> None:
+        if self.checkpoint_hook is not None:
+            self.checkpoint_hook(self)
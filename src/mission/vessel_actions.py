@@ -0,0 +1,45 @@
+import time
+import logging
+
+from src.initialization.game_helper_init import GameHelper
+from dataclasses import replace
+
+from src.mission.rdv_phase import RDVPhase
+from src.physics.mission_snapshot import MissionSnapshot
+
+
+class StageSeparation(RDVPhase):
+    def __init__(self, game_helper: GameHelper) -> None:
+        self.game_helper = game_helper
+
+    def execute_phase(self) -> None:
+        self.game_helper.vessel_control_helper.activate_next_stage()
+        logging.info("Next stage activated")
+
+
+class DeployParts(RDVPhase):
+    def __init__(self, game_helper: GameHelper) -> None:
+        self.game_helper = game_helper
+
+    def execute_phase(self, antennas: bool = True, solar_panels: bool = True) -> None:
+        if antennas:
+            for antenna in self.game_helper.chaser.parts.antennas:
+                if antenna.deployable:
+                    antenna.deployed = True
+            logging.info("Antennas deployed")
+        if solar_panels:
+            for solar_panel in self.game_helper.chaser.parts.solar_panels:
+                if solar_panel.deployable:
+                    solar_panel.deployed = True
+            logging.info("Solar panels deployed")
+        # deployed parts change the vessel mass and RCS layout
+        self.game_helper.vessel_control_helper.invalidate()
+
+
+class Wait(RDVPhase):
+    def plan_phase(self, snapshot: MissionSnapshot, duration: float = 10) -> tuple:
+        return [], replace(snapshot, ut=snapshot.ut + duration)
+
+    def execute_phase(self, duration: float = 10) -> None:
+        logging.info(f"Waiting {duration} s")
+        time.sleep(duration)
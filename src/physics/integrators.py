@@ -0,0 +1,42 @@
+import numpy as np
+
+
+def rk4(derivatives, t_0: float, states: np.ndarray, dt: float, steps: int):
+    """Fixed step Runge-Kutta 4 integration of a batch of states.
+
+    `derivatives(t, states)` gets and returns arrays of shape (k, n), so the
+    k states are integrated together. Returns the states at every step,
+    shape (steps + 1, k, n), and their derivatives, used for dense output.
+    """
+    trajectory = np.empty((steps + 1,) + states.shape)
+    slopes = np.empty_like(trajectory)
+    trajectory[0] = states
+    t = t_0
+    for i in range(steps):
+        k_1 = slopes[i] = derivatives(t, states)
+        k_2 = derivatives(t + dt / 2, states + dt / 2 * k_1)
+        k_3 = derivatives(t + dt / 2, states + dt / 2 * k_2)
+        k_4 = derivatives(t + dt, states + dt * k_3)
+        states = states + dt / 6 * (k_1 + 2 * k_2 + 2 * k_3 + k_4)
+        trajectory[i + 1] = states
+        t = t_0 + (i + 1) * dt
+    slopes[steps] = derivatives(t, states)
+    return trajectory, slopes
+
+
+def hermite(t, times: np.ndarray, states: np.ndarray, slopes: np.ndarray):
+    """Cubic Hermite interpolation of integrated states at times t.
+
+    Returns shape t.shape + states.shape[1:].
+    """
+    t = np.asarray(t, dtype=float)
+    i = np.clip(np.searchsorted(times, t, side="right") - 1, 0, len(times) - 2)
+    shape = t.shape + (1,) * (states.ndim - 1)
+    dt = (times[i + 1] - times[i]).reshape(shape)
+    s = (t - times[i]).reshape(shape) / dt
+    return (
+        (2 * s**3 - 3 * s**2 + 1) * states[i]
+        + (s**3 - 2 * s**2 + s) * dt * slopes[i]
+        + (-2 * s**3 + 3 * s**2) * states[i + 1]
+        + (s**3 - s**2) * dt * slopes[i + 1]
+    )
@@ -0,0 +1,76 @@
+import math
+from dataclasses import dataclass, replace
+
+from src.physics.orb_dyn_utils import OrbitElements, OrbitalDynamicsUtils
+
+
+@dataclass
+class MissionSnapshot:
+    """Chaser and target state read once, used to plan phases locally."""
+
+    ut: float  # s
+    chaser: OrbitElements
+    target: OrbitElements
+    mass: float  # kg
+    specific_impulse: float  # s
+    available_thrust: float  # N
+    rcs_forward_force: float  # N, 0 while the RCS is off or not deployed
+    rel_pos: tuple  # m, in the target orbital reference frame
+
+    @classmethod
+    def capture(cls, game_helper) -> "MissionSnapshot":
+        chaser = game_helper.chaser
+        stream_helper = game_helper.stream_helper
+        vessel_control_helper = game_helper.vessel_control_helper
+        return cls(
+            ut=stream_helper.ut(),
+            chaser=OrbitElements.from_orbit(chaser.orbit),
+            target=OrbitElements.from_orbit(game_helper.target.orbit),
+            mass=vessel_control_helper.get("mass"),
+            specific_impulse=vessel_control_helper.get("specific_impulse"),
+            available_thrust=vessel_control_helper.get("available_thrust"),
+            rcs_forward_force=abs(
+                vessel_control_helper.get("available_rcs_force")[0][1]
+            ),
+            rel_pos=stream_helper.rel_pos(),
+        )
+
+    def propagate(
+        self, orb_dyn: OrbitalDynamicsUtils, ut: float, chaser: OrbitElements = None
+    ) -> "MissionSnapshot":
+        """Predicted snapshot at a later time, optionally on a new chaser orbit."""
+        chaser = chaser or self.chaser
+        return replace(
+            self,
+            ut=ut,
+            chaser=chaser,
+            rel_pos=orb_dyn.relative_position(self.target, chaser, ut),
+        )
+
+    def after_burn(
+        self, orb_dyn: OrbitalDynamicsUtils, node: "PlannedNode"
+    ) -> "MissionSnapshot":
+        """Predicted snapshot after an impulsive main engine burn."""
+        g = orb_dyn.params.body_surface_gravity
+        # without an active engine the burn time and the propellant are unknown
+        burn_time = 0.0 if math.isnan(node.burn_time) else node.burn_time
+        after = self.propagate(
+            orb_dyn,
+            ut=node.ut + burn_time / 2,
+            chaser=orb_dyn.impulsive_burn(self.chaser, node.ut, node.delta_v),
+        )
+        if self.specific_impulse > 0:
+            after.mass = self.mass * math.exp(
+                -abs(node.delta_v) / (self.specific_impulse * g)
+            )
+        return after
+
+
+@dataclass
+class PlannedNode:
+    step: str
+    ut: float  # s
+    delta_v: float  # m/s
+    direction: str
+    burn_time: float  # s, nan when unknown
+    description: str = ""
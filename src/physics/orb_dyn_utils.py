@@ -1,5 +1,5 @@
 import math
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 
 
 @dataclass
@@ -9,6 +9,38 @@ class CelestialBodyParameters:
     body_equatorial_radius: float  # m
 
 
+@dataclass
+class OrbitElements:
+    semi_major_axis: float  # m
+    eccentricity: float
+    inclination: float  # rad
+    longitude_of_ascending_node: float  # rad
+    argument_of_periapsis: float  # rad
+    mean_anomaly_at_epoch: float  # rad
+    epoch: float  # s
+
+    @classmethod
+    def from_orbit(cls, orbit) -> "OrbitElements":
+        """Read the elements of a kRPC orbit once."""
+        return cls(
+            semi_major_axis=orbit.semi_major_axis,
+            eccentricity=orbit.eccentricity,
+            inclination=orbit.inclination,
+            longitude_of_ascending_node=orbit.longitude_of_ascending_node,
+            argument_of_periapsis=orbit.argument_of_periapsis,
+            mean_anomaly_at_epoch=orbit.mean_anomaly_at_epoch,
+            epoch=orbit.epoch,
+        )
+
+    @property
+    def apoapsis(self) -> float:
+        return self.semi_major_axis * (1 + self.eccentricity)
+
+    @property
+    def periapsis(self) -> float:
+        return self.semi_major_axis * (1 - self.eccentricity)
+
+
 class OrbitalDynamicsUtils:
     def __init__(self, celestial_body_params: CelestialBodyParameters) -> None:
         self.params = celestial_body_params
@@ -132,3 +164,189 @@ class OrbitalDynamicsUtils:
         minutes = int((time % 3600) // 60)
         seconds = int(time % 60)
         return f"{hours} h, {minutes} min, {seconds} s"
+
+    def mean_motion(self, orbit: OrbitElements) -> float:
+        return self.orbital_rate(orbit.semi_major_axis)
+
+    def period(self, orbit: OrbitElements) -> float:
+        return 2 * math.pi / self.mean_motion(orbit)
+
+    def eccentric_from_mean_anomaly(
+        self, mean_anomaly: float, eccentricity: float
+    ) -> float:
+        """Solve Kepler's equation M = E - e sin(E) with Newton iterations
+
+        Args:
+            mean_anomaly (float): mean anomaly in rad
+            eccentricity (float): orbit eccentricity
+
+        Returns:
+            float: eccentric anomaly in rad
+        """
+        E = mean_anomaly if eccentricity < 0.8 else math.pi
+        for _ in range(50):
+            dE = (E - eccentricity * math.sin(E) - mean_anomaly) / (
+                1 - eccentricity * math.cos(E)
+            )
+            E -= dE
+            if abs(dE) < 1e-12:
+                break
+        return E
+
+    def true_from_eccentric_anomaly(
+        self, eccentric_anomaly: float, eccentricity: float
+    ) -> float:
+        return 2 * math.atan2(
+            math.sqrt(1 + eccentricity) * math.sin(eccentric_anomaly / 2),
+            math.sqrt(1 - eccentricity) * math.cos(eccentric_anomaly / 2),
+        )
+
+    def mean_from_true_anomaly(self, true_anomaly: float, eccentricity: float) -> float:
+        E = 2 * math.atan2(
+            math.sqrt(1 - eccentricity) * math.sin(true_anomaly / 2),
+            math.sqrt(1 + eccentricity) * math.cos(true_anomaly / 2),
+        )
+        return E - eccentricity * math.sin(E)
+
+    def true_anomaly_at_ut(self, orbit: OrbitElements, ut: float) -> float:
+        """Local equivalent of kRPC Orbit.true_anomaly_at_ut, in [0, 2 pi)"""
+        mean_anomaly = orbit.mean_anomaly_at_epoch + self.mean_motion(orbit) * (
+            ut - orbit.epoch
+        )
+        E = self.eccentric_from_mean_anomaly(
+            math.fmod(mean_anomaly, 2 * math.pi), orbit.eccentricity
+        )
+        return self.true_from_eccentric_anomaly(E, orbit.eccentricity) % (2 * math.pi)
+
+    def ut_at_true_anomaly(
+        self, orbit: OrbitElements, true_anomaly: float, after_ut: float
+    ) -> float:
+        """First time after `after_ut` at which the orbit reaches a true anomaly"""
+        n = self.mean_motion(orbit)
+        mean_anomaly = self.mean_from_true_anomaly(true_anomaly, orbit.eccentricity)
+        mean_anomaly_now = orbit.mean_anomaly_at_epoch + n * (after_ut - orbit.epoch)
+        return after_ut + ((mean_anomaly - mean_anomaly_now) % (2 * math.pi)) / n
+
+    def radius_at_true_anomaly(
+        self, orbit: OrbitElements, true_anomaly: float
+    ) -> float:
+        e = orbit.eccentricity
+        return orbit.semi_major_axis * (1 - e**2) / (1 + e * math.cos(true_anomaly))
+
+    def time_to_apoapsis(self, orbit: OrbitElements, ut: float) -> float:
+        return self.ut_at_true_anomaly(orbit, math.pi, ut) - ut
+
+    def time_to_periapsis(self, orbit: OrbitElements, ut: float) -> float:
+        return self.ut_at_true_anomaly(orbit, 0.0, ut) - ut
+
+    def impulsive_burn(
+        self, orbit: OrbitElements, ut: float, delta_v: float
+    ) -> OrbitElements:
+        """Orbit after an impulsive burn along the velocity vector
+
+        Args:
+            orbit (OrbitElements): orbit before the burn
+            ut (float): time of the burn in s
+            delta_v (float): prograde delta-v in m/s (negative for retrograde)
+
+        Returns:
+            OrbitElements: orbit after the burn, with its epoch at the burn
+        """
+        mu = self.params.gravitational_parameter
+        e = orbit.eccentricity
+        nu = self.true_anomaly_at_ut(orbit, ut)
+        p = orbit.semi_major_axis * (1 - e**2)
+        r = p / (1 + e * math.cos(nu))
+        v_r = math.sqrt(mu / p) * e * math.sin(nu)
+        v_t = math.sqrt(mu / p) * (1 + e * math.cos(nu))
+
+        scale = 1 + delta_v / math.hypot(v_r, v_t)
+        v_r, v_t = v_r * scale, v_t * scale
+        h = r * v_t
+        a = 1 / (2 / r - (v_r**2 + v_t**2) / mu)
+        new_nu = math.atan2(h * v_r / mu, h**2 / (mu * r) - 1)
+        new_e = math.hypot(h * v_r / mu, h**2 / (mu * r) - 1)
+        return replace(
+            orbit,
+            semi_major_axis=a,
+            eccentricity=new_e,
+            argument_of_periapsis=(orbit.argument_of_periapsis + nu - new_nu)
+            % (2 * math.pi),
+            mean_anomaly_at_epoch=self.mean_from_true_anomaly(new_nu, new_e),
+            epoch=ut,
+        )
+
+    def burn_time(
+        self, delta_v: float, mass: float, isp: float, thrust: float
+    ) -> float:
+        """Burn duration from the rocket equation
+
+        Args:
+            delta_v (float): delta-v in m/s
+            mass (float): vessel mass at ignition in kg
+            isp (float): specific impulse in s
+            thrust (float): available thrust in N
+
+        Returns:
+            float: burn time in s, nan without thrust (no active engine)
+        """
+        if thrust <= 0 or isp <= 0:
+            return math.nan
+        g = self.params.body_surface_gravity
+        return (mass - (mass / math.exp(abs(delta_v) / (isp * g)))) / (
+            thrust / (isp * g)
+        )
+
+    def state_at_ut(self, orbit: OrbitElements, ut: float) -> tuple:
+        """Inertial position (m) and velocity (m/s) of an orbit at a given time"""
+        mu = self.params.gravitational_parameter
+        e = orbit.eccentricity
+        nu = self.true_anomaly_at_ut(orbit, ut)
+        p = orbit.semi_major_axis * (1 - e**2)
+        r = p / (1 + e * math.cos(nu))
+        # position and velocity in the perifocal frame
+        pos = (r * math.cos(nu), r * math.sin(nu))
+        vel = (
+            -math.sqrt(mu / p) * math.sin(nu),
+            math.sqrt(mu / p) * (e + math.cos(nu)),
+        )
+
+        cos_O, sin_O = math.cos(orbit.longitude_of_ascending_node), math.sin(
+            orbit.longitude_of_ascending_node
+        )
+        cos_w, sin_w = math.cos(orbit.argument_of_periapsis), math.sin(
+            orbit.argument_of_periapsis
+        )
+        cos_i, sin_i = math.cos(orbit.inclination), math.sin(orbit.inclination)
+        p_axis = (
+            cos_O * cos_w - sin_O * sin_w * cos_i,
+            sin_O * cos_w + cos_O * sin_w * cos_i,
+            sin_w * sin_i,
+        )
+        q_axis = (
+            -cos_O * sin_w - sin_O * cos_w * cos_i,
+            -sin_O * sin_w + cos_O * cos_w * cos_i,
+            cos_w * sin_i,
+        )
+        position = tuple(pos[0] * p_axis[k] + pos[1] * q_axis[k] for k in range(3))
+        velocity = tuple(vel[0] * p_axis[k] + vel[1] * q_axis[k] for k in range(3))
+        return position, velocity
+
+    def relative_position(
+        self, target: OrbitElements, chaser: OrbitElements, ut: float
+    ) -> tuple:
+        """Chaser position in the target orbital frame (anti-radial, prograde, normal)"""
+        r_t, v_t = self.state_at_ut(target, ut)
+        r_c, _ = self.state_at_ut(chaser, ut)
+        rel = tuple(r_c[k] - r_t[k] for k in range(3))
+        h = (
+            r_t[1] * v_t[2] - r_t[2] * v_t[1],
+            r_t[2] * v_t[0] - r_t[0] * v_t[2],
+            r_t[0] * v_t[1] - r_t[1] * v_t[0],
+        )
+        axes = [
+            tuple(-c / math.hypot(*r_t) for c in r_t),
+            tuple(c / math.hypot(*v_t) for c in v_t),
+            tuple(c / math.hypot(*h) for c in h),
+        ]
+        return tuple(sum(rel[k] * axis[k] for k in range(3)) for axis in axes)
@@ -0,0 +1,210 @@
+import math
+import numpy as np
+from dataclasses import dataclass
+
+from src.physics.integrators import rk4, hermite
+from src.physics.orb_dyn_utils import OrbitElements, OrbitalDynamicsUtils
+from src.physics.mission_snapshot import MissionSnapshot, PlannedNode
+
+
+@dataclass
+class FiniteBurn:
+    """Constant thrust along the velocity vector, mass decreasing with the burn."""
+
+    start: float  # s
+    duration: float  # s
+    thrust: float  # N, negative for retrograde
+    mass: float  # kg at ignition
+    specific_impulse: float  # s
+
+    @classmethod
+    def from_node(cls, node: PlannedNode, snapshot: MissionSnapshot) -> "FiniteBurn":
+        # burns are centred on the node time
+        return cls(
+            start=node.ut - node.burn_time / 2,
+            duration=node.burn_time,
+            thrust=math.copysign(snapshot.available_thrust, node.delta_v),
+            mass=snapshot.mass,
+            specific_impulse=snapshot.specific_impulse,
+        )
+
+
+@dataclass
+class Trajectory:
+    """Dense output of a propagation, cubic Hermite between integration steps."""
+
+    times: np.ndarray  # (m,)
+    states: np.ndarray  # (m, k, 6), inertial position and velocity
+    slopes: np.ndarray  # (m, k, 6)
+
+    def state_at(self, t) -> np.ndarray:
+        """States (k, 6) at time t, or (len(t), k, 6) for an array of times."""
+        return hermite(t, self.times, self.states, self.slopes)
+
+
+@dataclass
+class PhasingEstimate:
+    ut: float  # s, time of the correction burn
+    offset: tuple  # m, predicted (R-bar, V-bar, normal) error at the arrival
+    delta_v: float  # m/s, prograde correction cancelling the V-bar offset
+
+
+def orbital_frame_offsets(target: np.ndarray, chaser: np.ndarray) -> np.ndarray:
+    """Chaser positions (k, 3) in the target orbital frame, from inertial states (k, 6).
+
+    Same axes as OrbitalDynamicsUtils.relative_position.
+    """
+    r_t, v_t = target[..., :3], target[..., 3:]
+    x_axis = -r_t / np.linalg.norm(r_t, axis=-1, keepdims=True)
+    y_axis = v_t / np.linalg.norm(v_t, axis=-1, keepdims=True)
+    h = np.cross(r_t, v_t)
+    z_axis = h / np.linalg.norm(h, axis=-1, keepdims=True)
+    rel = chaser[..., :3] - r_t
+    return np.stack(
+        [np.sum(rel * axis, axis=-1) for axis in (x_axis, y_axis, z_axis)], axis=-1
+    )
+
+
+class OrbitPropagator:
+    """Numerical orbit propagation with perturbations, for multi-orbit predictions.
+
+    Adds J2 when an oblateness coefficient is given (0 keeps the two-body
+    motion of the game) and finite burns to the central gravity. Any number
+    of orbits are integrated together with a fixed step RK4, and the dense
+    output gives states at any time of the arc.
+    """
+
+    def __init__(
+        self,
+        orb_dyn: OrbitalDynamicsUtils,
+        j2: float = 0.0,
+        step: float = 10.0,  # s
+    ) -> None:
+        self.orb_dyn = orb_dyn
+        self.mu = orb_dyn.params.gravitational_parameter
+        self.radius = orb_dyn.params.body_equatorial_radius
+        self.g = orb_dyn.params.body_surface_gravity
+        self.j2 = j2
+        self.step = step
+
+    def accelerations(self, t: float, states: np.ndarray, burns, burning):
+        """State derivatives (k, 6), with the thrust of the burns firing at t."""
+        r, v = states[:, :3], states[:, 3:]
+        r_norm = np.linalg.norm(r, axis=1, keepdims=True)
+        acceleration = -self.mu * r / r_norm**3
+        if self.j2:
+            z2 = (r[:, 2:3] / r_norm) ** 2
+            factor = -1.5 * self.j2 * self.mu * self.radius**2 / r_norm**5
+            acceleration = acceleration + factor * r * np.hstack(
+                (1 - 5 * z2, 1 - 5 * z2, 3 - 5 * z2)
+            )
+        for burn in burns:
+            mass = burn.mass - abs(burn.thrust) / (burn.specific_impulse * self.g) * (
+                t - burn.start
+            )
+            direction = v / np.linalg.norm(v, axis=1, keepdims=True)
+            acceleration = acceleration + burning[:, None] * (
+                burn.thrust / mass * direction
+            )
+        return np.hstack((v, acceleration))
+
+    def initial_states(self, orbits, ut: float) -> np.ndarray:
+        return np.array(
+            [np.concatenate(self.orb_dyn.state_at_ut(orbit, ut)) for orbit in orbits]
+        )
+
+    def propagate(
+        self,
+        orbits: list,
+        t_0: float,
+        t_f: float,
+        burns: tuple = (),
+        burning=None,  # rows the burns apply to, all by default
+    ) -> Trajectory:
+        states = self.initial_states(orbits, t_0)
+        burning = (
+            np.ones(len(orbits)) if burning is None else np.asarray(burning, float)
+        )
+
+        # segments end on burn ignitions and cut-offs, so that a burn is on or
+        # off for a whole segment, and burns get finer steps
+        boundaries = {t_0, t_f}
+        for burn in burns:
+            boundaries |= {burn.start, burn.start + burn.duration}
+        boundaries = sorted(t for t in boundaries if t_0 <= t <= t_f)
+        times, trajectory, slopes = [np.array([t_0])], [states[None]], []
+        for start, end in zip(boundaries, boundaries[1:]):
+            middle = (start + end) / 2
+            firing = [
+                burn
+                for burn in burns
+                if burn.start <= middle < burn.start + burn.duration
+            ]
+            step = min([self.step] + [burn.duration / 10 for burn in firing])
+            steps = max(1, math.ceil((end - start) / step))
+            dt = (end - start) / steps
+            segment, segment_slopes = rk4(
+                lambda t, y: self.accelerations(t, y, firing, burning),
+                start,
+                states,
+                dt,
+                steps,
+            )
+            states = segment[-1]
+            times.append(start + dt * np.arange(1, steps + 1))
+            trajectory.append(segment[1:])
+            slopes.append(segment_slopes[:-1])
+        slopes.append(self.accelerations(t_f, states, (), burning)[None])
+        return Trajectory(
+            times=np.concatenate(times),
+            states=np.concatenate(trajectory),
+            slopes=np.concatenate(slopes),
+        )
+
+    def correction_delta_v(
+        self, v_bar_offset: float, state: np.ndarray, orbits_left: float
+    ) -> float:
+        """Prograde delta-v at `state` cancelling a V-bar offset at the arrival.
+
+        The offset is converted to a time offset at the current speed and
+        spread over the remaining orbits: dT = 3 T a v dv / mu.
+        """
+        r = np.linalg.norm(state[:3])
+        v = np.linalg.norm(state[3:])
+        a = 1 / (2 / r - v**2 / self.mu)
+        period = 2 * math.pi * math.sqrt(a**3 / self.mu)
+        period_change = v_bar_offset / v / max(orbits_left, 1.0)
+        return self.mu * period_change / (3 * period * a * v)
+
+    def phasing_estimates(
+        self,
+        snapshot: MissionSnapshot,
+        arrival_ut: float,
+        correction_uts: list,
+        burns: tuple = (),
+        nominal_offset: tuple = (0.0, 0.0, 0.0),  # m, planned arrival position
+    ) -> list:
+        """Predicted arrival error and the correction cancelling it at each given time."""
+        trajectory = self.propagate(
+            [snapshot.target, snapshot.chaser],
+            snapshot.ut,
+            arrival_ut,
+            burns=burns,
+            burning=(0, 1),
+        )
+        target, chaser = trajectory.state_at(arrival_ut)
+        offset = orbital_frame_offsets(target, chaser) - np.asarray(nominal_offset)
+        chaser_period = self.orb_dyn.period(snapshot.chaser)
+        estimates = []
+        for ut in correction_uts:
+            _, chaser_state = trajectory.state_at(ut)
+            estimates.append(
+                PhasingEstimate(
+                    ut=ut,
+                    offset=tuple(float(value) for value in offset),
+                    delta_v=self.correction_delta_v(
+                        offset[1], chaser_state, (arrival_ut - ut) / chaser_period
+                    ),
+                )
+            )
+        return estimates
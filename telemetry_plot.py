@@ -0,0 +1,65 @@
+import json
+import socket
+import argparse
+import threading
+from collections import deque
+
+
+def receive(connection: socket.socket, samples: deque) -> None:
+    with connection.makefile("r") as stream:
+        for line in stream:
+            samples.append(json.loads(line))
+
+
+def plot_telemetry(host: str, port: int, period: float = 0.5) -> None:
+    """V-bar/R-bar plane of a running mission, redrawn as samples arrive."""
+    # pyplot is slow to import, only load it when plotting
+    import matplotlib.pyplot as plt
+
+    connection = socket.create_connection((host, port))
+    samples = deque(maxlen=10000)
+    threading.Thread(target=receive, args=(connection, samples), daemon=True).start()
+
+    nav_plane_pos = ([], [])
+    guid_plane_pos = ([], [])
+    plt.ion()
+    fig, ax = plt.subplots()
+    (nav_line,) = ax.plot([], [], label="Nav")
+    (guid_line,) = ax.plot([], [], label="Guid")
+    ax.set_xlabel("V-bar [m]")
+    ax.set_ylabel("R-bar [m]")
+    ax.legend()
+
+    while plt.fignum_exists(fig.number):
+        while samples:
+            sample = samples.popleft()
+            if sample["kind"] == "phase":
+                ax.set_title(sample["name"])
+            elif sample["kind"] == "nav":
+                nav_plane_pos[0].append(sample["values"][1])
+                nav_plane_pos[1].append(sample["values"][2])
+            elif sample["kind"] == "guid":
+                # close range references start with the normalized time
+                values = (
+                    sample["values"][-6:]
+                    if len(sample["values"]) == 7
+                    else sample["values"]
+                )
+                guid_plane_pos[0].append(values[0])
+                guid_plane_pos[1].append(values[1])
+        nav_line.set_data(nav_plane_pos[1], nav_plane_pos[0])
+        guid_line.set_data(guid_plane_pos[1], guid_plane_pos[0])
+        ax.relim()
+        ax.autoscale_view()
+        plt.pause(period)
+    connection.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Plot the telemetry streamed by rendezvous_docking.py --telemetry_port"
+    )
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    plot_telemetry(args.host, args.port)
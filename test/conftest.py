@@ -0,0 +1,52 @@
+"""Fixtures shared by the tests and the benchmarks."""
+
+import math
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+N = 2 * math.pi / 2400  # rad/s, mean motion of a 100 km orbit around Kerbin
+
+
+@pytest.fixture
+def close_range_log(tmp_path):
+    """Close range leg flown with the replay GNC, logged as in flight."""
+    pytest.importorskip("control")
+    from src.gnc.replay import ReplayStreamHelper
+    from src.initialization.gnc_init import GNCInit
+
+    stream_helper = ReplayStreamHelper()
+    gnc_helper = GNCInit.init_replay_gnc(orbital_rate=N, stream_helper=stream_helper)
+    smooth_guidance = gnc_helper.smooth_guidance
+    for profile, (p_i, p_f) in zip(
+        smooth_guidance.profiles, ((10, 0), (-250, -15), (3, 0))
+    ):
+        profile.config_profile(p_i=p_i, p_f=p_f, duration=60)
+    ref_signal = smooth_guidance.ref_signal()
+
+    log = tmp_path / "rendezvous_docking.log"
+    with open(log, "w") as file:
+        file.write(f"INFO - Target orbital rate: {N} rad/s\n")
+        file.write("INFO - ===== Closed loop proximity maneuver phase =====\n")
+        file.write(
+            "INFO - Leg, 100.00, 10.00, -250.00, 3.00, 0.00, -15.00, 0.00, 60.00\n"
+        )
+        for i in range(1000):
+            tod = 100 + 0.12 * i
+            x = np.array([[10 - 0.01 * i], [-250 + 0.2 * i], [0.05], [1.5]])
+            z = np.array([[3 - 0.003 * i], [-0.03]])
+            tau = (tod - 100) / 60
+            in_plane_ref, out_of_plane_ref = ref_signal(tau=min(tau, 1))
+            u = (
+                *gnc_helper.in_plane_controller.control(x, in_plane_ref)[:, 0],
+                gnc_helper.out_of_plane_controller.control(z, out_of_plane_ref)[0][0],
+            )
+            file.write(
+                f"INFO - Nav, {tod:.2f}, {x[0][0]:.2f}, {x[1][0]:.2f}, {z[0][0]:.2f}, {x[2][0]:.2f}, {x[3][0]:.2f}, {z[1][0]:.2f}\n"
+            )
+            file.write(f"INFO - Control, {u[0]:.2f}, {u[1]:.2f}, {u[2]:.2f}, 0, 0, 0\n")
+        file.write("INFO - ===== End of closed loop proximity maneuver phase =====\n")
+    return SimpleNamespace(
+        path=str(log), gnc_helper=gnc_helper, stream_helper=stream_helper
+    )
@@ -0,0 +1,314 @@
+"""Benchmarks of the GNC loop hot paths.
+
+Run from the repository root. Save a baseline with
+
+    python -m pytest test/test_benchmarks.py --benchmark-autosave
+
+and compare later runs against the latest saved baseline, failing on a
+mean regression of more than 20 %, with
+
+    python -m pytest test/test_benchmarks.py --benchmark-compare --benchmark-compare-fail=mean:20%
+
+Baselines are stored in .benchmarks/ by pytest-benchmark. Only timings are
+measured here, the behaviour of the code under benchmark is tested in the
+test module of each component.
+"""
+
+import math
+import time
+import socket
+import logging
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from log_analysis import read_log, decimate
+from src.gnc.cw_linear_dynamics import InPlaneDynamics
+from src.gnc.guidance.guidance import CWGuidance, SmoothGuidance
+from src.gnc.guidance.guidance_profiles import GuidanceParameters, SmoothProfile
+from src.gnc.guidance.relative_motion_guidance import RelativeMotionGuidance
+from src.gnc.relative_dynamics import RelativeMotionModel
+from src.gnc.lqr_continuous_ctrl import LQRControl, LQRCost
+from src.gnc.navigation import FullKnowledgeNavigation
+from src.gnc.replay import read_telemetry, GNCReplay
+from src.helpers.telemetry_server import TelemetryServer
+from src.mission.delta_v_accounting import DeltaVAccounting
+from src.mission.leg_state_machine import (
+    LegState,
+    LegStateMachine,
+    NavSnapshot,
+    Transition,
+)
+from src.physics.mission_snapshot import MissionSnapshot
+from src.physics.orbit_propagator import OrbitPropagator
+from src.physics.orb_dyn_utils import (
+    CelestialBodyParameters,
+    OrbitalDynamicsUtils,
+    OrbitElements,
+)
+
+# Kerbin
+BODY = CelestialBodyParameters(3.5316e12, 9.81, 600000.0)
+N = 2 * math.pi / 2400  # rad/s, mean motion of a 100 km orbit around Kerbin
+
+
+class FakeStreamHelper:
+    def __init__(self) -> None:
+        self.rel_pos = lambda: (120.0, -3500.0, 4.0)
+        self.rel_vel = lambda: (0.1, 0.5, -0.01)
+
+
+@pytest.fixture
+def orb_dyn():
+    return OrbitalDynamicsUtils(celestial_body_params=BODY)
+
+
+@pytest.fixture
+def target_orbit():
+    return OrbitElements(
+        semi_major_axis=700000.0,
+        eccentricity=0.001,
+        inclination=0.01,
+        longitude_of_ascending_node=0.3,
+        argument_of_periapsis=1.2,
+        mean_anomaly_at_epoch=0.5,
+        epoch=0.0,
+    )
+
+
+@pytest.fixture
+def chaser_orbit():
+    return OrbitElements(
+        semi_major_axis=699500.0,
+        eccentricity=0.002,
+        inclination=0.01,
+        longitude_of_ascending_node=0.3,
+        argument_of_periapsis=1.1,
+        mean_anomaly_at_epoch=0.6,
+        epoch=0.0,
+    )
+
+
+@pytest.fixture
+def lqr_cost():
+    return LQRCost(Q=1.0, R=1000.0)
+
+
+def test_cw_guidance_ref_signal(benchmark):
+    ref_signal = CWGuidance(orbital_rate=N).ref_signal(
+        initial_pos=(500.0, -2000.0, 0.0), initial_vel=(0.0, 0.75 * N * 500, 0.0)
+    )
+    benchmark(ref_signal, 600.0)
+
+
+def test_relative_motion_guidance_ref_signal(benchmark):
+    model = RelativeMotionModel(BODY.gravitational_parameter, 700000.0, 0.01)
+    ref_signal = RelativeMotionGuidance(model, lambda ut: N * ut).ref_signal(
+        initial_pos=(500.0, -2000.0, 0.0), initial_vel=(0.0, 0.75 * N * 500, 0.0)
+    )
+    # integration happens on first use, the loop only interpolates
+    ref_signal(1200.0)
+    benchmark(ref_signal, 600.0)
+
+
+def test_relative_motion_batch_propagation(benchmark):
+    model = RelativeMotionModel(BODY.gravitational_parameter, 700000.0, 0.01)
+    states = np.tile([500.0, -2000.0, 10.0, 0.0, 0.0, 0.1], (100, 1))
+    benchmark(model.propagate, states, 0.5, 1200.0)
+
+
+def test_smooth_guidance_sampling(benchmark):
+    params = GuidanceParameters(
+        norm_pos_pol_coeff=np.array([0, 0, 0, 10, -15, 6]),
+        norm_vel_pol_coeff=np.array([0, 0, 30, -60, 30]),
+        norm_acc_pol_coeff=np.array([0, 60, -180, 120]),
+    )
+    profiles = [SmoothProfile(guid_params=params) for _ in range(3)]
+    for profile, (p_i, p_f) in zip(profiles, ((10, 0), (-250, -15), (3, 0))):
+        profile.config_profile(p_i=p_i, p_f=p_f, duration=60)
+    ref_signal = SmoothGuidance(profiles=profiles).ref_signal()
+
+    def sample():
+        for i in range(100):
+            ref_signal(i / 100)
+
+    benchmark(sample)
+
+
+def test_lqr_construction(benchmark, lqr_cost):
+    pytest.importorskip("control")
+
+    def solve():
+        return LQRControl(lqr_cost, InPlaneDynamics(orbital_rate=N)).optimal_gain
+
+    benchmark(solve)
+
+
+def test_lqr_control(benchmark, lqr_cost):
+    pytest.importorskip("control")
+    controller = LQRControl(lqr_cost, InPlaneDynamics(orbital_rate=N))
+    controller.optimal_gain
+    state = np.array([[120.0], [-3500.0], [0.1], [0.5]])
+    ref = np.array([[100.0], [-3000.0], [0.0], [0.4]])
+    benchmark(controller.control, state, ref)
+
+
+def test_navigation_output(benchmark):
+    navigation = FullKnowledgeNavigation(stream_helper=FakeStreamHelper())
+    benchmark(navigation.output)
+
+
+def test_orbital_dynamics(benchmark, orb_dyn, target_orbit, chaser_orbit):
+    def evaluate():
+        orb_dyn.relative_position(target_orbit, chaser_orbit, 1000.0)
+        orb_dyn.time_to_apoapsis(chaser_orbit, 1000.0)
+        orb_dyn.impulsive_burn(chaser_orbit, 1000.0, 10.0)
+        orb_dyn.burn_time(delta_v=50.0, mass=5000.0, isp=300.0, thrust=60000.0)
+        orb_dyn.delta_v(
+            radii=700000.0,
+            current_semi_major_axis=699500.0,
+            new_semi_major_axis=690000.0,
+        )
+
+    benchmark(evaluate)
+
+
+def test_phasing_prediction(benchmark, orb_dyn, target_orbit, chaser_orbit):
+    snapshot = MissionSnapshot(
+        ut=0.0,
+        chaser=chaser_orbit,
+        target=target_orbit,
+        mass=5000.0,
+        specific_impulse=300.0,
+        available_thrust=60000.0,
+        rcs_forward_force=1000.0,
+        rel_pos=(0.0, 0.0, 0.0),
+    )
+    propagator = OrbitPropagator(orb_dyn, j2=1e-3)
+    period = orb_dyn.period(chaser_orbit)
+    # three phasing orbits, as re-planned after every burn
+    benchmark(propagator.phasing_estimates, snapshot, 3 * period, [period, 2 * period])
+
+
+def test_read_log(benchmark, tmp_path):
+    log = tmp_path / "rendezvous_docking.log"
+    with open(log, "w") as file:
+        for i in range(2000):
+            file.write(f"INFO - Nav, {i:.2f}, 1.00, 2.00, 3.00, 4.00, 5.00, 6.00\n")
+            file.write("INFO - Guid, 1.00, 2.00, 3.00, 4.00\n")
+            file.write("DEBUG - unrelated line\n")
+    benchmark(read_log, str(log))
+
+
+def test_decimate(benchmark):
+    t = np.linspace(0, 1000, 1_000_000)
+    series = (np.sin(t), np.cos(3 * t) + (t > 500) * 5)
+    benchmark(decimate, 5000, *series)
+
+
+def test_gnc_replay(benchmark, close_range_log):
+    replay = GNCReplay(
+        gnc_helper=close_range_log.gnc_helper,
+        stream_helper=close_range_log.stream_helper,
+    )
+    benchmark(lambda: replay.replay(read_telemetry(close_range_log.path)))
+
+
+def test_telemetry_publish(benchmark):
+    server = TelemetryServer(port=0, queue_size=100)
+    logger = logging.getLogger("telemetry_benchmark")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(server)
+    # a subscriber that never reads must not slow down the control loop
+    stalled = socket.create_connection(("127.0.0.1", server.port))
+    while not server.subscribers:
+        time.sleep(0.01)
+
+    def cycle():
+        for _ in range(100):
+            logger.info("Nav, 840.41, 772.71, -1184.60, 610.92, -11.05, 0.33, -0.99")
+            logger.info("Guid, 2914.35, -18.40, -5.50, 8.19")
+            logger.info("Control, 217.68, 118.46, -60.63, -194.74, 104.99, 127.07")
+
+    try:
+        benchmark(cycle)
+    finally:
+        logger.removeHandler(server)
+        server.close()
+        stalled.close()
+
+
+def test_delta_v_accounting(benchmark):
+    # 1 m/s prograde over 20 s of a 60 s CW drift, logged at 10 Hz
+    dynamics = InPlaneDynamics(orbital_rate=N).free_dynamics
+    messages = []
+    state = np.array([100.0, -500.0, 0.0, 0.2])
+    for i in range(600):
+        u = np.array([0.0, 0.05]) if 100 <= i < 300 else np.zeros(2)
+        x, y, x_dot, y_dot = state
+        messages.append(
+            f"Nav, {0.1 * i:.2f}, {x:.2f}, {y:.2f}, 0.00, {x_dot:.2f}, {y_dot:.2f}, 0.00"
+        )
+        messages.append(f"Control, {u[0]:.2f}, {u[1]:.2f}, 0.00, 0, 0, 0")
+        for _ in range(10):
+            state = state + 0.01 * (dynamics @ state + np.concatenate(([0, 0], u)))
+
+    accounting = DeltaVAccounting(orbital_rate=N)
+    logger = logging.getLogger("accounting_benchmark")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(accounting)
+
+    def account():
+        accounting.start_step("close_range", planned=1.0)
+        for message in messages:
+            logger.info(message)
+        return accounting.end_step()
+
+    try:
+        benchmark(account)
+    finally:
+        logger.removeHandler(accounting)
+
+
+def test_leg_state_machine(benchmark):
+    # 100 m leg along V-bar, knocked 20 m off at tick 300, settled again at tick 400
+    snapshots = []
+    for i in range(1000):
+        r = np.array([0.0, -100.0 + 0.1 * i, 0.0])
+        if 300 <= i < 400:
+            r[0] = 20.0
+        snapshots.append(NavSnapshot(ut=0.1 * i, r=r, v=np.zeros(3)))
+
+    def fly():
+        ticks = iter(snapshots)
+        machine = LegStateMachine(
+            lambda: next(ticks),
+            [
+                LegState(
+                    "tracking",
+                    transitions=[
+                        Transition("hold", lambda s: abs(s.r[0]) > 10, "off track"),
+                        Transition(
+                            "complete",
+                            lambda s: np.linalg.norm(s.r) < 1,
+                            "inside tolerance",
+                        ),
+                    ],
+                ),
+                LegState(
+                    "hold",
+                    transitions=[
+                        Transition("tracking", lambda s: abs(s.r[0]) < 1, "settled")
+                    ],
+                ),
+                LegState("complete", terminal=True),
+            ],
+            period=0.0,
+        )
+        return machine.run()
+
+    benchmark(fly)
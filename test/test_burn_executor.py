@@ -0,0 +1,146 @@
+"""Main engine burns with a predicted cutoff, against a simulated engine."""
+
+import time
+import logging
+
+import pytest
+
+from src.helpers.burn_executor import BurnExecutor
+from src.helpers.vessel_control_helper import VesselControlHelper
+from src.physics.orb_dyn_utils import CelestialBodyParameters, OrbitalDynamicsUtils
+
+# Kerbin
+BODY = CelestialBodyParameters(3.5316e12, 9.81, 600000.0)
+
+
+class Engine:
+    """Node delta-v burnt down in real time, 1 m/s**2 at full throttle."""
+
+    def __init__(
+        self, delta_v: float, thrust: float = 5000.0, flameout_at: float = None
+    ) -> None:
+        self.remaining = delta_v
+        self.flameout_at = flameout_at  # s after the start
+        self.values = {"available_thrust": thrust, "specific_impulse": 300.0}
+        self.values["mass"] = 5000.0
+        self.throttle = 0.0
+        self.throttles = []
+        self.t_start = self.t_last = time.perf_counter()
+
+    def update(self) -> None:
+        now = time.perf_counter()
+        if self.flameout_at is not None and now - self.t_start > self.flameout_at:
+            self.values["available_thrust"] = 0.0
+        # a burn that misses the flameout would never end
+        assert now - self.t_start < 5.0, "burn still running"
+        acceleration = self.values["available_thrust"] / self.values["mass"]
+        self.remaining -= self.throttle * acceleration * (now - self.t_last)
+        self.t_last = now
+
+    # vessel control helper
+    def get(self, name: str):
+        return self.values[name]
+
+    def set(self, name: str, value) -> bool:
+        self.update()
+        self.throttle = value
+        self.throttles.append(value)
+        return True
+
+    # stream helper
+    def ut(self) -> float:
+        self.update()
+        return self.t_last - self.t_start
+
+    def node_stream(self, node, attribute: str):
+        def remaining_delta_v() -> float:
+            self.update()
+            return self.remaining
+
+        return remaining_delta_v
+
+    def release_node_streams(self, node, attributes: tuple) -> None:
+        pass
+
+
+class Vessel:
+    """Vessel whose properties are read from the engine, as RPCs would be."""
+
+    def __init__(self, engine: Engine) -> None:
+        self.engine = engine
+        self.control = Control(engine)
+
+    def __getattr__(self, name: str):
+        self.engine.update()
+        return self.engine.values[name]
+
+
+class Control:
+    def __init__(self, engine: Engine) -> None:
+        object.__setattr__(self, "engine", engine)
+
+    def __setattr__(self, name: str, value) -> None:
+        self.engine.set(name, value)
+
+
+class Node:
+    reference_frame = None
+
+    def __init__(self, engine: Engine) -> None:
+        self.engine = engine
+
+    def remaining_burn_vector(self, frame) -> tuple:
+        return (0.0, self.engine.remaining, 0.0)
+
+
+def executor(engine: Engine, vessel_control_helper=None) -> BurnExecutor:
+    return BurnExecutor(
+        vessel_control_helper=vessel_control_helper or engine,
+        stream_helper=engine,
+        orb_dyn=OrbitalDynamicsUtils(BODY),
+        taper_time=0.3,
+    )
+
+
+def test_burn_cut_at_predicted_time():
+    engine = Engine(delta_v=0.8)
+    residual = executor(engine).execute(Node(engine))
+    assert residual == pytest.approx(0.0, abs=0.05)
+    assert engine.throttles[0] == 1.0
+    # tapered before the cutoff, then cut
+    assert 0 < min(engine.throttles[:-1]) < 1.0
+    assert engine.throttles[-1] == 0.0
+
+
+def test_burn_ended_without_thrust(caplog):
+    engine = Engine(delta_v=0.8, thrust=0.0)
+    with caplog.at_level(logging.WARNING):
+        residual = executor(engine).execute(Node(engine))
+    assert residual == pytest.approx(0.8)
+    assert engine.throttles == [0.0]
+    assert "No thrust available" in caplog.text
+
+
+def test_burn_ended_by_a_flameout(caplog):
+    engine = Engine(delta_v=0.8, flameout_at=0.2)
+    vessel_control_helper = VesselControlHelper(
+        Vessel(engine), stream_helper=engine, space_center_helper=None
+    )
+    with caplog.at_level(logging.WARNING):
+        residual = executor(engine, vessel_control_helper).execute(Node(engine))
+    assert 0.4 < residual < 0.7
+    assert "No thrust available" in caplog.text
+    assert engine.throttles[-1] == 0.0
+
+
+def test_throttle_cut_when_the_burn_fails():
+    engine = Engine(delta_v=0.8)
+
+    def failing(node, attribute):
+        samples = iter([0.8, 0.7])
+        return lambda: next(samples)
+
+    engine.node_stream = failing
+    with pytest.raises(StopIteration):
+        executor(engine).execute(Node(engine))
+    assert engine.throttles[-1] == 0.0
@@ -0,0 +1,97 @@
+"""Checkpoint persistence and resume checks against the live vessels."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.mission.checkpoint import (
+    Checkpoint,
+    CheckpointMismatchError,
+    CheckpointStore,
+)
+
+
+class Node(SimpleNamespace):
+    prograde = normal = radial = 0.0
+
+    def remove(self) -> None:
+        self.removed = True
+
+
+class VesselControl:
+    """Node list and cache of one vessel, as the checkpoint uses them."""
+
+    def __init__(self, nodes: list) -> None:
+        self.nodes = nodes
+
+    def invalidate(self, *names: str) -> None:
+        pass
+
+    def get(self, name: str):
+        return list(self.nodes)
+
+    def remove_node(self, node) -> None:
+        node.remove()
+        self.nodes.remove(node)
+
+
+def game_helper(nodes: list, chaser_sma: float = 700_000.0):
+    def vessel(name: str, sma: float):
+        return SimpleNamespace(name=name, orbit=SimpleNamespace(semi_major_axis=sma))
+
+    return SimpleNamespace(
+        chaser=vessel("Chaser", chaser_sma),
+        target=vessel("Target", 700_000.0),
+        vessel_control_helper=VesselControl(nodes),
+    )
+
+
+def checkpoint(**fields) -> Checkpoint:
+    return Checkpoint(
+        mission_name="test",
+        mission_file="missions/rendezvous_docking.json",
+        vessels={
+            "chaser": "Chaser",
+            "target": "Target",
+            "chaser_semi_major_axis": 700_000.0,
+            "target_semi_major_axis": 700_000.0,
+        },
+        **fields,
+    )
+
+
+def test_round_trip(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoint.json"))
+    assert store.load() is None
+    saved = checkpoint(completed_steps=["orbit_raise"], current_step="homing")
+    store.save(saved)
+    assert store.load() == saved
+
+
+@pytest.mark.parametrize("content", ["{", "[]", '{"mission_name": "test"}'])
+def test_unreadable_checkpoint(tmp_path, content):
+    path = tmp_path / "checkpoint.json"
+    path.write_text(content)
+    with pytest.raises(CheckpointMismatchError):
+        CheckpointStore(str(path)).load()
+
+
+def test_only_checkpoint_nodes_removed():
+    planned = Node(ut=1000.0, removed=False)
+    by_hand = Node(ut=2000.0, removed=False)
+    helper = game_helper([planned, by_hand])
+    CheckpointStore("unused").check_live_state(
+        checkpoint(
+            nodes=[{"ut": 1000.0, "prograde": 1.0, "normal": 0.0, "radial": 0.0}]
+        ),
+        helper,
+    )
+    assert planned.removed and not by_hand.removed
+    assert helper.vessel_control_helper.nodes == [by_hand]
+
+
+def test_orbit_changed_since_checkpoint():
+    with pytest.raises(CheckpointMismatchError):
+        CheckpointStore("unused").check_live_state(
+            checkpoint(), game_helper([], chaser_sma=720_000.0)
+        )
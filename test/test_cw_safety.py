@@ -0,0 +1,73 @@
+"""Keep-out sphere and approach cone checks of the close range legs."""
+
+import math
+from pathlib import Path
+
+import numpy as np
+
+from src.gnc.guidance.cw_safety import CWSafetyChecker
+from src.gnc.guidance.guidance_profiles import GuidanceParameters, SmoothProfile
+from src.mission.mission_plan import MissionFileHelper
+
+ROOT = Path(__file__).resolve().parent.parent
+ORBITAL_RATE = 2 * math.pi / 2000  # rad/s, low Kerbin orbit
+
+
+def leg_states(p_i, p_f, duration: float, samples: int = 100) -> tuple:
+    """Reference positions and velocities of a smooth close range leg."""
+    profile = SmoothProfile(
+        GuidanceParameters(
+            norm_pos_pol_coeff=np.array([0, 0, 0, 10, -15, 6]),
+            norm_vel_pol_coeff=np.array([0, 0, 30, -60, 30]),
+            norm_acc_pol_coeff=np.array([0, 60, -180, 120]),
+        )
+    )
+    p_i, p_f = np.asarray(p_i, dtype=float), np.asarray(p_f, dtype=float)
+    tau = np.linspace(0, 1, samples)
+    return (
+        p_i + np.outer(profile.normalized_pos(tau), p_f - p_i),
+        np.outer(profile.normalized_vel(tau), (p_f - p_i) / duration),
+    )
+
+
+def checker(plan) -> CWSafetyChecker:
+    return CWSafetyChecker(
+        orbital_rate=ORBITAL_RATE,
+        keep_out_radius=plan.parameters["keep_out_radius"],
+        cone_half_angle=plan.parameters["approach_cone_half_angle"],
+        cone_axis=plan.approach_axis(),
+    )
+
+
+def test_shipped_mission_legs_are_safe():
+    plan = MissionFileHelper.load(ROOT / "missions" / "rendezvous_docking.json")
+    safety_checker = checker(plan)
+    assert safety_checker.enabled
+    legs = [step.params for step in plan.steps if step.phase == "close_range"]
+    for previous, leg in zip(legs, legs[1:]):
+        states = leg_states(
+            previous["final_state"], leg["final_state"], leg["duration"]
+        )
+        assert safety_checker.violations(*states) == []
+
+
+def test_leg_leaving_the_approach_cone_is_unsafe():
+    safety_checker = CWSafetyChecker(ORBITAL_RATE, 50.0, 30.0, cone_axis=(0, 0, 1))
+    violations = safety_checker.violations(*leg_states((0, 100, 0), (0, 0, 30), 45))
+    assert len(violations) == 2
+
+
+def test_passive_abort_check():
+    safety_checker = CWSafetyChecker(ORBITAL_RATE, 50.0, 30.0)
+    # a V-bar point is a CW equilibrium
+    assert safety_checker.is_safe((0, -100, 0), (0, 0, 0))
+    # drifting into the sphere is allowed inside the approach cone only
+    assert safety_checker.is_safe((0, 100, 0), (0, -1, 0))
+    assert not safety_checker.is_safe((0, -100, 0), (0, 1, 0))
+
+
+def test_disabled_checker_reports_nothing():
+    safety_checker = CWSafetyChecker(ORBITAL_RATE, 0.0, 30.0, cone_axis=(0, 0, 1))
+    assert not safety_checker.enabled
+    assert safety_checker.violations(*leg_states((0, 100, 0), (0, 0, 30), 45)) == []
+    assert safety_checker.is_safe((0, -100, 0), (0, 1, 0))
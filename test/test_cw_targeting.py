@@ -0,0 +1,64 @@
+"""CW state-transition matrix and two-impulse targeting."""
+
+import math
+
+import numpy as np
+import pytest
+from scipy.linalg import expm
+
+from src.gnc.guidance.cw_targeting import CWTargeting, UnsafeTrajectoryError
+
+N = 2 * math.pi / 2000  # rad/s, low Kerbin orbit
+
+
+def cw_matrix(n: float) -> np.ndarray:
+    """CW dynamics of the state (r, v), as the in-plane and out-of-plane models."""
+    a = np.zeros((6, 6))
+    a[:3, 3:] = np.eye(3)
+    a[3, 0], a[3, 4] = 3 * n**2, -2 * n
+    a[4, 3] = 2 * n
+    a[5, 2] = -(n**2)
+    return a
+
+
+def test_stm_matches_dynamics():
+    times = np.array([0.0, 30.0, 600.0, 1500.0])
+    rr, rv, vr, vv = CWTargeting(N).stm(times)
+    for k, t in enumerate(times):
+        phi = expm(cw_matrix(N) * t)
+        np.testing.assert_allclose(
+            np.block([[rr[k], rv[k]], [vr[k], vv[k]]]), phi, atol=1e-9
+        )
+
+
+def test_two_impulse_reaches_target():
+    targeting = CWTargeting(N)
+    r_0, v_0, r_f = (
+        np.array([20.0, -400.0, 5.0]),
+        np.array([0.1, 0.5, 0.0]),
+        (0, -100, 0),
+    )
+    times = np.array([60.0, 120.0, 300.0])
+    dv_1, dv_2 = targeting.two_impulse(r_0, v_0, r_f, times)
+    rr, rv, vr, vv = targeting.stm(times)
+    v_1 = v_0 + dv_1
+    r_arrival = rr @ r_0 + (rv @ v_1[..., None])[..., 0]
+    v_arrival = vr @ r_0 + (vv @ v_1[..., None])[..., 0]
+    np.testing.assert_allclose(r_arrival, np.tile(r_f, (3, 1)), atol=1e-6)
+    np.testing.assert_allclose(v_arrival + dv_2, 0.0, atol=1e-9)
+
+
+def test_cheapest_skips_singular_times():
+    targeting = CWTargeting(N)
+    period = 2 * math.pi / N
+    transfer_time, dv_1, _ = targeting.cheapest(
+        (0, -400, 0), (0, 0, 0), (0, -100, 0), [period, 200.0]
+    )
+    assert transfer_time == 200.0
+    assert np.isfinite(dv_1).all()
+
+
+def test_cheapest_without_transfer():
+    period = 2 * math.pi / N
+    with pytest.raises(UnsafeTrajectoryError):
+        CWTargeting(N).cheapest((0, -400, 0), (0, 0, 0), (0, -100, 0), [period])
@@ -0,0 +1,164 @@
+"""Delta-v spent by each mission step, from telemetry and propellant."""
+
+import math
+import threading
+import logging
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.gnc.cw_linear_dynamics import InPlaneDynamics
+from src.mission.delta_v_accounting import G_0, DeltaVAccounting, PropellantMonitor
+
+N = 2 * math.pi / 2400  # rad/s
+
+
+@pytest.fixture
+def logger():
+    logger = logging.getLogger("accounting_test")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    yield logger
+    logger.handlers.clear()
+
+
+def cw_leg_messages() -> list:
+    """1 m/s prograde over 20 s of a 60 s CW drift, logged at 10 Hz."""
+    dynamics = InPlaneDynamics(orbital_rate=N).free_dynamics
+    messages = []
+    state = np.array([100.0, -500.0, 0.0, 0.2])
+    for i in range(600):
+        u = np.array([0.0, 0.05]) if 100 <= i < 300 else np.zeros(2)
+        x, y, x_dot, y_dot = state
+        messages.append(
+            f"Nav, {0.1 * i:.2f}, {x:.2f}, {y:.2f}, 0.00, {x_dot:.2f}, {y_dot:.2f}, 0.00"
+        )
+        messages.append(f"Control, {u[0]:.2f}, {u[1]:.2f}, 0.00, 0, 0, 0")
+        for _ in range(10):
+            state = state + 0.01 * (dynamics @ state + np.concatenate(([0, 0], u)))
+    return messages
+
+
+def test_commanded_and_measured_delta_v(logger):
+    accounting = DeltaVAccounting(orbital_rate=N)
+    logger.addHandler(accounting)
+    accounting.start_step("close_range", planned=1.0)
+    for message in cw_leg_messages():
+        logger.info(message)
+    logger.info("Departure impulse, 0.30, -0.40, 0.00 m/s")
+    step = accounting.end_step()
+    assert step.commanded == pytest.approx(1.5, abs=0.01)
+    assert step.measured == pytest.approx(1.0, abs=0.1)
+    # without propellant readings the measured delta-v is the actual one
+    assert step.actual == step.measured
+
+
+def test_other_threads_not_counted(logger):
+    accounting = DeltaVAccounting(orbital_rate=N)
+    logger.addHandler(accounting)
+    accounting.start_step("close_range", planned=1.0)
+    other = threading.Thread(
+        target=logger.info, args=("Departure impulse, 3.00, 4.00, 0.00 m/s",)
+    )
+    other.start()
+    other.join()
+    assert accounting.end_step().commanded == 0.0
+
+
+class Resource:
+    """Streamed amount of a resource, counting the waits for a fresh update."""
+
+    def __init__(self, amount: float) -> None:
+        self.amount = amount
+        self.condition = threading.Condition()
+        self.waits = 0
+
+    def __call__(self) -> float:
+        return self.amount
+
+    def wait(self, timeout: float) -> None:
+        self.waits += 1
+
+
+@pytest.fixture
+def vessel():
+    resources = {
+        name: Resource(amount)
+        for name, amount in (
+            ("LiquidFuel", 900.0),
+            ("Oxidizer", 1100.0),
+            ("MonoPropellant", 100.0),
+        )
+    }
+    values = {"mass": 20000.0, "specific_impulse": 300.0}
+    return SimpleNamespace(
+        resources=resources,
+        values=values,
+        monitor=PropellantMonitor(
+            stream_helper=SimpleNamespace(
+                resource_stream=lambda name, rate: resources[name]
+            ),
+            vessel_control_helper=SimpleNamespace(
+                get=values.get,
+                vessel=SimpleNamespace(
+                    parts=SimpleNamespace(
+                        rcs=[SimpleNamespace(vacuum_specific_impulse=240.0)]
+                    )
+                ),
+            ),
+            space_center=SimpleNamespace(
+                Resources=SimpleNamespace(density=lambda name: 5.0)
+            ),
+        ),
+    )
+
+
+def test_propellant_delta_v(vessel):
+    accounting = DeltaVAccounting(orbital_rate=N, propellant_monitor=vessel.monitor)
+    accounting.start_step("orbit_raise", planned=50.0)
+    # 200 units of 5 kg burnt by the engine, 10 by the RCS
+    vessel.resources["LiquidFuel"].amount -= 90.0
+    vessel.resources["Oxidizer"].amount -= 110.0
+    vessel.resources["MonoPropellant"].amount -= 10.0
+    step = accounting.end_step()
+    assert step.propellant == {
+        "LiquidFuel": 90.0,
+        "Oxidizer": 110.0,
+        "MonoPropellant": 10.0,
+    }
+    assert step.main_delta_v == pytest.approx(300.0 * G_0 * math.log(20000 / 19000))
+    assert step.rcs_delta_v == pytest.approx(240.0 * G_0 * math.log(20000 / 19950))
+    assert step.actual == pytest.approx(step.main_delta_v + step.rcs_delta_v)
+
+
+def test_jettisoned_propellant_not_counted(vessel):
+    accounting = DeltaVAccounting(orbital_rate=N, propellant_monitor=vessel.monitor)
+    accounting.start_step("separation", planned=0.0, vessel_action=True)
+    # the tanks of the jettisoned stage leave with it
+    vessel.resources["LiquidFuel"].amount = 300.0
+    vessel.resources["Oxidizer"].amount = 400.0
+    vessel.values["mass"] = 8000.0
+    assert accounting.end_step().propellant == {}
+    accounting.start_step("homing", planned=1.0)
+    # the step after a vessel action waits for fresh levels
+    assert all(resource.waits == 1 for resource in vessel.resources.values())
+    vessel.resources["MonoPropellant"].amount -= 2.0
+    step = accounting.end_step()
+    assert step.propellant["LiquidFuel"] == 0.0
+    assert step.main_delta_v == 0.0 and step.rcs_delta_v > 0
+
+
+def test_main_engine_delta_v_with_the_isp_of_the_step(vessel):
+    accounting = DeltaVAccounting(orbital_rate=N, propellant_monitor=vessel.monitor)
+    accounting.start_step("separation", planned=0.0, vessel_action=True)
+    accounting.end_step()
+    # the next stage engines, read when its step starts
+    vessel.values["specific_impulse"] = 350.0
+    accounting.start_step("orbit_raise", planned=50.0)
+    vessel.resources["LiquidFuel"].amount -= 90.0
+    vessel.resources["Oxidizer"].amount -= 110.0
+    # flamed out at the end of the burn
+    vessel.values["specific_impulse"] = 0.0
+    step = accounting.end_step()
+    assert step.main_delta_v == pytest.approx(350.0 * G_0 * math.log(20000 / 19000))
@@ -0,0 +1,109 @@
+"""Port-to-port relative state in the target port frame."""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from scipy.spatial.transform import Rotation
+
+from src.helpers.docking_port_helper import DockingPortHelper, rotation_matrix
+
+READY, DOCKED = "ready", "docked"
+
+
+def quaternion(axis: str, degrees: float) -> tuple:
+    """kRPC (x, y, z, w) quaternion of a rotation about one axis."""
+    return tuple(Rotation.from_euler(axis, degrees, degrees=True).as_quat())
+
+
+def port(offset, rotation, tag: str = "") -> SimpleNamespace:
+    return SimpleNamespace(
+        state=READY,
+        part=SimpleNamespace(tag=tag, title=f"port {tag}"),
+        position=lambda frame: offset,
+        rotation=lambda frame: rotation,
+    )
+
+
+def vessel(*ports) -> SimpleNamespace:
+    return SimpleNamespace(
+        parts=SimpleNamespace(docking_ports=list(ports), controlling=None),
+        reference_frame="vessel frame",
+    )
+
+
+class Streams:
+    """Chaser position, velocity and rotation in the target vessel frame."""
+
+    def __init__(self, position, velocity, rotation) -> None:
+        self.state = (position, velocity, rotation)
+        self.released = False
+
+    def target_frame_streams(self) -> tuple:
+        return tuple((lambda value=value: value) for value in self.state)
+
+    def release_target_frame_streams(self) -> None:
+        self.released = True
+
+
+def helper(chaser, target, streams) -> DockingPortHelper:
+    return DockingPortHelper(
+        chaser,
+        target,
+        streams,
+        SimpleNamespace(invalidate=lambda *names: None),
+        SimpleNamespace(DockingPortState=SimpleNamespace(ready=READY, docked=DOCKED)),
+    )
+
+
+def test_rotation_matrix_matches_krpc_quaternions():
+    for axis, degrees in (("x", 30), ("y", -70), ("z", 180)):
+        q = quaternion(axis, degrees)
+        np.testing.assert_allclose(
+            rotation_matrix(q), Rotation.from_quat(q).as_matrix(), atol=1e-12
+        )
+    q = tuple(Rotation.from_euler("xyz", (10, 20, 30), degrees=True).as_quat())
+    matrix = rotation_matrix(q)
+    np.testing.assert_allclose(matrix @ matrix.T, np.eye(3), atol=1e-12)
+
+
+@pytest.mark.parametrize("target_port_angle", [0.0, 90.0, -135.0])
+def test_port_state_on_the_port_axis(target_port_angle):
+    # target port 2 m off the target centre, its y axis out of the port
+    target_offset = np.array([0.5, 2.0, 0.0])
+    target_rotation = quaternion("z", target_port_angle)
+    axis = rotation_matrix(target_rotation) @ np.array([0.0, 1.0, 0.0])
+    # chaser turned to face the target port, its own port 1 m ahead of its centre
+    chaser_rotation = tuple(
+        (
+            Rotation.from_quat(target_rotation)
+            * Rotation.from_euler("z", 180, degrees=True)
+        ).as_quat()
+    )
+    chaser_port_position = target_offset + 10.0 * axis
+    position = chaser_port_position - rotation_matrix(chaser_rotation) @ np.array(
+        [0.0, 1.0, 0.0]
+    )
+    streams = Streams(tuple(position), tuple(-0.2 * axis), chaser_rotation)
+    ports = helper(
+        vessel(port((0.0, 1.0, 0.0), quaternion("z", 0), tag="chaser")),
+        vessel(port(tuple(target_offset), target_rotation, tag="target")),
+        streams,
+    )
+    ports.select_ports("chaser", "target")
+    r, v = ports.port_state()
+    np.testing.assert_allclose(r, (0.0, 10.0, 0.0), atol=1e-9)
+    np.testing.assert_allclose(v, (0.0, -0.2, 0.0), atol=1e-9)
+    # closing along the port axis is forward for a chaser facing the port
+    np.testing.assert_allclose(
+        ports.port_to_body((0.0, -1.0, 0.0)), (0, 1, 0), atol=1e-9
+    )
+    ports.release()
+    assert streams.released
+
+
+def test_no_free_port():
+    ports = helper(vessel(), vessel(port((0, 0, 0), (0, 0, 0, 1))), Streams(0, 0, 0))
+    assert not ports.ports_available()
+    with pytest.raises(RuntimeError):
+        ports.select_ports()
@@ -0,0 +1,94 @@
+"""Mission planning from a snapshot, as --dry_run prints it."""
+
+import math
+from dataclasses import replace
+from types import SimpleNamespace
+
+import pytest
+
+from rendezvous_docking import print_dry_run
+from src.helpers.node_helper import NodeHelper
+from src.mission.orbit_raise import OrbitRaise
+from src.physics.mission_snapshot import MissionSnapshot
+from src.physics.orb_dyn_utils import (
+    CelestialBodyParameters,
+    OrbitalDynamicsUtils,
+    OrbitElements,
+)
+
+# Kerbin
+BODY = CelestialBodyParameters(3.5316e12, 9.81, 600000.0)
+CHASER = OrbitElements(
+    semi_major_axis=680000.0,
+    eccentricity=0.01,
+    inclination=0.0,
+    longitude_of_ascending_node=0.0,
+    argument_of_periapsis=0.5,
+    mean_anomaly_at_epoch=0.0,
+    epoch=0.0,
+)
+
+
+@pytest.fixture
+def orb_dyn():
+    return OrbitalDynamicsUtils(celestial_body_params=BODY)
+
+
+def orbit_raise(orb_dyn) -> OrbitRaise:
+    node_helper = NodeHelper(
+        vessel_control_helper=None,
+        orb_dyn=orb_dyn,
+        params=BODY,
+        stream_helper=None,
+        space_center_helper=None,
+        att_ctrl_helper=None,
+        rcs_ctrl_helper=None,
+        burn_executor=None,
+        warp_scheduler=None,
+    )
+    game_helper = SimpleNamespace(orb_dyn=orb_dyn, node_helper=node_helper)
+    return OrbitRaise(game_helper, desired_apoapsis=700000.0)
+
+
+def snapshot(target_periapsis: float, thrust: float, isp: float) -> MissionSnapshot:
+    return MissionSnapshot(
+        ut=0.0,
+        chaser=CHASER,
+        target=replace(CHASER, argument_of_periapsis=target_periapsis),
+        mass=5000.0,
+        specific_impulse=isp,
+        available_thrust=thrust,
+        rcs_forward_force=0.0,
+        rel_pos=(0.0, 0.0, 0.0),
+    )
+
+
+def test_burn_time_unknown_without_an_engine(orb_dyn):
+    assert math.isnan(orb_dyn.burn_time(10.0, 5000.0, isp=0.0, thrust=0.0))
+    assert math.isnan(orb_dyn.burn_time(10.0, 5000.0, isp=300.0, thrust=0.0))
+    assert orb_dyn.burn_time(10.0, 5000.0, isp=300.0, thrust=60000.0) > 0
+
+
+@pytest.mark.parametrize("offset", [1.0, -1.0])
+def test_orbit_raise_burns_at_the_target_periapsis_direction(orb_dyn, offset):
+    (node,), _ = orbit_raise(orb_dyn).plan_phase(
+        snapshot(CHASER.argument_of_periapsis + offset, 60000.0, 300.0)
+    )
+    # a positive true anomaly is kept, a negative one is wrapped once
+    true_anomaly = offset % (2 * math.pi)
+    assert node.ut == pytest.approx(orb_dyn.ut_at_true_anomaly(CHASER, true_anomaly, 0))
+
+
+def test_dry_run_without_an_engine(orb_dyn, capsys):
+    start = snapshot(CHASER.argument_of_periapsis + 1.0, thrust=0.0, isp=0.0)
+    nodes, end = orbit_raise(orb_dyn).plan_phase(start)
+    assert math.isnan(nodes[0].burn_time)
+    assert end.mass == start.mass and not math.isnan(end.ut)
+
+    runner = SimpleNamespace(
+        dry_run=lambda snapshot, start_from: (nodes, end),
+        game_helper=SimpleNamespace(orb_dyn=orb_dyn),
+        plan=SimpleNamespace(name="test"),
+    )
+    print_dry_run(runner, start, start_from=None)
+    assert "unknown" in capsys.readouterr().out
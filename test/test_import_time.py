@@ -0,0 +1,74 @@
+"""Import-time budget of the command line entry points, see IMPORT_TIME_BUDGET_US."""
+
+import os
+import sys
+import time
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+IMPORT_TIME_BUDGET_US = int(os.environ.get("IMPORT_TIME_BUDGET_US", 500_000))
+HEAVY_MODULES = ("control", "scipy", "matplotlib", "krpc")
+
+
+def import_time_us(module: str) -> int:
+    """Cumulative import time of a module as reported by python -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in result.stderr.splitlines():
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1])
+    raise AssertionError(f"{module} not found in importtime output")
+
+
+def loaded_modules(statement: str) -> set:
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"import sys; {statement}; print(' '.join(sys.modules))",
+        ],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return {name.split(".")[0] for name in result.stdout.split()}
+
+
+def test_entry_points_import_time():
+    for module in (
+        "rendezvous_docking",
+        "log_analysis",
+        "replay_log",
+        "telemetry_plot",
+    ):
+        elapsed = import_time_us(module)
+        print(f"{module}: {elapsed / 1000:.1f} ms")
+        assert elapsed < IMPORT_TIME_BUDGET_US
+
+
+def test_no_heavy_imports_before_needed():
+    modules = loaded_modules(
+        "import rendezvous_docking, log_analysis, replay_log, telemetry_plot; "
+        "from src.mission.mission_plan import MissionFileHelper; "
+        "MissionFileHelper.load('missions/rendezvous_docking.json')"
+    )
+    assert not modules & set(HEAVY_MODULES)
+
+
+def test_help_starts_fast():
+    t_start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "rendezvous_docking.py", "--help"],
+        cwd=ROOT,
+        capture_output=True,
+        check=True,
+    )
+    assert time.perf_counter() - t_start < 1.0
@@ -0,0 +1,118 @@
+"""Closed loop legs run as states evaluated once per control tick."""
+
+import time
+import logging
+
+import numpy as np
+import pytest
+
+from src.mission.leg_state_machine import (
+    LegState,
+    LegStateMachine,
+    NavSnapshot,
+    Transition,
+)
+
+
+def v_bar_leg() -> list:
+    """100 m leg along V-bar, knocked 20 m off at tick 300, settled again at 400."""
+    snapshots = []
+    for i in range(1000):
+        r = np.array([0.0, -100.0 + 0.1 * i, 0.0])
+        if 300 <= i < 400:
+            r[0] = 20.0
+        snapshots.append(NavSnapshot(ut=0.1 * i, r=r, v=np.zeros(3)))
+    return snapshots
+
+
+def leg_machine(snapshots, entered: dict, actions: list) -> LegStateMachine:
+    ticks = iter(snapshots)
+
+    def entry(snapshot):
+        entered.setdefault(machine.state.name, snapshot.ut)
+
+    machine = LegStateMachine(
+        lambda: next(ticks),
+        [
+            LegState(
+                "tracking",
+                action=lambda s: actions.append(("tracking", s.ut)),
+                on_enter=entry,
+                transitions=[
+                    Transition("hold", lambda s: abs(s.r[0]) > 10, "off track"),
+                    Transition(
+                        "complete",
+                        lambda s: np.linalg.norm(s.r) < 1,
+                        "inside tolerance",
+                    ),
+                ],
+            ),
+            LegState(
+                "hold",
+                action=lambda s: actions.append(("hold", s.ut)),
+                on_enter=entry,
+                transitions=[
+                    Transition("tracking", lambda s: abs(s.r[0]) < 1, "settled")
+                ],
+                log_level=logging.WARNING,
+            ),
+            LegState("complete", on_enter=entry, terminal=True),
+        ],
+        period=0.0,
+    )
+    return machine
+
+
+def test_transitions_taken_on_the_tick_their_condition_holds(caplog):
+    entered, actions = {}, []
+    with caplog.at_level(logging.INFO):
+        outcome = leg_machine(v_bar_leg(), entered, actions).run()
+    assert outcome == "complete"
+    assert entered["hold"] == pytest.approx(30.0)
+    assert entered["tracking"] == pytest.approx(40.0)
+    assert entered["complete"] == pytest.approx(99.1)
+    # the action of the new state runs on the snapshot of the transition
+    assert ("hold", pytest.approx(30.0)) in actions
+    assert ("tracking", pytest.approx(29.9)) in actions
+    assert "Leg state tracking -> hold: off track" in caplog.text
+    assert [r.levelno for r in caplog.records if "-> hold" in r.message] == [
+        logging.WARNING
+    ]
+
+
+def test_commanded_transition_wins():
+    entered, actions = {}, []
+    machine = leg_machine(v_bar_leg(), entered, actions)
+    machine.tick()
+    machine.command("hold", "operator hold")
+    snapshot = machine.tick()
+    assert machine.state.name == "hold" and entered["hold"] == snapshot.ut
+    # on track, the hold is left at the next tick
+    snapshot = machine.tick()
+    assert machine.state.name == "tracking"
+    assert machine.time_in_state(snapshot) == 0.0
+    with pytest.raises(ValueError):
+        machine.command("docked", "unknown state")
+
+
+def test_ticks_on_a_fixed_grid():
+    ticks = []
+
+    def sample() -> NavSnapshot:
+        ticks.append(time.perf_counter())
+        time.sleep(0.01)  # time spent in the tick is not added to the period
+        return NavSnapshot(ut=len(ticks), r=np.zeros(3), v=np.zeros(3))
+
+    machine = LegStateMachine(
+        sample,
+        [
+            LegState(
+                "tracking",
+                transitions=[Transition("done", lambda s: s.ut >= 10, "done")],
+            ),
+            LegState("done", terminal=True),
+        ],
+        period=0.03,
+    )
+    assert machine.run() == "done"
+    assert np.mean(np.diff(ticks)) == pytest.approx(0.03, abs=0.005)
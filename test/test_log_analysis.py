@@ -0,0 +1,36 @@
+"""Log reading and the downsampling of plotted series."""
+
+import numpy as np
+
+from log_analysis import decimate, read_log
+
+
+def test_read_log(tmp_path):
+    log = tmp_path / "rendezvous_docking.log"
+    with open(log, "w") as file:
+        for i in range(20):
+            file.write(f"INFO - Nav, {i:.2f}, 1.00, 2.00, 3.00, 4.00, 5.00, 6.00\n")
+            file.write("INFO - Guid, 1.00, 2.00, 3.00, 4.00\n")
+            file.write("DEBUG - unrelated line\n")
+    nav_pos, nav_vel, guid_pos, guid_vel, timestamp = read_log(str(log))
+    assert timestamp == [float(i) for i in range(20)]
+    assert nav_pos == [(1.0,) * 20, (2.0,) * 20]
+    assert nav_vel == [(4.0,) * 20, (5.0,) * 20]
+    assert guid_pos == [(1.0,) * 20, (2.0,) * 20]
+    assert guid_vel == [(3.0,) * 20, (4.0,) * 20]
+
+
+def test_decimate_keeps_peaks():
+    t = np.linspace(0, 1000, 1_000_000)
+    series = (np.sin(t), np.cos(3 * t) + (t > 500) * 5)
+    kept = decimate(5000, *series)
+    assert len(kept) <= 5002
+    assert kept[0] == 0 and kept[-1] == len(t) - 1
+    assert np.all(np.diff(kept) > 0)
+    for values in series:
+        assert values[kept].max() == values.max()
+        assert values[kept].min() == values.min()
+
+
+def test_short_series_kept_whole():
+    np.testing.assert_array_equal(decimate(100, np.arange(50)), np.arange(50))
@@ -0,0 +1,92 @@
+"""Run logs, their rotation and reading them back."""
+
+import os
+import gzip
+import queue
+import logging
+import logging.handlers
+import threading
+
+import pytest
+
+from src.gnc.replay import read_telemetry
+from src.helpers.log_helper import (
+    LOG_FILE,
+    DeferredQueueHandler,
+    LogHelper,
+    latest_log,
+    log_parts,
+    read_lines,
+)
+
+
+@pytest.fixture
+def run_log(tmp_path):
+    path = LogHelper.setup("test run", log_dir=str(tmp_path), max_bytes=2000)
+    yield path
+    LogHelper.stop()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        if isinstance(handler, DeferredQueueHandler):
+            root.removeHandler(handler)
+
+
+def test_run_read_across_rotated_parts(run_log):
+    for i in range(200):
+        logging.info(f"Message {i}")
+    LogHelper.stop()
+    parts = log_parts(run_log)
+    assert parts[0].endswith(".gz") and parts[-1] == run_log
+    messages = [line for line in read_lines(run_log) if line.startswith("INFO")]
+    assert messages == [f"INFO - Message {i}\n" for i in range(200)]
+
+
+def test_records_formatted_on_the_listener_thread():
+    records = queue.SimpleQueue()
+    handler = DeferredQueueHandler(records)
+    record = logging.LogRecord("test", logging.INFO, "", 0, "Nav, %.2f", (1.0,), None)
+    handler.emit(record)
+    queued = records.get_nowait()
+    assert queued.msg == "Nav, %.2f" and queued.args == (1.0,)
+
+    threads = []
+
+    class FormattingHandler(logging.Handler):
+        def emit(self, record):
+            threads.append(threading.current_thread())
+            self.format(record)
+
+    listener = logging.handlers.QueueListener(records, FormattingHandler())
+    listener.start()
+    handler.emit(record)
+    listener.stop()
+    assert threads and threading.current_thread() not in threads
+
+
+def test_latest_log_of_a_log_dir(tmp_path):
+    assert latest_log(str(tmp_path)) == LOG_FILE
+    for run in ("20260101-000000", "20260102-000000"):
+        os.makedirs(tmp_path / "mission" / run)
+        (tmp_path / "mission" / run / LOG_FILE).write_text("")
+    os.utime(tmp_path / "mission" / "20260101-000000" / LOG_FILE, (0, 0))
+    assert latest_log(str(tmp_path)) == str(
+        tmp_path / "mission" / "20260102-000000" / LOG_FILE
+    )
+
+
+def test_telemetry_read_across_rotated_parts(close_range_log, tmp_path):
+    with open(close_range_log.path) as file:
+        lines = file.readlines()
+    # cut in the middle of the leg, rotated parts are numbered newest first
+    path = str(tmp_path / LOG_FILE)
+    cuts = [0, len(lines) // 3, 2 * len(lines) // 3, len(lines)]
+    for part, (start, end) in zip((2, 1), zip(cuts, cuts[1:])):
+        with gzip.open(f"{path}.{part}.gz", "wt") as file:
+            file.writelines(["# header\n", *lines[start:end]])
+    with open(path, "w") as file:
+        file.writelines(["# header\n", *lines[cuts[2] :]])
+    assert log_parts(path) == [f"{path}.2.gz", f"{path}.1.gz", path]
+    (phase,) = read_telemetry(path).phases
+    assert len(phase.cycles) == len(
+        read_telemetry(close_range_log.path).phases[0].cycles
+    )
@@ -0,0 +1,100 @@
+"""Mission file parsing and validation."""
+
+from pathlib import Path
+
+import pytest
+
+from src.mission.mission_plan import MissionFileHelper, MissionFileError
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def mission(*steps, **parameters) -> dict:
+    return {"name": "test", "parameters": parameters, "steps": list(steps)}
+
+
+def close_range(**params) -> dict:
+    return {"name": "approach", "phase": "close_range", "params": params}
+
+
+def test_shipped_mission_loads():
+    plan = MissionFileHelper.load(ROOT / "missions" / "rendezvous_docking.json")
+    assert [step.name for step in plan.steps][:2] == ["orbit_raise", "orbit_phasing"]
+    assert plan.step("approach_500m").params["final_state"] == (0, 500, 0)
+
+
+def test_steps_sorted_by_dependencies():
+    plan = MissionFileHelper.parse(
+        mission(
+            {"name": "b", "phase": "wait", "depends_on": ["a"]},
+            {"name": "a", "phase": "wait", "depends_on": []},
+        )
+    )
+    assert [step.name for step in plan.steps] == ["a", "b"]
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        {"steps": []},
+        {"name": ["test"], "steps": [{"phase": "wait"}]},
+        mission("not a step"),
+        mission({"phase": "warp"}),
+        mission({"phase": ["wait"]}),
+        mission({"phase": {"type": "wait"}}),
+        mission({"name": ["a"], "phase": "wait"}),
+        mission({"phase": "wait", "preconditions": {"check": "rcs_available"}}),
+        mission({"phase": "wait", "preconditions": [{"check": ["rcs_available"]}]}),
+        mission({"phase": "wait", "depends_on": [["a"]]}),
+        mission({"phase": "wait", "params": [10]}),
+        mission({"phase": "wait", "params": {"seconds": 10}}),
+        mission({"phase": "wait", "params": {"duration": 0}}),
+        mission({"phase": "wait", "params": {"duration": "10"}}),
+        mission({"phase": "wait", "timeout": "10"}),
+        mission({"phase": "wait", "timeout": -1}),
+        mission({"phase": "wait", "preconditions": [{"test": "rcs_available"}]}),
+        mission({"phase": "wait", "preconditions": [{"check": "fuel"}]}),
+        mission(
+            {
+                "phase": "wait",
+                "preconditions": [{"check": "max_relative_distance", "value": "far"}],
+            }
+        ),
+        mission(
+            {"phase": "wait", "preconditions": [{"check": "rcs_available", "value": 1}]}
+        ),
+        mission({"phase": "wait", "depends_on": ["missing"]}),
+        mission({"phase": "wait", "depends_on": 3}),
+        mission(
+            {"name": "a", "phase": "wait", "depends_on": ["b"]},
+            {"name": "b", "phase": "wait", "depends_on": ["a"]},
+        ),
+        mission({"phase": "wait"}, {"phase": "wait"}),
+        mission(close_range(final_state=[0, 100])),
+        mission(close_range(final_state=[0, "100", 0])),
+        mission(close_range(final_state=[0, 100, 0], mode="hover")),
+        mission(close_range(final_state=[0, 100, 0], duration=-60)),
+        mission({"phase": "deploy_parts", "params": {"antennas": "yes"}}),
+        mission({"phase": "wait"}, keep_out_radius="wide"),
+        mission({"phase": "wait"}, keep_out_radius=True),
+        mission({"phase": "wait"}, phase_offset_end_phasing=float("inf")),
+        mission({"phase": "wait"}, phase_offset_end_phasing=float("nan")),
+        mission({"phase": "wait"}, phase_offset_end_phasing=True),
+        mission({"phase": "wait"}, keep_out_radius=-1),
+        mission({"phase": "wait"}, approach_cone_half_angle=120),
+        mission({"phase": "wait"}, relative_dynamics="kepler"),
+        mission({"phase": "wait"}, unknown=1),
+    ],
+)
+def test_invalid_mission_rejected(content):
+    with pytest.raises(MissionFileError):
+        MissionFileHelper.parse(content)
+
+
+def test_unreadable_file_rejected(tmp_path):
+    path = tmp_path / "mission.json"
+    path.write_text("{")
+    with pytest.raises(MissionFileError):
+        MissionFileHelper.load(str(path))
+    with pytest.raises(MissionFileError):
+        MissionFileHelper.load(str(tmp_path / "mission.ini"))
@@ -0,0 +1,150 @@
+"""Numerical orbit propagation and phasing corrections."""
+
+import math
+from types import SimpleNamespace
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from src.mission.phasing import OrbitPhasing
+from src.physics.mission_snapshot import MissionSnapshot, PlannedNode
+from src.physics.orbit_propagator import FiniteBurn, OrbitPropagator
+from src.physics.orb_dyn_utils import (
+    CelestialBodyParameters,
+    OrbitalDynamicsUtils,
+    OrbitElements,
+)
+
+# Kerbin
+BODY = CelestialBodyParameters(3.5316e12, 9.81, 600000.0)
+TARGET = OrbitElements(
+    semi_major_axis=700000.0,
+    eccentricity=0.001,
+    inclination=0.01,
+    longitude_of_ascending_node=0.3,
+    argument_of_periapsis=1.2,
+    mean_anomaly_at_epoch=0.5,
+    epoch=0.0,
+)
+
+
+@pytest.fixture
+def orb_dyn():
+    return OrbitalDynamicsUtils(celestial_body_params=BODY)
+
+
+def test_two_body_propagation_matches_kepler(orb_dyn):
+    period = orb_dyn.period(TARGET)
+    trajectory = OrbitPropagator(orb_dyn).propagate([TARGET], 0.0, 3 * period)
+    for t in (0.4 * period, 3 * period):
+        position, velocity = orb_dyn.state_at_ut(TARGET, t)
+        state = trajectory.state_at(t)[0]
+        assert np.linalg.norm(state[:3] - position) < 5.0
+        assert np.linalg.norm(state[3:] - velocity) < 0.01
+
+
+def test_j2_perturbs_the_orbit(orb_dyn):
+    period = orb_dyn.period(TARGET)
+    position, _ = orb_dyn.state_at_ut(TARGET, 3 * period)
+    trajectory = OrbitPropagator(orb_dyn, j2=1e-3).propagate([TARGET], 0.0, 3 * period)
+    assert np.linalg.norm(trajectory.state_at(3 * period)[0][:3] - position) > 1000.0
+
+
+def test_finite_burn_matches_impulsive_burn(orb_dyn):
+    burn = FiniteBurn(
+        start=100.0, duration=8.0, thrust=60000.0, mass=5000.0, specific_impulse=300.0
+    )
+    g = BODY.body_surface_gravity
+    burnt = burn.thrust / (burn.specific_impulse * g) * burn.duration
+    delta_v = burn.specific_impulse * g * math.log(burn.mass / (burn.mass - burnt))
+    state = OrbitPropagator(orb_dyn).propagate([TARGET], 0.0, 200.0, burns=(burn,))
+    r, v = (np.linalg.norm(part) for part in np.split(state.state_at(200.0)[0], 2))
+    semi_major_axis = 1 / (2 / r - v**2 / BODY.gravitational_parameter)
+    impulsive = orb_dyn.impulsive_burn(TARGET, 104.0, delta_v)
+    assert semi_major_axis == pytest.approx(impulsive.semi_major_axis, rel=1e-5)
+
+
+def test_phasing_correction_cancels_the_v_bar_error(orb_dyn):
+    # chaser on the target orbit, about 1.4 km behind
+    chaser = replace(TARGET, mean_anomaly_at_epoch=TARGET.mean_anomaly_at_epoch - 0.002)
+    snapshot = MissionSnapshot(
+        ut=0.0,
+        chaser=chaser,
+        target=TARGET,
+        mass=5000.0,
+        specific_impulse=300.0,
+        available_thrust=60000.0,
+        rcs_forward_force=1000.0,
+        rel_pos=(0.0, 0.0, 0.0),
+    )
+    period = orb_dyn.period(TARGET)
+    arrival = 3 * period
+    (estimate,) = OrbitPropagator(orb_dyn).phasing_estimates(
+        snapshot, arrival, [period]
+    )
+    _, v_bar_error, _ = estimate.offset
+    assert v_bar_error == pytest.approx(
+        orb_dyn.relative_position(TARGET, chaser, arrival)[1], abs=1.0
+    )
+    corrected = orb_dyn.impulsive_burn(chaser, estimate.ut, estimate.delta_v)
+    _, v_bar_left, _ = orb_dyn.relative_position(TARGET, corrected, arrival)
+    assert abs(v_bar_left) < 0.01 * abs(v_bar_error)
+
+
+def test_corrections_only_at_apsis_passes_left():
+    phasing = OrbitPhasing(
+        game_helper=None,
+        desired_apoapsis=700000.0,
+        desired_final_phase=3.0,
+        propagator=None,
+    )
+    phasing.T_phasing = 2000.0
+    phasing.n_phasing_orbit = 3
+    circ_node = PlannedNode(
+        step="orbit_phasing",
+        ut=7000.0,
+        delta_v=10.0,
+        direction="prograde",
+        burn_time=5.0,
+    )
+    snapshot = MissionSnapshot(0.0, TARGET, TARGET, 5000.0, 300.0, 6e4, 1e3, (0, 0, 0))
+    assert phasing.apsis_times(snapshot, circ_node) == [3000.0, 5000.0]
+    assert phasing.apsis_times(replace(snapshot, ut=4000.0), circ_node) == [5000.0]
+
+
+class NodeHelper:
+    def __init__(self) -> None:
+        self.executed = []
+
+    def add_node(self, **node) -> None:
+        self.executed.append("rcs node added")
+
+    def rcs_node_execution(self) -> None:
+        self.executed.append("rcs")
+
+    def execute_planned_node(self, node) -> None:
+        self.executed.append("engine")
+
+
+@pytest.mark.parametrize(
+    "delta_v, rcs_force, executed",
+    [
+        (0.5, (0, 100.0, 0), ["rcs node added", "rcs"]),
+        (0.5, (0, 0, 0), ["engine"]),
+        (3.0, (0, 100.0, 0), ["engine"]),
+    ],
+)
+def test_small_corrections_use_the_rcs_when_available(delta_v, rcs_force, executed):
+    node_helper = NodeHelper()
+    game_helper = SimpleNamespace(
+        node_helper=node_helper,
+        vessel_control_helper=SimpleNamespace(
+            get=lambda name: (rcs_force, tuple(-f for f in rcs_force))
+        ),
+    )
+    phasing = OrbitPhasing(game_helper, 700000.0, 3.0, propagator=None)
+    phasing.execute_correction(
+        PlannedNode("orbit_phasing", 1000.0, delta_v, "prograde", burn_time=1.0)
+    )
+    assert node_helper.executed == executed
@@ -0,0 +1,79 @@
+"""Relative motion models beyond CW and their free drift guidance."""
+
+import math
+
+import numpy as np
+
+from src.gnc.cw_linear_dynamics import InPlaneDynamics, OutOfPlaneDynamics
+from src.gnc.guidance.guidance import CWGuidance
+from src.gnc.guidance.relative_motion_guidance import RelativeMotionGuidance
+from src.gnc.lqr_continuous_ctrl import LQRControl, LQRCost
+from src.gnc.relative_dynamics import (
+    EccentricInPlaneDynamics,
+    EccentricOutOfPlaneDynamics,
+    GainSchedule,
+    RelativeMotionModel,
+)
+
+MU = 3.5316e12  # m**3/s**2, Kerbin
+A = 700000.0  # m
+N = math.sqrt(MU / A**3)  # rad/s
+
+
+def test_circular_tschauner_hempel_is_cw():
+    model = RelativeMotionModel(MU, A, 0.0, linearized=True)
+    for theta in (0.0, 2.0):
+        np.testing.assert_allclose(
+            EccentricInPlaneDynamics(model, theta).free_dynamics,
+            InPlaneDynamics(orbital_rate=N).free_dynamics,
+            atol=1e-15,
+        )
+        np.testing.assert_allclose(
+            EccentricOutOfPlaneDynamics(model, theta).free_dynamics,
+            OutOfPlaneDynamics(orbital_rate=N).free_dynamics,
+            atol=1e-15,
+        )
+
+
+def test_nonlinear_model_departs_from_the_linear_one_far_away():
+    def gap(state) -> float:
+        linear, nonlinear = (
+            RelativeMotionModel(MU, A, 0.05, linearized=linearized).propagate(
+                state, 0.3, 1200.0
+            )[-1, 0, :3]
+            for linearized in (True, False)
+        )
+        return np.linalg.norm(linear - nonlinear) / np.linalg.norm(state[:3])
+
+    assert gap(np.array([5.0, -20.0, 1.0, 0.0, 0.01, 0.0])) < 1e-3
+    assert gap(np.array([5000.0, -20000.0, 1000.0, 0.0, 10.0, 0.0])) > 1e-2
+
+
+def test_guidance_follows_the_model():
+    # linearized around a circular orbit, the model is CW
+    model = RelativeMotionModel(MU, A, 0.0, linearized=True)
+    initial_pos, initial_vel = (500.0, -2000.0, 10.0), (0.0, 0.75 * N * 500, 0.0)
+    ref_signal = RelativeMotionGuidance(model, lambda ut: N * ut).ref_signal(
+        initial_pos, initial_vel
+    )
+    cw_signal = CWGuidance(orbital_rate=N).ref_signal(initial_pos, initial_vel)
+    for tau in (0.0, 35.0, 600.0, 1234.5):
+        in_plane, out_of_plane = ref_signal(tau)
+        cw_in_plane, cw_out_of_plane = cw_signal(tau)
+        np.testing.assert_allclose(in_plane, cw_in_plane, atol=0.01)
+        np.testing.assert_allclose(out_of_plane, cw_out_of_plane, atol=0.01)
+
+
+def test_homing_gains_follow_the_true_anomaly():
+    model = RelativeMotionModel(MU, A, 0.1, linearized=True)
+    costs = LQRCost(Q=10**3, R=10**5)
+    schedule = GainSchedule(model, lambda ut: ut, costs)
+    # ut is the true anomaly, the nearest scheduled anomaly flies
+    periapsis, _ = schedule.controllers_at(2 * math.pi - 0.01)
+    apoapsis, _ = schedule.controllers_at(math.pi + 0.01)
+    assert periapsis is schedule.controllers[0][0]
+    np.testing.assert_allclose(
+        apoapsis.optimal_gain,
+        LQRControl(costs, EccentricInPlaneDynamics(model, math.pi)).optimal_gain,
+    )
+    assert not np.allclose(periapsis.optimal_gain, apoapsis.optimal_gain, rtol=1e-3)
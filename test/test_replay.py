@@ -0,0 +1,50 @@
+"""Offline replay of the GNC on recorded telemetry."""
+
+import gzip
+import shutil
+
+from src.gnc.replay import GNCReplay, read_telemetry
+
+
+def replay(close_range_log, path: str):
+    return GNCReplay(
+        gnc_helper=close_range_log.gnc_helper,
+        stream_helper=close_range_log.stream_helper,
+    ).replay(read_telemetry(path))
+
+
+def test_recorded_leg_read(close_range_log):
+    telemetry = read_telemetry(close_range_log.path)
+    assert telemetry.orbital_rate is not None
+    (phase,) = telemetry.phases
+    assert len(phase.cycles) == 1000
+    (leg,) = phase.legs
+    assert leg.t_0 == 100.0 and leg.final_state == (0.0, -15.0, 0.0)
+
+
+def test_replay_reproduces_the_recorded_commands(close_range_log):
+    report = replay(close_range_log, close_range_log.path)
+    assert report.cycles == report.compared == 1000
+    assert not report.mismatches
+
+
+def test_replay_flags_changed_commands(close_range_log, tmp_path):
+    path = tmp_path / "changed.log"
+    with open(close_range_log.path) as source, open(path, "w") as changed:
+        controls = 0
+        for line in source:
+            if line.startswith("INFO - Control,"):
+                controls += 1
+                if controls == 500:
+                    line = "INFO - Control, 9.99, 9.99, 9.99, 0, 0, 0\n"
+            changed.write(line)
+    report = replay(close_range_log, str(path))
+    assert len(report.mismatches) == 1
+    assert report.mismatches[0].recorded == (9.99, 9.99, 9.99)
+
+
+def test_rotated_log_replayed(close_range_log, tmp_path):
+    path = tmp_path / "rendezvous_docking.log.1.gz"
+    with open(close_range_log.path, "rb") as source, gzip.open(path, "wb") as part:
+        shutil.copyfileobj(source, part)
+    assert replay(close_range_log, str(path)).compared == 1000
@@ -0,0 +1,75 @@
+"""Shared, reference counted streams of the stream registry."""
+
+from types import SimpleNamespace
+
+from src.helpers.stream_helper import StreamHelper, StreamRegistry
+
+
+class Stream:
+    def __init__(self, func, *args) -> None:
+        self.func, self.args = func, args
+        self.rate = None
+        self.removed = False
+
+    def __call__(self):
+        return self.func(*self.args)
+
+    def remove(self) -> None:
+        self.removed = True
+
+
+class Connection:
+    """Connection side of kRPC the registry uses, counting the streams added."""
+
+    def __init__(self) -> None:
+        self.added = 0
+        self.space_center = SimpleNamespace(ut=42.0)
+
+    def add_stream(self, func, *args) -> Stream:
+        self.added += 1
+        return Stream(func, *args)
+
+
+def vessel(object_id: int):
+    return SimpleNamespace(
+        _object_id=object_id,
+        position=lambda frame: (1.0, 2.0, 3.0),
+        velocity=lambda frame: (0.1, 0.2, 0.3),
+        orbital_reference_frame=f"frame {object_id}",
+        mass=5000.0 + object_id,
+    )
+
+
+def test_streams_shared_until_last_release():
+    registry = StreamRegistry(Connection())
+    first = registry.acquire("mass", getattr, vessel(1), "mass", rate=1)
+    second = registry.acquire("mass", getattr, vessel(1), "mass", rate=10)
+    assert first is second and registry.conn.added == 1
+    # the highest rate wins
+    assert first.rate == 10 and registry.stats()["mass"] == {
+        "references": 2,
+        "rate": 10,
+    }
+    registry.release("mass")
+    assert not first.removed
+    registry.release("mass")
+    assert first.removed and registry.stats() == {}
+    registry.release("mass")  # releasing an unknown stream is a no-op
+
+
+def test_every_tick_rate_is_kept():
+    registry = StreamRegistry(Connection())
+    stream = registry.acquire("ut", getattr, SimpleNamespace(ut=1.0), "ut")
+    registry.acquire("ut", getattr, SimpleNamespace(ut=1.0), "ut", rate=5)
+    assert stream.rate == 0
+
+
+def test_helpers_share_game_time_but_not_vessel_streams():
+    conn = Connection()
+    registry = StreamRegistry(conn)
+    target = vessel(0)
+    helpers = [StreamHelper(conn, vessel(i), target, registry) for i in (1, 2)]
+    assert helpers[0].ut is helpers[1].ut
+    assert helpers[0].rel_pos is not helpers[1].rel_pos
+    assert helpers[0].get("mass") == 5001.0 and helpers[1].get("mass") == 5002.0
+    assert registry.stats()["1.mass"]["references"] == 1
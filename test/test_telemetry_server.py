@@ -0,0 +1,85 @@
+"""Decimated GNC samples streamed to dashboard subscribers."""
+
+import json
+import time
+import socket
+import logging
+
+import pytest
+
+from src.helpers.telemetry_server import TelemetryServer, parse_message
+
+
+@pytest.fixture
+def logger():
+    logger = logging.getLogger("telemetry_test")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    yield logger
+    logger.handlers.clear()
+
+
+def subscribe(server: TelemetryServer) -> socket.socket:
+    connection = socket.create_connection(("127.0.0.1", server.port))
+    while not server.subscribers:
+        time.sleep(0.01)
+    return connection
+
+
+def test_parse_message():
+    assert parse_message("===== Homing Phase =====") == {
+        "kind": "phase",
+        "name": "Homing Phase",
+    }
+    assert parse_message("Port nav, 1.5, -2, 0.25") == {
+        "kind": "port_nav",
+        "values": [1.5, -2.0, 0.25],
+    }
+    assert parse_message("RCS activated") == {
+        "kind": "message",
+        "text": "RCS activated",
+    }
+
+
+def test_cycles_decimated(logger):
+    server = TelemetryServer(port=0, decimation=5)
+    logger.addHandler(server)
+    connection = subscribe(server)
+    try:
+        logger.info("===== Closed loop proximity maneuver phase =====")
+        for i in range(10):
+            logger.info(f"Nav, {i}, 1, 2, 3, 4, 5, 6")
+            logger.info(f"Control, {i}, 0, 0, 0, 0, 0")
+        logger.info("===== End of closed loop proximity maneuver phase =====")
+        received = []
+        with connection.makefile() as lines:
+            while len(received) < 6:
+                received.append(json.loads(lines.readline()))
+    finally:
+        server.close()
+        connection.close()
+    assert [sample["kind"] for sample in received] == [
+        "phase",
+        "nav",
+        "control",
+        "nav",
+        "control",
+        "phase",
+    ]
+    # every fifth cycle, with the control that follows it
+    assert [sample["values"][0] for sample in received[1:5]] == [4, 4, 9, 9]
+
+
+def test_stalled_subscriber_bounded(logger):
+    server = TelemetryServer(port=0, decimation=1, queue_size=100)
+    logger.addHandler(server)
+    stalled = subscribe(server)
+    try:
+        # the subscriber thread is kept busy on a socket that is never read
+        for i in range(100000):
+            logger.info(f"Nav, {i}, 772.71, -1184.60, 610.92, -11.05, 0.33, -0.99")
+        assert server.stats()["dropped"] > 0
+        assert len(server.subscribers[0].queue) <= 100
+    finally:
+        server.close()
+        stalled.close()
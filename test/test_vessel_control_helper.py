@@ -0,0 +1,138 @@
+"""Cached vessel properties, written-through controls and their confirmation."""
+
+import threading
+
+import pytest
+
+from src.helpers.rcs_ctrl_helper import RCSCtrlHelper
+from src.helpers.vessel_control_helper import VesselControlHelper
+
+
+class Control:
+    """Vessel control recording every write, as an RPC would be sent."""
+
+    def __init__(self) -> None:
+        object.__setattr__(self, "writes", [])
+
+    def __setattr__(self, name: str, value) -> None:
+        self.writes.append((name, value))
+        object.__setattr__(self, name, value)
+
+
+class Vessel:
+    def __init__(self) -> None:
+        self.control = Control()
+        self.reads = 0
+        self.rcs_force = ((0.0, 0.0, 0.0), (0.0, 0.0, 0.0))
+
+    @property
+    def available_rcs_force(self) -> tuple:
+        self.reads += 1
+        return self.rcs_force
+
+
+class Stream:
+    def __init__(self, value) -> None:
+        self.value = value
+        self.condition = threading.Condition()
+
+    def __call__(self):
+        return self.value
+
+    def wait(self, timeout: float) -> None:
+        self.condition.wait(timeout)
+
+    def update(self, value) -> None:
+        with self.condition:
+            self.value = value
+            self.condition.notify_all()
+
+
+class StreamHelper:
+    """Streamed control state, showing the game values until updated."""
+
+    def __init__(self) -> None:
+        self.streams = {
+            "sas": Stream(True),
+            "rcs": Stream(False),
+            "mass": Stream(1000.0),
+        }
+
+    def stream(self, name: str) -> Stream:
+        return self.streams[name]
+
+    def get(self, name: str):
+        return self.streams[name]()
+
+
+@pytest.fixture
+def vessel():
+    return Vessel()
+
+
+@pytest.fixture
+def helper(vessel):
+    return VesselControlHelper(vessel, StreamHelper(), space_center_helper=None)
+
+
+def test_cached_until_invalidated(helper, vessel):
+    helper.get("available_rcs_force")
+    helper.get("available_rcs_force")
+    assert vessel.reads == 1
+    helper.invalidate("available_rcs_force")
+    helper.get("available_rcs_force")
+    assert vessel.reads == 2
+
+
+def test_repeated_write_skipped(helper, vessel):
+    assert helper.set("throttle", 1.0)
+    assert not helper.set("throttle", 1.0)
+    assert helper.set("throttle", 0.0)
+    helper.invalidate()
+    assert helper.set("throttle", 0.0)
+    assert vessel.control.writes == [
+        ("throttle", 1.0),
+        ("throttle", 0.0),
+        ("throttle", 0.0),
+    ]
+
+
+def test_toggle_not_dropped_before_the_game_applies_it(helper, vessel):
+    # the stream still shows SAS on when it is enabled again
+    helper.request("sas", False)
+    helper.request("sas", True)
+    assert vessel.control.writes == [("sas", False), ("sas", True)]
+    assert helper.pending == {"sas": True}
+
+
+def test_skipped_write_not_confirmed(helper):
+    helper.request("rcs", True)
+    assert helper.confirm("rcs", timeout=0.05) is False
+    helper.stream_helper.streams["rcs"].update(True)
+    helper.request("rcs", True)
+    assert helper.pending == {}
+
+
+def test_confirm_waits_for_the_stream(helper):
+    helper.request("rcs", True)
+    stream = helper.stream_helper.streams["rcs"]
+    threading.Timer(0.05, stream.update, (True,)).start()
+    assert helper.confirm(timeout=2.0)
+    assert helper.pending == {}
+
+
+def test_rcs_force_read_again_after_enabling(helper, vessel):
+    rcs = RCSCtrlHelper(helper, space_center_helper=None)
+    assert rcs.compute_available_acceleration() == ((0.0,) * 3, (0.0,) * 3)
+    # an all zero force read while the RCS was off is not kept
+    vessel.rcs_force = ((100.0, 200.0, 300.0), (-100.0, -200.0, -300.0))
+    assert rcs.compute_available_acceleration()[0] == (0.1, 0.2, 0.3)
+    rcs.enable_rcs()
+    vessel.rcs_force = ((200.0, 400.0, 600.0), (-200.0, -400.0, -600.0))
+    assert rcs.compute_available_acceleration()[0] == (0.2, 0.4, 0.6)
+
+
+def test_rcs_actuation_without_force(helper, vessel):
+    vessel.rcs_force = ((100.0, 0.0, 100.0), (-100.0, 0.0, -100.0))
+    RCSCtrlHelper(helper, space_center_helper=None).rcs_actuation((0.05, 0.1, 0.0))
+    assert dict(vessel.control.writes) == {"right": 0.5, "forward": 0.0, "up": 0.0}
@@ -0,0 +1,155 @@
+"""Rails warp to a predicted event, against a simulated game clock."""
+
+import time
+import threading
+
+import pytest
+
+from src.helpers.space_center_helper import WarpLock
+from src.helpers.warp_scheduler import RAILS_WARP_RATES, WarpScheduler
+
+
+class SpaceCenter:
+    """Game time running at the rate of the rails warp factor."""
+
+    def __init__(self, maximum_rails_warp_factor: int = 7) -> None:
+        self.maximum_rails_warp_factor = maximum_rails_warp_factor
+        self.time = 0.0
+        self.factor = 0
+        self.factors = []
+        self.t_last = time.perf_counter()
+        self.lock = threading.Lock()
+
+    def ut(self) -> float:
+        with self.lock:
+            now = time.perf_counter()
+            self.time += RAILS_WARP_RATES[self.factor] * (now - self.t_last)
+            self.t_last = now
+            return self.time
+
+    @property
+    def rails_warp_factor(self) -> int:
+        return self.factor
+
+    @rails_warp_factor.setter
+    def rails_warp_factor(self, factor: int) -> None:
+        self.ut()
+        self.factor = factor
+        self.factors.append(factor)
+
+    @property
+    def warp_rate(self) -> float:
+        return RAILS_WARP_RATES[self.factor]
+
+
+class SpaceCenterHelper:
+    def __init__(self, space_center: SpaceCenter, warp_lock: WarpLock = None) -> None:
+        self.space_center = space_center
+        self.warp_lock = warp_lock or WarpLock()
+
+
+class VesselControl:
+    confirmed = 0
+
+    def confirm(self) -> bool:
+        self.confirmed += 1
+        return True
+
+
+def scheduler(space_center: SpaceCenter, warp_lock: WarpLock = None) -> WarpScheduler:
+    return WarpScheduler(
+        SpaceCenterHelper(space_center, warp_lock),
+        stream_helper=space_center,
+        vessel_control_helper=VesselControl(),
+        step_down_time=0.02,
+        poll_period=0.005,
+    )
+
+
+def test_warp_steps_down_to_the_event():
+    space_center = SpaceCenter()
+    warp_scheduler = scheduler(space_center)
+    warp_scheduler.warp_to(1010.0, lead_time=10.0)
+    assert space_center.ut() == pytest.approx(1000.0, abs=0.5)
+    assert space_center.factors[0] == 6 and space_center.factors[-1] == 0
+    # the factor only decreases once warping
+    assert space_center.factors[:-1] == sorted(space_center.factors[:-1], reverse=True)
+    assert warp_scheduler.vessel_control_helper.confirmed == 1
+
+
+def test_warp_limited_by_the_game():
+    space_center = SpaceCenter(maximum_rails_warp_factor=5)
+    scheduler(space_center).warp_to(300.0)
+    assert max(space_center.factors) == 5
+
+
+def test_no_warp_to_the_past():
+    space_center = SpaceCenter()
+    warp_scheduler = scheduler(space_center)
+    warp_scheduler.warp_to(5.0, lead_time=10.0)
+    assert space_center.factors == []
+    assert warp_scheduler.vessel_control_helper.confirmed == 0
+
+
+def in_thread(target, *args) -> threading.Thread:
+    thread = threading.Thread(target=target, args=args)
+    thread.start()
+    return thread
+
+
+def test_no_warp_while_another_mission_is_under_control():
+    space_center = SpaceCenter()
+    warp_lock = WarpLock()
+    controlled = threading.Event()
+
+    def burn() -> None:
+        with warp_lock.control():
+            controlled.set()
+            time.sleep(0.2)
+            burn_end.append(space_center.ut())
+
+    burn_end = []
+    thread = in_thread(burn)
+    controlled.wait()
+    scheduler(space_center, warp_lock).warp_to(1000.0)
+    thread.join()
+    # the game ran at 1x for the whole burn
+    assert burn_end[0] < 1.0
+    assert space_center.ut() == pytest.approx(1000.0, abs=0.5)
+
+
+def test_control_stops_a_warp_in_progress():
+    space_center = SpaceCenter()
+    warp_lock = WarpLock()
+    thread = in_thread(scheduler(space_center, warp_lock).warp_to, 2 * 10**5)
+    while space_center.factor < 6:
+        time.sleep(0.005)
+    with warp_lock.control():
+        factor = space_center.factor
+        ut = space_center.ut()
+        time.sleep(0.1)
+        assert space_center.ut() - ut < 1.0
+    thread.join()
+    assert factor == 0
+    assert space_center.ut() == pytest.approx(2 * 10**5, abs=1.0)
+
+
+def test_warp_pauses_at_the_earlier_event_of_another_mission():
+    space_center = SpaceCenter()
+    warp_lock = WarpLock()
+    thread = in_thread(scheduler(space_center, warp_lock).warp_to, 2 * 10**5)
+    while space_center.factor < 6:
+        time.sleep(0.005)
+    ut = space_center.ut()
+    scheduler(space_center, warp_lock).warp_to(ut + 20000.0)
+    assert space_center.ut() == pytest.approx(ut + 20000.0, abs=1.0)
+    thread.join()
+    assert space_center.ut() == pytest.approx(2 * 10**5, abs=1.0)
+
+
+def test_no_warp_under_own_control():
+    space_center = SpaceCenter()
+    warp_scheduler = scheduler(space_center)
+    with warp_scheduler.active_control():
+        warp_scheduler.warp_to(1000.0)
+    assert space_center.factors == []